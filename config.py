@@ -12,10 +12,61 @@ MAX_BET_AMOUNT = 100000    # အများဆုံးလောင်းကြ
 OWNER_PROFIT_PERCENT = 0.10 # Owner အတွက် နုတ်ယူမည့် ၁၀% အမြတ်
 
 # --- Multiplier Step (Emoji နှင့် တက်နှုန်းများ) ---
+# Round တစ်ခုတွင် tick တစ်ခါလျှင် တစ်ဆင့်တက်သည် (+0.2 စီ)
 CRASH_MULTIPLIERS = [
-    (1.0, "🥚"), (1.1, "🐣"), (1.3, "🐥"), (1.6, "🦅"), 
-    (2.0, "✈️"), (2.5, "🚀"), (3.2, "🛸"), (4.0, "☄️")
+    (1.0, "🥚"), (1.2, "🐣"), (1.4, "🐥"), (1.6, "🐤"), (1.8, "🐦"),
+    (2.0, "🐧"), (2.2, "🕊️"), (2.4, "🦅"), (2.6, "🦆"), (2.8, "🦢"),
+    (3.0, "🦉"), (3.2, "🦚"), (3.4, "🦜"), (3.6, "🦄"), (3.8, "🦊"),
+    (4.0, "🦁"), (4.2, "🐯"), (4.4, "🦄"), (4.6, "🦋"), (4.8, "🐝"),
+    (5.0, "🐲"), (5.2, "🐳"), (5.4, "🐘"), (5.6, "🦒"), (5.8, "🦓"),
+    (6.0, "🐆"), (6.2, "🐎"), (6.4, "🦌"), (6.6, "🐕"), (6.8, "🐈"),
+    (7.0, "🐿️"), (7.2, "🐇"), (7.4, "🐹"), (7.6, "🐼"), (7.8, "🐨"),
+    (8.0, "🐻"), (8.2, "🐮"), (8.4, "🐷"), (8.6, "🐸"), (8.8, "🐵"),
+    (9.0, "🌛"), (9.2, "🌟"), (9.4, "🌌"), (9.6, "🛰️"), (9.8, "🛸"),
+    (10.0, "🚀")
 ]
+CRASH_POINT_RANGE = (1.2, 10.0)  # Crash point သည် ဤအကြားတွင် ညီတူ ဖြန့်ကျက်သည်
+
+# --- Provably-Fair Hash Chain ---
+# Crash point များကို ကြိုထုတ်ထားသော SHA-256 hash chain မှ ယူသည် (`python -m tools.crash_chain`)
+CRASH_CHAIN_FILE = os.getenv("CRASH_CHAIN_FILE", "crash_chain.bin")
+CRASH_CHAIN_LENGTH = int(os.getenv("CRASH_CHAIN_LENGTH", "1000000"))  # Chain မရှိ/ကုန်လျှင် အသစ်ထုတ်မည့် အရေအတွက်
+CRASH_CHAIN_SALT = os.getenv("CRASH_CHAIN_SALT", "")  # Chain ထုတ်ပြီးမှ ကြေညာသော salt
+CRASH_CHAIN_REFILL = int(os.getenv("CRASH_CHAIN_REFILL", "10000"))  # ဤမျှသာ ကျန်လျှင် နောက် chain ကို thread ဖြင့် ကြိုထုတ်သည်
+
+# --- Crash Round Engine ---
+# Player အားလုံးသည် round တစ်ခုတည်း (crash point တစ်ခုတည်း) ကို မျှဝေကစားသည်
+CRASH_BETTING_WINDOW = float(os.getenv("CRASH_BETTING_WINDOW", "5"))  # Round မစခင် လောင်းကြေးလက်ခံမည့် စက္ကန့်
+CRASH_TICK_INTERVAL = float(os.getenv("CRASH_TICK_INTERVAL", "1.2"))  # Multiplier တစ်ဆင့်တက်ရန် စက္ကန့်
+# Frame edit budget (OUTBOUND_RATE_GLOBAL ထဲမှ frame များ သုံးနိုင်သည့် အပိုင်း) - budget မရှိလျှင် frame ကို ကျော်သည်
+CRASH_EDIT_RATE_GLOBAL = float(os.getenv("CRASH_EDIT_RATE_GLOBAL", "25"))    # Bot တစ်ခုလုံး စက္ကန့်လျှင်
+CRASH_EDIT_RATE_PER_CHAT = float(os.getenv("CRASH_EDIT_RATE_PER_CHAT", "1"))  # Chat တစ်ခုလျှင် စက္ကန့်လျှင်
+# Crash session (user တစ်ယောက်လျှင် ဂိမ်းတစ်ပွဲ) ကန့်သတ်ချက်များ
+CRASH_MAX_SESSIONS = int(os.getenv("CRASH_MAX_SESSIONS", "10000"))  # ပြိုင်တူ session အများဆုံး
+CRASH_BET_TIMEOUT = 120      # လောင်းကြေး ရိုက်ထည့်ရန် စောင့်မည့် စက္ကန့်
+CRASH_REAP_INTERVAL = 30     # သက်တမ်းကုန် session များကို ရှင်းမည့် စက္ကန့်
+# Admission control - ပြိုင်တူဂိမ်း ကန့်သတ်ချက် (user တစ်ယောက်လျှင် ဂိမ်းတစ်ပွဲသာ) ပြည့်လျှင် တန်းစီရသည်
+CRASH_MAX_LIVE_GAMES = int(os.getenv("CRASH_MAX_LIVE_GAMES", "300"))  # Round ထဲရှိ ဂိမ်း အများဆုံး
+CRASH_MAX_WAITING = int(os.getenv("CRASH_MAX_WAITING", "300"))        # တန်းစီနိုင်သူ အများဆုံး
+CRASH_QUEUE_TIMEOUT = 300    # တန်းစီနိုင်သည့် စက္ကန့် (ကျော်လျှင် လောင်းကြေးပြန်ပေးသည်)
+# Load shedding - edit budget ပြည့်နေလျှင် လောင်းကြေးအသစ်ကို ငြင်းသည်
+CRASH_SHED_BACKLOG = int(os.getenv("CRASH_SHED_BACKLOG", "50"))       # Budget စောင့်နေသော ရလဒ် message
+CRASH_SHED_PRESSURE = float(os.getenv("CRASH_SHED_PRESSURE", "0.9"))  # Global budget ကြောင့် drop ရသော frame အချိုး
+
+# --- Outbound Messages ---
+# Bot ၏ message ပို့/ပြင်ခြင်း အားလုံးကို Telegram limit များအောက်တွင် priority အလိုက် ပို့သည်
+OUTBOUND_RATE_GLOBAL = float(os.getenv("OUTBOUND_RATE_GLOBAL", "30"))          # Bot တစ်ခုလုံး စက္ကန့်လျှင်
+OUTBOUND_RATE_PER_CHAT = float(os.getenv("OUTBOUND_RATE_PER_CHAT", "1"))       # Private chat တစ်ခုလျှင် စက္ကန့်လျှင်
+OUTBOUND_RATE_PER_GROUP = float(os.getenv("OUTBOUND_RATE_PER_GROUP", "20")) / 60  # Group တစ်ခုလျှင် မိနစ်လျှင် 20
+OUTBOUND_CHAT_BURST = 3       # Chat တစ်ခုတွင် ခဏတာ ဆက်တိုက်ပို့နိုင်သည့် အရေအတွက်
+OUTBOUND_MAX_RETRIES = 3      # Flood control (RetryAfter) ခံရလျှင် ထပ်ကြိုးစားမည့် အကြိမ်
+OUTBOUND_MAX_PENDING = int(os.getenv("OUTBOUND_MAX_PENDING", "500"))  # ဤထက်များလျှင် ဂိမ်းအသစ် လက်မခံပါ
+
+# --- Log Group Digest ---
+# Log event များကို စုပြီး interval တစ်ခုလျှင် summary message အနည်းငယ်သာ ပို့သည်
+LOG_DIGEST_INTERVAL = float(os.getenv("LOG_DIGEST_INTERVAL", "60"))  # စက္ကန့်
+LOG_DIGEST_MAX_LENGTH = 4096  # Telegram message တစ်ခု၏ အရှည်ဆုံး
+LOG_DIGEST_MAX_MESSAGES = 3   # Digest တစ်ကြိမ်လျှင် ပို့မည့် message အများဆုံး (ကျော်သော event များကို ရေတွက်ပြသည်)
 
 # --- Exchange Configuration (Manual စနစ်) ---
 # FIXED AMOUNTS ကို ဖြုတ်လိုက်ပါပြီ (User ကိုယ်တိုင်ရိုက်ရမည်)
@@ -27,6 +78,49 @@ REFERRAL_BONUS_MMK = 100    # သူငယ်ချင်းဖိတ်လျ
 # --- Jackpot Configuration (Owner JP Control အတွက်) ---
 JACKPOT_WINNERS_COUNT = 5   # Jackpot ပေါက်မည့် လူဦးရေ
 
+# --- Leaderboard ---
+LEADERBOARD_SIZE = 10       # Leaderboard တွင် ပြမည့် User အရေအတွက်
+
 # File paths
 USER_DATA_FILE = "user_data.json"
 BOT_STATE_FILE = "bot_state.json"
+
+# --- Storage Backend ---
+# "json" (user_data.json / bot_state.json) သို့မဟုတ် "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+SQLITE_DB_FILE = os.getenv("SQLITE_DB_FILE", "bot_data.db")
+# JSON backend ဖိုင် format: "json" (compact), "json-pretty", "orjson", "msgpack"
+# ဖတ်သည့်အခါ format ကို အလိုအလျောက် ခွဲခြားသဖြင့် format ပြောင်းလည်း ဖိုင်ဟောင်းများ ဖတ်နိုင်သည်
+STORAGE_FORMAT = os.getenv("STORAGE_FORMAT", "json")
+
+# --- Balance Ledger ---
+BALANCE_LEDGER_FILE = os.getenv("BALANCE_LEDGER_FILE", "balance_ledger.jsonl")
+BALANCE_SNAPSHOT_FILE = os.getenv("BALANCE_SNAPSHOT_FILE", "balance_snapshot.json")
+LEDGER_FSYNC = os.getenv("LEDGER_FSYNC", "1") == "1"          # Entry တိုင်းတွင် fsync လုပ်မလား
+LEDGER_SNAPSHOT_EVERY = int(os.getenv("LEDGER_SNAPSHOT_EVERY", "5000"))  # Entry အရေအတွက်
+# ဤ window (ms) အတွင်း ဝင်လာသော Balance ပြောင်းလဲမှုများကို fsync တစ်ကြိမ်တည်းဖြင့် သိမ်းသည်
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "3"))
+
+# --- User Data Sharding (JSON backend) ---
+# 1 ထက်များလျှင် user_data.000.json ... စသည်ဖြင့် user_id hash အလိုက် ဖိုင်ခွဲသိမ်းသည်
+# (အရေအတွက်ပြောင်းလျှင် `python -m tools.reshard_user_data N` ကို အရင် run ပါ)
+USER_DATA_SHARDS = int(os.getenv("USER_DATA_SHARDS", "1"))
+
+# --- User Data Write-Behind ---
+USER_DATA_FLUSH_INTERVAL = float(os.getenv("USER_DATA_FLUSH_INTERVAL", "2.0"))  # စက္ကန့်
+USER_DATA_FLUSH_THRESHOLD = int(os.getenv("USER_DATA_FLUSH_THRESHOLD", "100"))  # Dirty record အရေအတွက်
+
+# --- User History ---
+# User တစ်ယောက်လျှင် နောက်ဆုံး HISTORY_CAPACITY ခုကိုသာ ring buffer ဖြင့် သိမ်းသည်
+HISTORY_LOG_FILE = os.getenv("HISTORY_LOG_FILE", "user_history.jsonl")
+HISTORY_CAPACITY = int(os.getenv("HISTORY_CAPACITY", "50"))
+HISTORY_PAGE_SIZE = 10      # History စာမျက်နှာ တစ်ခုလျှင် ပြမည့် အရေအတွက်
+HISTORY_RETENTION_DAYS = 30 # ဤရက်ထက်ဟောင်းသော history ကို ဖယ်ရှားသည်
+HISTORY_EXPIRY_BATCH = int(os.getenv("HISTORY_EXPIRY_BATCH", "500"))  # Flush တစ်ကြိမ်လျှင် စစ်မည့် User အရေအတွက်
+
+# --- Exchange Queue ---
+# ငွေထုတ်လွှာများကို bot_state နှင့် သီးခြား append-only log ဖြင့် သိမ်းသည်
+EXCHANGE_LOG_FILE = os.getenv("EXCHANGE_LOG_FILE", "exchange_queue.jsonl")
+
+# --- Daily Statistics ---
+DAILY_STATS_FILE = os.getenv("DAILY_STATS_FILE", "daily_stats.json")
@@ -1,117 +1,668 @@
-import json
 import os
+import asyncio
+import atexit
 import logging
+import time
+import weakref
 from datetime import datetime, date
-from config import USER_DATA_FILE, BOT_STATE_FILE
+from config import (
+    USER_DATA_FILE, BOT_STATE_FILE, USER_DATA_FLUSH_INTERVAL, USER_DATA_FLUSH_THRESHOLD,
+    STORAGE_BACKEND, STORAGE_FORMAT, SQLITE_DB_FILE, USER_DATA_SHARDS, BALANCE_LEDGER_FILE, BALANCE_SNAPSHOT_FILE,
+    LEDGER_FSYNC, LEDGER_SNAPSHOT_EVERY, HISTORY_LOG_FILE, HISTORY_CAPACITY, DAILY_STATS_FILE,
+    HISTORY_RETENTION_DAYS, HISTORY_EXPIRY_BATCH, EXCHANGE_LOG_FILE, GROUP_COMMIT_WINDOW_MS
+)
+from storage.json_store import JsonUserStore
+from storage.serializers import resolve_format
+from storage.records import UserRecord
+from storage.ledger import BalanceLedger
+from storage.history import HistoryStore
+from storage.leaderboard import Leaderboard
+from storage.stats import DailyStats
+from storage.commit import GroupCommit
+from storage.migrations import SCHEMA_VERSION, schema_version
+from storage.exchanges import ExchangeQueue, PENDING, APPROVED, PAID, REJECTED, OPEN_STATUSES
 
 logger = logging.getLogger(__name__)
 
+# --- Storage backend ---
+# User data ကို memory ထဲတွင် ထားပြီး ပြောင်းလဲထားသော record များကိုသာ မှတ်ထားခြင်း
+_store = None
+_flush_wakeup = None
+_flusher_task = None
+_flusher_stopping = False
+
+# Balance ပြောင်းလဲမှုတိုင်းကို မှတ်တမ်းတင်သော append-only ledger
+_ledger = BalanceLedger(BALANCE_LEDGER_FILE, BALANCE_SNAPSHOT_FILE, fsync=LEDGER_FSYNC)
+# ပြိုင်တူ ဝင်လာသော mutation များ၏ fsync ကို တစ်ကြိမ်တည်းအဖြစ် ပေါင်းခြင်း
+_ledger_commit = GroupCommit(_ledger.sync, GROUP_COMMIT_WINDOW_MS / 1000)
+
+# User record နှင့် သီးခြားထားသော history ring buffer များ
+_history = HistoryStore(HISTORY_LOG_FILE, capacity=HISTORY_CAPACITY)
+
+# mmk အလိုက် အဆင့်သတ်မှတ်ရန် index (Balance ပြောင်းတိုင်း update လုပ်သည်)
+_leaderboard = Leaderboard()
+
+# ရက်အလိုက် စာရင်းဇယား (Balance ပြောင်းတိုင်း reason အလိုက် တိုးသည်)
+_stats = DailyStats(DAILY_STATS_FILE)
+
+# ငွေထုတ်လွှာ queue (bot_state နှင့် သီးခြားသိမ်းသည်)
+_exchanges = ExchangeQueue(EXCHANGE_LOG_FILE, fsync=LEDGER_FSYNC)
+_exchanges_commit = GroupCommit(_exchanges.sync, GROUP_COMMIT_WINDOW_MS / 1000)
+
+# User တစ်ယောက်ချင်းစီ၏ Balance lock များ (မသုံးတော့လျှင် အလိုအလျောက် ဖျက်သည်)
+_balance_locks = weakref.WeakValueDictionary()
+
+def _create_store():
+    json_store = JsonUserStore(
+        USER_DATA_FILE, BOT_STATE_FILE, shards=USER_DATA_SHARDS, fmt=resolve_format(STORAGE_FORMAT)
+    )
+    json_store.check_layout()
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            from storage.sqlite_store import SqliteUserStore
+            store = SqliteUserStore(SQLITE_DB_FILE)
+        except Exception as e:
+            logger.error(f"SQLite backend unavailable, falling back to JSON files: {e}")
+            return json_store
+        if store.is_empty() and json_store.exists():
+            store.import_json(json_store)
+        return store
+    if STORAGE_BACKEND != "json":
+        logger.warning(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}', using JSON files")
+    return json_store
+
+def get_store():
+    """လက်ရှိအသုံးပြုနေသော storage backend ကို ယူခြင်း"""
+    global _store
+    if _store is None:
+        _store = _create_store()
+    return _store
+
 def init_database():
     """Database ဖိုင်များမရှိပါက အသစ်ဆောက်ပေးခြင်း"""
-    if not os.path.exists(USER_DATA_FILE):
+    store = get_store()
+    if isinstance(store, JsonUserStore) and not store.exists():
         save_user_data({})
         logger.info("Created new user data file")
     
-    if not os.path.exists(BOT_STATE_FILE):
+    if isinstance(store, JsonUserStore) and not os.path.exists(BOT_STATE_FILE):
         save_bot_state({
             "current_event": None,
             "event_participants": [],
-            "pending_exchanges": {}
+            "pending_exchanges": {},
+            "schema_version": SCHEMA_VERSION
         })
         logger.info("Created new bot state file")
+    elif isinstance(store, JsonUserStore) and schema_version(load_bot_state()) < SCHEMA_VERSION:
+        logger.warning("User data uses an old schema; stop the bot and run `python -m tools.migrate_user_data`")
+
+    store.load()
+    _open_ledger(store)
+    _open_history(store)
+    _leaderboard.build(store.balances())
+    _stats.load()
+    _open_exchanges()
+
+def _open_ledger(store):
+    """Ledger ကို replay လုပ်ပြီး user records ထဲရှိ mmk ကို ledger နှင့် ကိုက်ညီအောင် ပြင်ခြင်း"""
+    if _ledger.is_open:
+        return
+    if not _ledger.exists():
+        # ပထမဆုံးအကြိမ်: လက်ရှိ Balance များကို opening snapshot အဖြစ် ယူခြင်း
+        _ledger.balances = {uid: record.get("mmk", 0) for uid, record in store.all_records() if record.get("mmk")}
+        _ledger.open()
+        _ledger.snapshot()
+        return
+    _ledger.open()
+    # Write-behind ကြောင့် နောက်ကျနေသော record များကို ledger Balance ဖြင့် ပြင်ခြင်း
+    for user_id_str, record in list(store.all_records()):
+        if _ledger.knows(user_id_str) and record.get("mmk") != _ledger.balance(user_id_str):
+            store.get(user_id_str)["mmk"] = _ledger.balance(user_id_str)
+            store.mark_dirty(user_id_str)
+
+def _open_history(store):
+    """History log ကို replay လုပ်ခြင်း (ပထမဆုံးအကြိမ်တွင် record များထဲရှိ history ဟောင်းကို ကူးယူသည်)"""
+    if _history.is_open:
+        return
+    first_run = not _history.exists()
+    _history.open()
+    if first_run:
+        imported = _history.import_records(store.all_records())
+        if imported:
+            store.drop_history()
+            flush_user_data()
+            logger.info(f"Moved {imported} history entries out of user records")
+
+def _open_exchanges():
+    """Exchange queue ကို replay လုပ်ခြင်း (ပထမဆုံးအကြိမ်တွင် bot_state ထဲရှိ လွှာဟောင်းများကို ကူးယူသည်)"""
+    if _exchanges.is_open:
+        return
+    first_run = not _exchanges.exists()
+    _exchanges.open()
+    if first_run:
+        bot_state = load_bot_state()
+        legacy = bot_state.get("pending_exchanges") or {}
+        for info in legacy.values():
+            _exchanges.submit(
+                info["user_id"], info["amount"], info.get("payment_method", ""),
+                info.get("phone", ""), info.get("account_name", "")
+            )
+        _exchanges.sync()
+        if legacy:
+            bot_state["pending_exchanges"] = {}
+            save_bot_state(bot_state)
+            logger.info(f"Moved {len(legacy)} pending exchanges out of bot state")
+    _reconcile_exchanges()
+
+def _reconcile_exchanges():
+    """Ledger နှင့် exchange log ကြား တစ်ဝက်သာ ပြီးခဲ့သော ငွေနုတ်/ပြန်အမ်းမှုများကို ပြီးအောင် လုပ်ခြင်း
+
+    Ledger ref များ (exchange_request:<id> / exchange_refund:<id>) ကို exchange log နှင့် တိုက်စစ်သည်။
+    ထပ်ခါ run လည်း အကျိုးဆက် တူညီသည်။
+    """
+    refs = {}
+    for ref, (user_id_str, amount) in list(_ledger.refs.items()):
+        kind, _, exchange_id = ref.partition(":")
+        if kind in ("exchange_request", "exchange_refund") and exchange_id.isdigit():
+            refs.setdefault(int(exchange_id), {})[kind] = (user_id_str, amount)
+    if not refs:
+        return
+    for exchange_id, entries in sorted(refs.items()):
+        if "exchange_refund" in entries:
+            # ပြန်အမ်းပြီးမှ status မရေးရသေးခင် crash ဖြစ်ခဲ့သော လွှာ
+            if _exchanges.transition(exchange_id, OPEN_STATUSES, REJECTED) is not None:
+                logger.warning(f"Exchange #{exchange_id} was refunded before a crash; marked rejected")
+        elif exchange_id >= _exchanges.next_id:
+            # Balance နုတ်ပြီး လွှာမတင်ရသေးခင် crash ဖြစ်ခဲ့သည်
+            user_id_str, amount = entries["exchange_request"]
+            change_balance(user_id_str, -amount, "exchange_refund", ref=f"exchange_refund:{exchange_id}")
+            entries["exchange_refund"] = entries["exchange_request"]
+            logger.warning(f"Refunded {-amount} MMK to {user_id_str} for unsubmitted exchange #{exchange_id}")
+        # ID ကို နောက်လွှာတွင် ပြန်မသုံးစေရန်
+        _exchanges.skip_to(exchange_id + 1)
+    _exchanges.sync()
+    for exchange_id, entries in refs.items():
+        for kind in entries:
+            _ledger.release(f"{kind}:{exchange_id}")
+
+def _mark_dirty(user_id_str):
+    store = get_store()
+    store.mark_dirty(user_id_str)
+    if store.dirty_count >= USER_DATA_FLUSH_THRESHOLD and _flush_wakeup is not None:
+        _flush_wakeup.set()
 
 def load_user_data():
-    """JSON ဖိုင်မှ User data များကို ဖတ်ယူခြင်း"""
-    try:
-        with open(USER_DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    """User data အားလုံးကို {user_id: data} အဖြစ် ယူခြင်း"""
+    store = get_store()
+    if isinstance(store, JsonUserStore):
+        return store.load()
+    return dict(store.all_records())
 
 def save_user_data(data):
-    """User data များကို JSON ဖိုင်ထဲသို့ သိမ်းဆည်းခြင်း"""
+    """User data အားလုံးကို အစားထိုးပြီး ချက်ချင်း သိမ်းဆည်းခြင်း"""
     try:
-        with open(USER_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        get_store().replace_all(data)
     except Exception as e:
         logger.error(f"Error saving user data: {e}")
+    if _leaderboard.is_built:
+        _leaderboard.build(get_store().balances())
+
+def flush_user_data():
+    """ပြောင်းလဲထားသော User data များကို ချက်ချင်း ရေးခြင်း"""
+    if _store is None:
+        return False
+    try:
+        job = _store.take_flush_job()
+        if job is None:
+            return False
+        job()
+    except Exception as e:
+        logger.error(f"Error flushing user data: {e}")
+        return False
+    return True
+
+async def _flusher_loop():
+    """Interval ပြည့်လျှင် (သို့) Dirty record များ threshold ကျော်လျှင် ဖိုင်ထဲ ရေးခြင်း"""
+    while not _flusher_stopping:
+        try:
+            await asyncio.wait_for(_flush_wakeup.wait(), USER_DATA_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_wakeup.clear()
+        # Dirty data ကို event loop ထဲတွင် snapshot ယူပြီး I/O ကိုသာ thread သို့ လွှဲသည်
+        job = get_store().take_flush_job()
+        # သက်တမ်းကုန် history ကို tick တစ်ခုလျှင် အကန့်အသတ်ဖြင့် အနည်းငယ်စီ ဖယ်ရှားသည်
+        expire_history(HISTORY_EXPIRY_BATCH)
+        _history.flush()
+        compact_job = _history.begin_compaction() if _history.needs_compaction() else None
+        stats_job = _stats.take_save_job()
+        exchanges_job = _exchanges.begin_compaction() if _exchanges.is_open and _exchanges.needs_compaction() else None
+        # Ledger snapshot ကို store flush နှင့် တစ်ချိန်တည်း capture လုပ်မှ replay မှန်ကန်မည်
+        snapshot_job = None
+        if _ledger.is_open and _ledger.entries_since_snapshot >= LEDGER_SNAPSHOT_EVERY:
+            snapshot_job = _ledger.begin_snapshot()
+        try:
+            if job is not None:
+                await asyncio.to_thread(job)
+            if snapshot_job is not None:
+                await asyncio.to_thread(snapshot_job)
+            if stats_job is not None:
+                await asyncio.to_thread(stats_job)
+        except Exception as e:
+            logger.error(f"Error flushing user data: {e}")
+        # Compaction များကို (fsync နှင့် os.replace ပါသဖြင့်) thread ထဲတွင်သာ run ပြီး
+        # စတင်ထားပြီးသားဖြစ်၍ အထက်ပါ error ရှိလည်း အဆုံးထိ (သို့) abort အထိ လုပ်ရမည်
+        if exchanges_job is not None:
+            try:
+                await asyncio.to_thread(exchanges_job)
+            except Exception as e:
+                logger.error(f"Error compacting exchange log: {e}")
+        if compact_job is not None:
+            try:
+                await asyncio.to_thread(compact_job)
+                await asyncio.to_thread(_history.finish_compaction)
+            except Exception as e:
+                _history.abort_compaction()
+                logger.error(f"Error compacting history log: {e}")
+
+def start_flusher():
+    """Background flusher task ကို စတင်ခြင်း (event loop အတွင်းမှ ခေါ်ရန်)"""
+    global _flush_wakeup, _flusher_task, _flusher_stopping
+    if _flusher_task is None:
+        _flusher_stopping = False
+        _flush_wakeup = asyncio.Event()
+        _flusher_task = asyncio.create_task(_flusher_loop())
+
+async def stop_flusher():
+    """Flusher ကို ရပ်ပြီး ကျန်နေသော data များကို သိမ်းခြင်း"""
+    global _flush_wakeup, _flusher_task, _flusher_stopping
+    if _flusher_task is not None:
+        # Thread ထဲတွင် ရေးနေဆဲ job ပြီးမှ ရပ်စေရန် cancel မလုပ်ဘဲ stop flag သုံးသည်
+        _flusher_stopping = True
+        _flush_wakeup.set()
+        await _flusher_task
+        _flusher_task = None
+        _flush_wakeup = None
+    flush_user_data()
+    stats_job = _stats.take_save_job()
+    if stats_job is not None:
+        stats_job()
+    if _ledger.is_open:
+        if _ledger.entries_since_snapshot:
+            _ledger.snapshot()
+        _ledger.close()
+    _history.close()
+    _exchanges.close()
+    if _store is not None:
+        _store.close()
+
+# Process ပိတ်သွားလျှင်လည်း data မပျောက်စေရန်
+atexit.register(flush_user_data)
+atexit.register(_history.flush)
 
 def load_bot_state():
     """Bot ၏ အခြေအနေ (Pending List စသည်) ကို ဖတ်ယူခြင်း"""
-    try:
-        with open(BOT_STATE_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"current_event": None, "event_participants": [], "pending_exchanges": {}}
+    return get_store().load_state()
 
 def save_bot_state(data):
     """Bot ၏ အခြေအနေကို သိမ်းဆည်းခြင်း"""
     try:
-        with open(BOT_STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        get_store().save_state(data)
     except Exception as e:
         logger.error(f"Error saving bot state: {e}")
 
 def get_user_data(user_id):
     """User တစ်ယောက်ချင်းစီ၏ အချက်အလက်ကို ယူခြင်း (မရှိပါက အသစ်ဆောက်ပေးခြင်း)"""
-    data = load_user_data()
+    store = get_store()
     user_id_str = str(user_id)
+    record = store.get(user_id_str)
     
-    if user_id_str not in data:
-        data[user_id_str] = {
-            "user_id": user_id,
-            "username": "",
-            "mmk": 0,
-            "total_games_played": 0,
-            "history": [],
-            "referred_by": None,
-            "referral_count": 0,
-            "event_done": False,
-            "last_active": datetime.now().isoformat()
-        }
-        save_user_data(data)
+    if record is None:
+        record = store.insert(user_id_str, UserRecord(
+            int(user_id),
+            mmk=_ledger.balance(user_id),  # Ledger ထဲတွင် ကျန်ခဲ့သော Balance
+            last_active=datetime.now().isoformat()
+        ))
+        _mark_dirty(user_id_str)
+        if _leaderboard.is_built:
+            _leaderboard.update(user_id, record.mmk)
     
-    return data[user_id_str]
+    return record
 
 def update_user_data(user_id, updates):
-    """User data ကို Update ပြုလုပ်ခြင်း"""
-    data = load_user_data()
+    """User data ကို Update ပြုလုပ်ခြင်း
+
+    Balance (mmk) ကို ဤနေရာမှ မပြင်ရပါ - per-user lock နှင့် group commit ပါသော adjust_balance()
+    (သို့) transaction() ကို သုံးပါ။
+    """
+    if "mmk" in updates:
+        raise ValueError("update_user_data() cannot change mmk; use adjust_balance() or transaction()")
     user_id_str = str(user_id)
+    record = get_store().get(user_id_str)
     
-    if user_id_str in data:
-        data[user_id_str].update(updates)
-        save_user_data(data)
-        return data[user_id_str]
+    if record is not None:
+        record.update(updates)
+        _mark_dirty(user_id_str)
+        return record
     return None
 
+def change_balance(user_id, delta, reason, sync=True, ref=None):
+    """User ၏ Balance ကို ledger မှတစ်ဆင့် တိုး/လျှော့ခြင်း (Balance အသစ်ကို ပြန်ပေးသည်)
+
+    ref သည် အခြား log နှင့် တွဲရေးရသော ပြောင်းလဲမှုအတွက် ledger ထဲ မှတ်ထားမည့် အမှတ်အသား ဖြစ်သည်။
+    """
+    record = get_user_data(user_id)
+    if not _ledger.is_open:
+        _open_ledger(get_store())
+    if not _ledger.knows(user_id) and record.get("mmk", 0):
+        # Ledger မတိုင်မီက ရှိခဲ့သော Balance ကို opening entry အဖြစ် မှတ်ခြင်း
+        _ledger.append(user_id, record["mmk"], "opening_balance")
+    new_balance = _ledger.append(user_id, delta, reason, sync=sync, ref=ref)
+    record["mmk"] = new_balance
+    _mark_dirty(str(user_id))
+    if _leaderboard.is_built:
+        _leaderboard.update(user_id, new_balance)
+    _stats.record_balance(user_id, delta, reason)
+    return new_balance
+
+def _balance_lock(user_id):
+    user_id_str = str(user_id)
+    lock = _balance_locks.get(user_id_str)
+    if lock is None:
+        lock = asyncio.Lock()
+        _balance_locks[user_id_str] = lock
+    return lock
+
+async def adjust_balance(user_id, delta, reason, min_balance=0, clamp=False):
+    """User ၏ Balance ကို lock အောက်တွင် တစ်ကြိမ်တည်း ပြောင်းလဲပြီး Balance အသစ်ကို ပြန်ပေးခြင်း
+
+    Balance သည် min_balance အောက် ရောက်မည်ဆိုလျှင် မပြောင်းဘဲ None ပြန်ပေးသည်
+    (clamp=True ဆိုလျှင် min_balance အထိသာ လျှော့သည်၊ min_balance=None ဆိုလျှင် မစစ်ပါ)။
+    Ledger fsync (group commit) ပြီးမှ lock ကို လွှတ်သဖြင့် တူညီသော User ၏ နောက် mutation သည် စောင့်ရမည်။
+    """
+    async with _balance_lock(user_id):
+        current = get_user_data(user_id).get("mmk", 0)
+        if min_balance is not None and current + delta < min_balance:
+            if not clamp:
+                return None
+            delta = min(0, min_balance - current)
+        new_balance = change_balance(user_id, delta, reason, sync=False)
+        await _ledger_commit.commit()
+        return new_balance
+
 def get_all_users():
     """Database ထဲရှိ အသုံးပြုသူအားလုံး၏ စာရင်းကို List အနေဖြင့် ယူခြင်း (Jackpot အတွက်)"""
-    data = load_user_data()
-    users_list = []
-    for user_id_str, user_info in data.items():
-        user_info['user_id'] = int(user_id_str)
-        users_list.append(user_info)
-    return users_list
+    return [record for _, record in get_store().all_records()]
 
 def add_user_history(user_id, action, details):
-    """User ၏ လှုပ်ရှားမှုမှတ်တမ်းကို သိမ်းဆည်းခြင်း"""
-    user_data = get_user_data(user_id)
-    if "history" not in user_data:
-        user_data["history"] = []
-    
-    history_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": action,
-        "details": details
-    }
-    user_data["history"].append(history_entry)
-    
-    # နောက်ဆုံး မှတ်တမ်း ၂၀ ခုသာ ထားရှိခြင်း
-    if len(user_data["history"]) > 20:
-        user_data["history"] = user_data["history"][-20:]
-        
-    update_user_data(user_id, {"history": user_data["history"]})
+    """User ၏ လှုပ်ရှားမှုမှတ်တမ်းကို သိမ်းဆည်းခြင်း (User record ကို မထိပါ)"""
+    _history.append(user_id, action, details)
+
+def expire_history(max_users=None):
+    """HISTORY_RETENTION_DAYS ထက်ဟောင်းသော history များကို ဖယ်ရှားခြင်း (ဖယ်ရှားသော အရေအတွက်)"""
+    cutoff = int(time.time()) - HISTORY_RETENTION_DAYS * 86400
+    return _history.expire(cutoff, max_users)
+
+def mark_user_active(user_id):
+    """ယနေ့ active ဖြစ်သော User အဖြစ် မှတ်ခြင်း (last_active ကိုလည်း update လုပ်သည်)"""
+    _stats.mark_active(int(user_id))
+    get_user_data(user_id)["last_active"] = datetime.now().isoformat()
+    _mark_dirty(str(user_id))
+
+def get_daily_stats(days=7):
+    """ယနေ့မှစ၍ ရက်အလိုက် စာရင်းဇယားများ"""
+    return _stats.recent(days)
+
+def get_user_history(user_id, offset=0, limit=10):
+    """User ၏ မှတ်တမ်းများကို အသစ်ဆုံးမှစ၍ စာမျက်နှာအလိုက် ယူခြင်း ([entries], total)"""
+    return _history.page(user_id, offset, limit), _history.count(user_id)
+
+# --- Transactions (User များစွာ + bot_state ကို တစ်ကြိမ်တည်း ရေးခြင်း) ---
+
+class Transaction:
+    """ပြောင်းလဲမှုများကို stage လုပ်ထားပြီး commit တွင် I/O တစ်ကြိမ်တည်းဖြင့် ရေးခြင်း
+
+    Balance ပြောင်းလဲမှုတစ်ခုခုကြောင့် Balance အနုတ်ဖြစ်မည်ဆိုလျှင် ValueError ဖြစ်ပြီး
+    မည်သည့်ပြောင်းလဲမှုကိုမျှ မလုပ်ပါ။ User တစ်ယောက်အတွက် adjust_balance (delta) နှင့်
+    update_user({"mmk": ...}) (absolute) ကို ရောသုံး၍ မရပါ (ValueError)။
+    """
+
+    def __init__(self):
+        self._balances = []     # (user_id, delta, reason)
+        self._updates = {}      # {user_id_str: updates}
+        self._history = []      # (user_id, action, details)
+        self._bot_state = None
+
+    def adjust_balance(self, user_id, delta, reason):
+        if "mmk" in self._updates.get(str(user_id), {}):
+            raise ValueError(f"Transaction already sets the balance of {user_id}")
+        self._balances.append((user_id, delta, reason))
+
+    def update_user(self, user_id, updates):
+        if "mmk" in updates and any(str(uid) == str(user_id) for uid, _, _ in self._balances):
+            raise ValueError(f"Transaction already adjusts the balance of {user_id}")
+        self._updates.setdefault(str(user_id), {}).update(updates)
+
+    def add_history(self, user_id, action, details):
+        self._history.append((user_id, action, details))
+
+    @property
+    def bot_state(self):
+        """Commit တွင် အတူတကွ သိမ်းမည့် bot_state (ပထမဆုံး သုံးချိန်တွင် ဖတ်ယူသည်)"""
+        if self._bot_state is None:
+            self._bot_state = load_bot_state()
+        return self._bot_state
+
+    async def commit(self):
+        user_ids = sorted({str(uid) for uid, _, _ in self._balances} | set(self._updates))
+        # Deadlock မဖြစ်စေရန် lock များကို user_id အစဉ်လိုက် ယူသည်
+        locks = [_balance_lock(uid) for uid in user_ids]
+        for lock in locks:
+            await lock.acquire()
+        try:
+            totals = {}
+            for uid, delta, _ in self._balances:
+                totals[str(uid)] = totals.get(str(uid), 0) + delta
+            for uid, updates in self._updates.items():
+                if "mmk" in updates:
+                    totals[uid] = totals.get(uid, 0) + updates["mmk"] - get_user_data(uid).get("mmk", 0)
+            for uid, total in totals.items():
+                if get_user_data(uid).get("mmk", 0) + total < 0:
+                    raise ValueError(f"Transaction would make balance of {uid} negative")
+
+            for uid, delta, reason in self._balances:
+                change_balance(uid, delta, reason, sync=False)
+            for uid, updates in self._updates.items():
+                updates = dict(updates)
+                if "mmk" in updates:
+                    change_balance(uid, updates.pop("mmk") - get_user_data(uid).get("mmk", 0), "set_balance", sync=False)
+                update_user_data(uid, updates)
+            for uid, action, details in self._history:
+                add_user_history(uid, action, details)
+
+            job = get_store().take_flush_job()
+            bot_state = self._bot_state
+
+            def write():
+                _ledger.sync()
+                if job is not None:
+                    job()
+                if bot_state is not None:
+                    save_bot_state(bot_state)
+            await asyncio.to_thread(write)
+        finally:
+            for lock in locks:
+                lock.release()
+
+class _TransactionContext:
+    def __init__(self):
+        self.txn = Transaction()
+
+    async def __aenter__(self):
+        return self.txn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.txn.commit()
+        return False
+
+def transaction():
+    """`async with transaction() as txn:` ပုံစံဖြင့် သုံးရန် (block ပြီးဆုံးမှ commit လုပ်သည်)"""
+    return _TransactionContext()
+
+async def update_many(updates):
+    """{user_id: updates} များကို commit တစ်ကြိမ်တည်းဖြင့် Update ပြုလုပ်ခြင်း"""
+    async with transaction() as txn:
+        for user_id, user_updates in updates.items():
+            txn.update_user(user_id, user_updates)
 
 def reset_daily_spins():
     """(Crash Game စနစ်တွင် အသုံးမလိုသော်လည်း error မတက်စေရန် ထားရှိခြင်း)"""
     pass
+
+# --- Indexed queries (Leaderboard / Jackpot / Admin) ---
+
+def count_users():
+    """စုစုပေါင်း User အရေအတွက်"""
+    return get_store().count()
+
+def _get_leaderboard():
+    if not _leaderboard.is_built:
+        _leaderboard.build(get_store().balances())
+    return _leaderboard
+
+def get_top_users(limit=10, key="mmk"):
+    """MMK အများဆုံး User များ (mmk အတွက် leaderboard index ကို သုံးသည်)"""
+    store = get_store()
+    if key != "mmk":
+        return store.top_users(limit, key)
+    return [store.get(str(user_id)) for user_id, _ in _get_leaderboard().top(limit)]
+
+def get_user_rank(user_id):
+    """User ၏ MMK အဆင့်နှင့် စုစုပေါင်း User အရေအတွက်"""
+    leaderboard = _get_leaderboard()
+    return leaderboard.rank(user_id), len(leaderboard)
+
+def pick_random_users(count):
+    """Jackpot အတွက် User များကို Random ရွေးချယ်ခြင်း"""
+    store = get_store()
+    return [store.get(str(uid)) for uid in store.random_user_ids(count)]
+
+USER_SORT_KEYS = ("user_id", "mmk", "last_active", "referral_count")
+
+def iter_users(cursor=None, limit=15, sort_key="user_id"):
+    """User များကို sort_key အစဉ်အတိုင်း cursor ၏ နောက်မှစ၍ limit ယောက် yield လုပ်ခြင်း
+
+    user_id မှလွဲ၍ အကြီးဆုံးမှ စီသည်။ cursor သည် နောက်ဆုံးရခဲ့သော record ၏
+    user_cursor() ဖြစ်ပြီး None ဆိုလျှင် အစမှ စသည်။
+    """
+    if sort_key not in USER_SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort_key}")
+    store = get_store()
+    if sort_key == "mmk":
+        for user_id, _ in _get_leaderboard().top(limit, after=cursor):
+            yield store.get(str(user_id))
+        return
+    yield from store.iter_users(cursor, limit, sort_key)
+
+def user_cursor(record, sort_key="user_id"):
+    """iter_users ကို ဤ record ၏ နောက်မှ ဆက်ရန် cursor"""
+    return (record.get(sort_key), record.user_id)
+
+# --- Exchange (Withdrawal) Queue ---
+
+async def request_exchange(user_id, amount, payment_method, phone, account_name):
+    """Balance ကို နုတ်ပြီး ငွေထုတ်လွှာအသစ် တင်ခြင်း (Balance မလုံလောက်လျှင် None)
+
+    နုတ်သော ledger entry တွင် လွှာ ID ကို ref အဖြစ် မှတ်သဖြင့် လွှာမတင်ရခင် crash ဖြစ်လျှင်
+    ဖွင့်ချိန်တွင် ပြန်အမ်းပေးသည် (_reconcile_exchanges)။
+    """
+    async with _balance_lock(user_id):
+        if get_user_data(user_id).get("mmk", 0) < amount:
+            return None
+        exchange_id = _exchanges.next_id
+        request_ref = f"exchange_request:{exchange_id}"
+        change_balance(user_id, -amount, "exchange_request", sync=False, ref=request_ref)
+        try:
+            # ID မလွဲစေရန် await မလုပ်ခင် တင်ထားပြီး exchange log ကို ledger ၏ နောက်မှ commit လုပ်သည်
+            info = _exchanges.submit(user_id, amount, payment_method, phone, account_name)
+            await _ledger_commit.commit()
+            await _exchanges_commit.commit()
+        except Exception:
+            logger.exception(f"Exchange request #{exchange_id} failed; refunding {amount} MMK to {user_id}")
+            refund_ref = f"exchange_refund:{exchange_id}"
+            if refund_ref not in _ledger.refs:
+                change_balance(user_id, amount, "exchange_refund", sync=False, ref=refund_ref)
+            _exchanges.transition(exchange_id, OPEN_STATUSES, REJECTED)
+            _exchanges.skip_to(exchange_id + 1)
+            await _ledger_commit.commit()
+            raise
+    _ledger.release(request_ref)
+    return info
+
+async def submit_exchange(user_id, amount, payment_method, phone, account_name):
+    """ငွေထုတ်လွှာအသစ် တင်ခြင်း (Balance ကို နုတ်ပြီးသား ဖြစ်ရမည်၊ ပုံမှန်အားဖြင့် request_exchange ကို သုံးပါ)"""
+    info = _exchanges.submit(user_id, amount, payment_method, phone, account_name)
+    await _exchanges_commit.commit()
+    return info
+
+async def approve_exchange(exchange_id):
+    """Pending လွှာကို လက်ခံခြင်း (Slip ပို့ရန် စောင့်နေသည်)၊ မရှိတော့လျှင် None"""
+    info = _exchanges.transition(exchange_id, (PENDING,), APPROVED)
+    if info is not None:
+        await _exchanges_commit.commit()
+    return info
+
+async def complete_exchange(exchange_id):
+    """Slip ပို့ပြီးသော လွှာကို ပြီးဆုံးကြောင်း မှတ်ခြင်း"""
+    info = _exchanges.get(exchange_id)
+    if info is None:
+        return None
+    # ပြန်အမ်းနေဆဲ (reject_exchange) လွှာကို ပြီးဆုံးကြောင်း မမှတ်မိစေရန် User ၏ lock ကို ယူသည်
+    async with _balance_lock(info["user_id"]):
+        info = _exchanges.transition(exchange_id, OPEN_STATUSES, PAID)
+        if info is not None:
+            await _exchanges_commit.commit()
+    return info
+
+async def reject_exchange(exchange_id):
+    """လွှာကို ပယ်ဖျက်ပြီး ငွေပြန်အမ်းခြင်း (တစ်ကြိမ်သာ ပြန်အမ်းသည်)၊ မရှိတော့လျှင် None
+
+    ပြန်အမ်းငွေကို ledger ထဲ အရင် commit လုပ်ပြီးမှ REJECTED ကို ရေးသည်။ ကြားတွင် crash ဖြစ်လျှင်
+    ref ဖြင့် ပြန်အမ်းပြီးကြောင်း သိသဖြင့် ဖွင့်ချိန်တွင် REJECTED အဖြစ်သာ မှတ်သည်။
+    """
+    info = _exchanges.get(exchange_id)
+    if info is None:
+        return None
+    user_id = info["user_id"]
+    refund_ref = f"exchange_refund:{exchange_id}"
+    async with _balance_lock(user_id):
+        info = _exchanges.get(exchange_id)
+        if info is None or info["status"] not in OPEN_STATUSES:
+            return None
+        if refund_ref not in _ledger.refs:
+            change_balance(user_id, info["amount"], "exchange_refund", sync=False, ref=refund_ref)
+        await _ledger_commit.commit()
+        info = _exchanges.transition(exchange_id, OPEN_STATUSES, REJECTED)
+        await _exchanges_commit.commit()
+    _ledger.release(refund_ref)
+    return info
+
+def get_exchange(exchange_id):
+    return _exchanges.get(exchange_id)
+
+def get_pending_exchanges(limit=10):
+    """စစ်ဆေးရန်ကျန်သော လွှာများ (တင်သည့်အစဉ်အတိုင်း)"""
+    return _exchanges.oldest(limit)
+
+def get_user_exchanges(user_id):
+    """User ၏ မပြီးဆုံးသေးသော လွှာများ"""
+    return _exchanges.for_user(int(user_id))
+
+def count_pending_exchanges():
+    """စစ်ဆေးရန်ကျန်သော ငွေထုတ်လွှာ အရေအတွက်"""
+    return _exchanges.count(PENDING)
+
+def pending_exchange_total():
+    """စစ်ဆေးရန်ကျန်သော ငွေထုတ်လွှာများ၏ စုစုပေါင်း MMK"""
+    return _exchanges.pending_total
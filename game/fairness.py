@@ -0,0 +1,130 @@
+import hashlib
+import hmac
+import os
+import struct
+import logging
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+# --- Provably-fair crash points ---
+# Seed မှစ၍ h[i+1] = sha256(h[i]) ဖြင့် hash N ခု ကြိုထုတ်ပြီး နောက်ဆုံးမှ ရှေ့သို့ ပြန်သုံးသည်။
+# Game g သည် h[N-g] ကို သုံးသဖြင့် sha256(game g ၏ hash) == game g-1 ၏ hash ဖြစ်ပြီး game 1 ၏ hash ကို
+# sha256 လုပ်လျှင် ကြိုကြေညာထားသော commitment ရသည်။ Hash ကို ကြိုသိ၍ မရသလို နောက်မှ ပြင်၍လည်း မရပါ။
+
+MAGIC = b"CRSHCHN1"
+_HEADER = struct.Struct(">8sQI32s")    # magic, length, checkpoint interval, commitment
+
+def crash_point(game_hash, salt, low, high):
+    """Game hash မှ crash point ကို တွက်ခြင်း ([low, high] အတွင်း 0.1 အဆင့်ဖြင့် ညီတူ)"""
+    digest = hmac.new(game_hash, salt.encode("utf-8"), hashlib.sha256).digest()
+    fraction = (int.from_bytes(digest[:7], "big") >> 4) / (1 << 52)
+    return round(low + (high - low) * fraction, 1)
+
+def next_hash(game_hash):
+    """ယခင် game ၏ hash (verify လုပ်ရာတွင် သုံးသည်)"""
+    return hashlib.sha256(game_hash).digest()
+
+class HashChain:
+    """ကြိုထုတ်ထားသော hash chain မှ game hash များကို တစ်ခုချင်း ထုတ်ပေးခြင်း
+
+    Disk ပေါ်တွင် hash အားလုံးကို မသိမ်းဘဲ interval ခုတိုင်း checkpoint တစ်ခုသာ သိမ်းသည်
+    (1M games / interval 1024 ဆိုလျှင် ~31 KB)။ Segment တစ်ခုအတွက် hash များကို ထို segment စသုံးချိန်
+    တစ်ကြိမ်သာ တွက်သဖြင့် next() သည် amortized O(1) ဖြစ်သည်။ သုံးပြီးသော game အရေအတွက်ကို
+    reserve ခုစီ ကြိုမှတ်ထားပြီး restart ဖြစ်လျှင် မှတ်ထားသည့်နေရာမှ ဆက်သုံးသည် (hash ထပ်မသုံးရ)။
+    """
+
+    def __init__(self, path, reserve=100):
+        self.path = path
+        self.reserve = reserve
+        self.length = 0
+        self.interval = 0
+        self.commitment = None
+        self.games = 0              # ထုတ်ပေးပြီးသော game အရေအတွက်
+        self._reserved = 0
+        self._checkpoints = b""
+        self._segment = None
+        self._hashes = []
+
+    @property
+    def cursor_path(self):
+        return self.path + ".cursor"
+
+    @property
+    def remaining(self):
+        return self.length - self.games
+
+    @staticmethod
+    def generate(path, length, interval=1024, seed=None):
+        """Hash chain အသစ်ထုတ်ပြီး commitment (hex) ကို ပြန်ပေးခြင်း"""
+        if length < 1 or interval < 1:
+            raise ValueError("length and interval must be positive")
+        sha256 = hashlib.sha256
+        h = seed if seed is not None else os.urandom(32)
+        checkpoints = []
+        for i in range(length):
+            if i % interval == 0:
+                checkpoints.append(h)
+            if i < length - 1:
+                h = sha256(h).digest()
+        commitment = sha256(h).digest()
+        serializers.write_atomic(
+            path, _HEADER.pack(MAGIC, length, interval, commitment) + b"".join(checkpoints)
+        )
+        # Chain အသစ်ဖြစ်သဖြင့် cursor ဟောင်းကို ဖယ်ရှားသည်
+        if os.path.exists(path + ".cursor"):
+            os.remove(path + ".cursor")
+        return commitment.hex()
+
+    def open(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        magic, self.length, self.interval, self.commitment = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise RuntimeError(f"{self.path} is not a crash hash chain")
+        self._checkpoints = data[_HEADER.size:]
+        if len(self._checkpoints) != -(-self.length // self.interval) * 32:
+            raise RuntimeError(f"{self.path} is truncated")
+        try:
+            with open(self.cursor_path, 'r', encoding='utf-8') as f:
+                self.games = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            self.games = 0
+        self.games = min(self.games, self.length)
+        self._reserved = self.games
+        self._segment = None
+        # ပထမဆုံး game ၏ hash သည် commitment နှင့် ကိုက်ညီရမည်
+        if self.length and next_hash(self._hash_at(self.length - 1)) != self.commitment:
+            raise RuntimeError(f"{self.path} does not match its commitment")
+
+    def install(self, path):
+        """ကြိုထုတ်ထားသော chain ဖိုင် (generate()) ဖြင့် လက်ရှိ chain ကို အစားထိုးပြီး ဖွင့်ခြင်း"""
+        os.replace(path, self.path)
+        # Chain ဟောင်း၏ cursor ကျန်နေလျှင် chain အသစ်ကို ကုန်ပြီဟု မှတ်မိမည်
+        if os.path.exists(self.cursor_path):
+            os.remove(self.cursor_path)
+        self.open()
+
+    def _hash_at(self, index):
+        segment = index // self.interval
+        if segment != self._segment:
+            start = segment * self.interval
+            h = self._checkpoints[segment * 32:segment * 32 + 32]
+            hashes = [h]
+            sha256 = hashlib.sha256
+            for _ in range(min(self.interval, self.length - start) - 1):
+                h = sha256(h).digest()
+                hashes.append(h)
+            self._segment = segment
+            self._hashes = hashes
+        return self._hashes[index - segment * self.interval]
+
+    def next(self):
+        """နောက် game ၏ (game number, hash) ကို ထုတ်ပေးခြင်း"""
+        if self.games >= self.length:
+            raise RuntimeError("crash hash chain is exhausted")
+        self.games += 1
+        if self.games > self._reserved:
+            self._reserved = min(self.length, self.games + self.reserve - 1)
+            serializers.write_atomic(self.cursor_path, str(self._reserved).encode("utf-8"))
+        return self.games, self._hash_at(self.length - self.games)
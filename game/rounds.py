@@ -0,0 +1,305 @@
+import asyncio
+import bisect
+import itertools
+import logging
+from game.sessions import AWAITING_BET, WAITING, QUEUED, PLAYING, CASHED_OUT
+
+logger = logging.getLogger(__name__)
+
+BETTING, RUNNING, CRASHED = "betting", "running", "crashed"
+
+# Engine က session ကို ဆက်မကိုင်တွယ်နိုင်လျှင် (ticker ရပ်သွားခြင်း စသည်) reaper ဖယ်ရှားရန် အပိုအချိန်
+SESSION_GRACE = 60.0
+
+class CrashRound:
+    """Player အားလုံး မျှဝေကစားသော round တစ်ခု (crash point တစ်ခု၊ multiplier ladder တစ်ခု)
+
+    Multiplier သည် round စချိန်မှ ကြာချိန်ဖြင့်သာ တွက်သည် - frame ပို့/မပို့ နှင့် မသက်ဆိုင်ပါ။
+    """
+
+    def __init__(self, round_id, crash_point, ladder, tick_interval, proof=None):
+        self.round_id = round_id
+        self.crash_point = crash_point
+        self.proof = proof          # Crash point ကို verify လုပ်နိုင်သော game hash
+        self.ladder = ladder
+        self.tick_interval = tick_interval
+        # Crash ဖြစ်မည့် အဆင့် (ladder အဆုံးထိ မရောက်လျှင် နောက်ဆုံးအဆင့်)
+        self.crash_step = next(
+            (i for i, (rate, _) in enumerate(ladder) if rate >= crash_point), len(ladder) - 1
+        )
+        self.state = BETTING
+        self.started_at = None
+        self.step = -1
+        self.bets = {}          # {user_id: CrashSession}
+        self.live = 0           # PLAYING state ရှိ session အရေအတွက်
+        self.auto = {}          # {ladder step: [auto cash out session]}
+        self._auto_step = -1    # Auto cash out စစ်ပြီးသော နောက်ဆုံးအဆင့်
+
+    @property
+    def multiplier(self):
+        return self.ladder[self.step][0] if self.step >= 0 else 1.0
+
+    @property
+    def emoji(self):
+        return self.ladder[self.step][1] if self.step >= 0 else ""
+
+    def live_bets(self):
+        return [session for session in self.bets.values() if session.state == PLAYING]
+
+    def open_bets(self):
+        """ငွေမရှင်းရသေးသော (QUEUED / PLAYING) session များ"""
+        return [session for session in self.bets.values() if session.state in (QUEUED, PLAYING)]
+
+    def add_bet(self, session, auto_step=None):
+        self.bets[session.user_id] = session
+        session.round = self
+        if auto_step is not None:
+            self.auto.setdefault(auto_step, []).append(session)
+
+    def start(self, now, deadline):
+        self.state = RUNNING
+        self.started_at = now
+        for session in self.bets.values():
+            # Reaper က ပိတ်ပြီးသော session များ မပါစေရန်
+            if session.state == QUEUED:
+                session.move(PLAYING, deadline)
+                self.live += 1
+        self.update(now)
+
+    def update(self, now):
+        """now အချိန်၏ အဆင့်ကို တွက်ခြင်း - crash step ရောက်လျှင် CRASHED ဖြစ်သည်"""
+        if self.state != RUNNING:
+            return
+        self.step = min(int((now - self.started_at) / self.tick_interval), self.crash_step)
+        if self.step == self.crash_step:
+            self.state = CRASHED
+
+    def take_auto_cashouts(self):
+        """ယခုအဆင့်အထိ ရောက်ခဲ့သော auto cash out target များကို ထိုအဆင့်၏ multiplier ဖြင့် cash out လုပ်ခြင်း
+
+        Tick နောက်ကျ၍ အဆင့်များ ကျော်သွားလည်း crash မတိုင်ခင် ဖြတ်ခဲ့သော target အားလုံး ပါဝင်သည်။
+        Target ရှိသော အဆင့်များကိုသာ ကြည့်သဖြင့် player အားလုံးကို scan မလုပ်ပါ။
+        """
+        limit = min(self.step, self.crash_step - 1)
+        due = []
+        for step in range(self._auto_step + 1, limit + 1):
+            for session in self.auto.pop(step, ()):
+                if session.state == PLAYING:
+                    session.cashout = self.ladder[step][0]
+                    session.move(CASHED_OUT)
+                    self.live -= 1
+                    due.append(session)
+        self._auto_step = max(self._auto_step, limit)
+        return due
+
+    def next_step_at(self):
+        return self.started_at + (self.step + 1) * self.tick_interval
+
+    def cash_out(self, session, now):
+        """now အချိန်၏ multiplier ဖြင့် cash out လုပ်ခြင်း (မရနိုင်လျှင် None)"""
+        self.update(now)
+        if self.state != RUNNING or session.state != PLAYING:
+            return None
+        session.cashout = self.multiplier
+        session.move(CASHED_OUT)
+        self.live -= 1
+        return session
+
+class RoundEngine:
+    """Round အားလုံးကို ticker task တစ်ခုတည်းဖြင့် run သော crash engine
+
+    next_crash_point() သည် (crash point, proof) ကို ပြန်ပေးရမည်။ Player တစ်ယောက်ချင်း၏ state ကို
+    sessions (SessionRegistry) ထဲတွင် ထားသည်။ လောင်းကြေးများကို လာမည့် round ထဲ စုပြီး betting window
+    ပြည့်လျှင် round စသည်။ Tick တစ်ခါလျှင် on_frame(round) ကို တစ်ကြိမ်သာ ခေါ်ပြီး player များထံ
+    ဖြန့်ပေးခြင်းကို on_frame က လုပ်သည်။ Tick တိုင်း auto cash out target ရောက်သော session များအတွက်
+    on_cash_out(session) ကို background task ဖြင့် ခေါ်သည်။ Round ပြီးလျှင် on_crash(round) ကို ခေါ်ပြီး
+    ရှုံးသော session များကို ပိတ်သည်။ လောင်းကြေးမရှိလျှင် ticker မ run ပါ။
+    Callback များသည် message ပို့ခြင်းကို မစောင့်ဘဲ ချက်ချင်း return ပြန်ရမည်။
+
+    Round ထဲရှိ session (ဂိမ်း) အရေအတွက်ကို max_live ဖြင့် ကန့်သတ်သည်။ ပြည့်နေလျှင် လောင်းကြေးကို
+    max_waiting ခုအထိ တန်းစီထားပြီး နေရာလွတ်တိုင်း တန်းအစဉ်အတိုင်း round ထဲ ထည့်ကာ
+    on_admit(session) ကို background task ဖြင့် ခေါ်သည်။
+    """
+
+    def __init__(self, sessions, ladder, next_crash_point, on_frame, on_crash, on_cash_out, betting_window=5.0,
+                 tick_interval=1.2, on_admit=None, max_live=1000, max_waiting=1000, queue_timeout=300.0):
+        self.sessions = sessions
+        self.ladder = ladder
+        self.rates = [rate for rate, _ in ladder]
+        self.next_crash_point = next_crash_point
+        self.on_frame = on_frame
+        self.on_crash = on_crash
+        self.on_cash_out = on_cash_out
+        self.betting_window = betting_window
+        self.tick_interval = tick_interval
+        self.on_admit = on_admit
+        self.max_live = max_live
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self._round_ids = itertools.count(1)
+        self._upcoming = None       # လောင်းကြေးလက်ခံနေသော round
+        self._running = None
+        self._task = None
+        self._background = set()    # Auto cash out ငွေပေးခြင်း / ဝင်ခွင့် အကြောင်းကြားခြင်း task များ
+        self._admitting = False
+        self._stopped = False
+        sessions.on_release = self._schedule_admission
+
+    @property
+    def round_duration(self):
+        return len(self.ladder) * self.tick_interval
+
+    def snap_target(self, target):
+        """Auto cash out target ကို ladder ၏ အဆင့်သို့ ညှိခြင်း (မဖြစ်နိုင်သော target ဆိုလျှင် None)
+
+        နောက်ဆုံးအဆင့်သည် အမြဲ crash ဖြစ်သဖြင့် target အဖြစ် မရပါ။
+        """
+        step = bisect.bisect_left(self.rates, target)
+        if target <= self.rates[0] or step >= len(self.rates) - 1:
+            return None
+        return self.rates[step]
+
+    def is_full(self):
+        """ဂိမ်းနေရာ မလွတ်သဖြင့် လောင်းကြေးအသစ် တန်းစီရမည်လား"""
+        return self.sessions.live() >= self.max_live or self.sessions.waiting() > 0
+
+    def queue_full(self):
+        return self.is_full() and self.sessions.waiting() >= self.max_waiting
+
+    def place_bet(self, session, amount, message, auto_cashout=None):
+        """လောင်းကြေးစောင့်နေသော session ကို လာမည့် round ထဲ (သို့) တန်းထဲ ထည့်ခြင်း
+
+        Round ထဲ ဝင်လျှင် 0၊ တန်းစီရလျှင် တန်းစီနေရာ (1 မှစ)၊ မရနိုင်လျှင် None ကို ပြန်ပေးသည်။
+        """
+        if session.state != AWAITING_BET or self.sessions.get(session.user_id) is not session:
+            return None
+        if self._stopped or self.queue_full():
+            return None
+        session.amount = amount
+        session.message = message
+        session.auto_cashout = auto_cashout
+        if self.is_full():
+            session.move(WAITING, self.sessions.now() + self.queue_timeout)
+            return self.sessions.waiting()
+        self._join(session)
+        return 0
+
+    def _join(self, session):
+        if self._upcoming is None:
+            crash_point, proof = self.next_crash_point()
+            self._upcoming = CrashRound(
+                next(self._round_ids), crash_point, self.ladder, self.tick_interval, proof
+            )
+        rnd = self._upcoming
+        session.move(QUEUED, self.sessions.now() + self.seconds_to_start() + self.round_duration + SESSION_GRACE)
+        auto_cashout = session.auto_cashout
+        rnd.add_bet(session, bisect.bisect_left(self.rates, auto_cashout) if auto_cashout else None)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def _schedule_admission(self):
+        # Session ပိတ်သည့်နေရာ (round loop / cash out) အတွင်းမှ မဝင်စေရန် loop ၏ နောက်တစ်ကြိမ်မှ ဝင်ခွင့်ပေးသည်
+        if not self._admitting and not self._stopped and self.sessions.waiting():
+            self._admitting = True
+            asyncio.get_running_loop().call_soon(self._admit)
+
+    def _admit(self):
+        self._admitting = False
+        if self._stopped:
+            return
+        while self.sessions.live() < self.max_live:
+            session = self.sessions.next_waiting()
+            if session is None:
+                break
+            self._join(session)
+            if self.on_admit is not None:
+                self._spawn(self.on_admit(session), session)
+
+    def cash_out(self, user_id):
+        """User ၏ session ကို registry မှ ရှာပြီး server အချိန်၏ multiplier ဖြင့် cash out လုပ်ခြင်း"""
+        session = self.sessions.get(user_id)
+        if session is None or session.round is None:
+            return None
+        rnd = session.round
+        now = self.sessions.now()
+        # ကျော်ပြီးသော auto target များကို အရင်ရှင်းမှ manual cash out က target ထက် မကျော်နိုင်မည်
+        rnd.update(now)
+        self._settle(rnd.take_auto_cashouts())
+        return rnd.cash_out(session, now)
+
+    def _settle(self, due):
+        for session in due:
+            self._spawn(self.on_cash_out(session), session)
+
+    def _spawn(self, coro, session):
+        task = asyncio.create_task(self._background_task(coro, session))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _background_task(self, coro, session):
+        try:
+            await coro
+        except Exception as e:
+            logger.error(f"Crash session {session.user_id} callback error: {e}")
+
+    def seconds_to_start(self):
+        """လာမည့် round စရန် ခန့်မှန်းစက္ကန့် (run နေသော round ပြီးမှ betting window စသည်)"""
+        if self._running is None:
+            return self.betting_window
+        # Crash point ကို မဖော်ပြမိစေရန် ladder အဆုံးထိ ကြာချိန်ဖြင့် တွက်သည်
+        remaining = len(self.ladder) - 1 - self._running.step
+        return self.betting_window + remaining * self.tick_interval
+
+    async def _run(self):
+        clock = self.sessions.now
+        try:
+            while self._upcoming is not None:
+                await asyncio.sleep(self.betting_window)
+                rnd, self._upcoming = self._upcoming, None
+                self._running = rnd
+                rnd.start(clock(), clock() + self.round_duration + SESSION_GRACE)
+                rendered = None
+                while True:
+                    rnd.update(clock())
+                    self._settle(rnd.take_auto_cashouts())
+                    if rnd.state == CRASHED or not rnd.live:
+                        rnd.state = CRASHED
+                        break
+                    # နောက်ကျ၍ နိုးလာလျှင် ကျော်သွားသော အဆင့်များကို render မလုပ်ပါ
+                    if rnd.step != rendered:
+                        rendered = rnd.step
+                        await self._call(self.on_frame, rnd)
+                    await asyncio.sleep(max(0.0, rnd.next_step_at() - clock()))
+                self._running = None
+                await self._call(self.on_crash, rnd)
+                for session in rnd.live_bets():
+                    self.sessions.close(session)
+        finally:
+            self._task = None
+
+    async def _call(self, callback, rnd):
+        try:
+            await callback(rnd)
+        except Exception as e:
+            logger.error(f"Crash round {rnd.round_id} callback error: {e}")
+
+    async def stop(self):
+        """Ticker ကို ရပ်ပြီး ငွေမရှင်းရသေးသော (တန်းစီနေသူများ အပါအဝင်) session များကို ပိတ်၍ ပြန်ပေးခြင်း"""
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        open_bets = self.sessions.waiting_sessions()
+        for rnd in (self._running, self._upcoming):
+            if rnd is not None:
+                open_bets.extend(rnd.open_bets())
+        for session in open_bets:
+            self.sessions.close(session)
+        self._running = self._upcoming = None
+        # Auto cash out ငွေပေးခြင်းများ ပြီးမှ ပြန်သည်
+        if self._background:
+            await asyncio.wait(list(self._background))
+        return open_bets
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from utils.dispatcher import TokenBucket, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Frame offer တစ်ခုစီ၏ pressure EWMA အလေးချိန် (offer ~50 ခုစာကို အဓိကထားသည်)
+PRESSURE_WEIGHT = 0.02
+
+class _Chat:
+    __slots__ = ("bucket", "inflight")
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.inflight = None        # ပို့နေဆဲ edit task
+
+class EditScheduler:
+    """Global နှင့် chat တစ်ခုချင်း edit budget အတွင်းသာ message edit များကို ပို့ခြင်း
+
+    offer() သည် frame များအတွက်ဖြစ်ပြီး budget မရှိလျှင် (သို့) ထို chat တွင် edit တစ်ခု ပို့နေဆဲ
+    ဖြစ်လျှင် frame ကို ချက်ချင်း drop လုပ်သည် - နောက် frame က အစားထိုးမည်ဖြစ်သည်။
+    push() သည် ရလဒ် message များအတွက်ဖြစ်ပြီး ပို့နေဆဲ frame နှင့် budget ကို စောင့်ပြီးမှ ပို့သည်။
+
+    Global budget မလောက်၍ drop ရသော frame အချိုး (pressure၊ EWMA) နှင့် budget စောင့်နေသော ရလဒ်
+    message အရေအတွက် (backlog) သည် ကန့်သတ်ချက်ကျော်လျှင် saturated() ဖြစ်ပြီး ဂိမ်းအသစ်များကို
+    လက်မခံသင့်ပါ။ ဤ budget သည် frame များ သုံးနိုင်သည့် ဝေစုသာဖြစ်ပြီး ပို့ခြင်းကို bot ၏ outbound
+    dispatcher (utils.dispatcher) က Telegram limit အတွင်း ထပ်မံစီစဉ်သည်။
+    """
+
+    def __init__(self, global_rate=25.0, chat_rate=1.0, chat_burst=1, max_backlog=50, max_pressure=0.9,
+                 clock=time.monotonic):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_backlog = max_backlog
+        self.max_pressure = max_pressure
+        self._clock = clock
+        self._global = TokenBucket(global_rate, max(1.0, global_rate), clock())
+        self._chats = {}            # {chat key: _Chat}
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.results_sent = 0
+        self.flood_waits = 0
+        self.errors = 0
+        self.pressure = 0.0
+        self.backlog = 0            # Budget စောင့်နေသော push() အရေအတွက်
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def _chat(self, key):
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = _Chat(TokenBucket(self.chat_rate, self.chat_burst, self._clock()))
+        return chat
+
+    def offer(self, key, send):
+        """Budget ရှိလျှင် frame ကို ပို့ခြင်း (drop လုပ်လိုက်လျှင် False)"""
+        now = self._clock()
+        chat = self._chat(key)
+        if chat.inflight is not None or not chat.bucket.available(now):
+            self.frames_dropped += 1
+            return False
+        # Chat budget ရှိလျက် global budget ကြောင့် drop ရသည့် အချိုးသာ pressure ဖြစ်သည်
+        if not self._global.available(now):
+            self.pressure = self.pressure * (1 - PRESSURE_WEIGHT) + PRESSURE_WEIGHT
+            self.frames_dropped += 1
+            return False
+        self.pressure *= 1 - PRESSURE_WEIGHT
+        chat.bucket.take()
+        self._global.take()
+        self.frames_sent += 1
+        chat.inflight = asyncio.create_task(self._send(chat, send))
+        chat.inflight.add_done_callback(lambda _, chat=chat: setattr(chat, "inflight", None))
+        return True
+
+    async def push(self, key, send, attempts=3):
+        """ရလဒ် message ကို budget ရသည်အထိ စောင့်ပြီး ပို့ခြင်း (ထို chat ၏ နောက်ဆုံး message ဖြစ်သည်)"""
+        chat = self._chat(key)
+        self.backlog += 1
+        try:
+            for _ in range(attempts):
+                while chat.inflight is not None:
+                    await asyncio.wait([chat.inflight])
+                while True:
+                    now = self._clock()
+                    if chat.bucket.available(now) and self._global.available(now):
+                        break
+                    await asyncio.sleep(max(chat.bucket.wait_time(now), self._global.wait_time(now)))
+                chat.bucket.take()
+                self._global.take()
+                if await self._send(chat, send):
+                    self.results_sent += 1
+                    return True
+                if chat.bucket.blocked_until <= self._clock():
+                    return False    # Flood control မဟုတ်သော error ကို ထပ်မကြိုးစားပါ
+            return False
+        finally:
+            self.backlog -= 1
+            if self._chats.get(key) is chat and chat.inflight is None:
+                del self._chats[key]
+
+    async def _send(self, chat, send):
+        started = self._clock()
+        try:
+            await send()
+        except Exception as e:
+            retry_after = retry_after_seconds(e)
+            if retry_after is None:
+                self.errors += 1
+                logger.warning(f"Edit failed: {e}")
+                return False
+            self.flood_waits += 1
+            chat.bucket.blocked_until = self._clock() + retry_after
+            return False
+        elapsed = self._clock() - started
+        self._latency_count += 1
+        self._latency_total += elapsed
+        self._latency_max = max(self._latency_max, elapsed)
+        return True
+
+    def saturated(self):
+        """Outbound budget ပြည့်နေသဖြင့် load အသစ်ကို ငြင်းသင့်လား"""
+        return self.backlog >= self.max_backlog or self.pressure >= self.max_pressure
+
+    def metrics(self):
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "results_sent": self.results_sent,
+            "flood_waits": self.flood_waits,
+            "errors": self.errors,
+            "edit_latency_avg_ms": round(self._latency_total / self._latency_count * 1000, 1) if self._latency_count else 0.0,
+            "edit_latency_max_ms": round(self._latency_max * 1000, 1),
+            "chats": len(self._chats),
+            "backlog": self.backlog,
+            "pressure": round(self.pressure, 2),
+        }
@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+
+# --- Session states ---
+AWAITING_BET = "awaiting_bet"   # လောင်းကြေး ရိုက်ထည့်ရန် စောင့်နေသည်
+WAITING = "waiting"             # လောင်းပြီး ဂိမ်းနေရာလွတ်ရန် တန်းစီနေသည်
+QUEUED = "queued"               # လောင်းပြီး round စရန် စောင့်နေသည်
+PLAYING = "playing"             # Round run နေသည်
+CASHED_OUT = "cashed_out"       # Cash out လုပ်ပြီး အနိုင်ငွေ ပေးနေသည်
+FINISHED = "finished"           # ပြီးဆုံးသည် (registry ထဲမှ ဖယ်ရှားပြီး)
+
+TRANSITIONS = {
+    AWAITING_BET: {WAITING, QUEUED, FINISHED},
+    WAITING: {QUEUED, FINISHED},
+    QUEUED: {PLAYING, FINISHED},
+    PLAYING: {CASHED_OUT, FINISHED},
+    CASHED_OUT: {FINISHED},
+    FINISHED: set(),
+}
+# Round ထဲ ဝင်ပြီး ဂိမ်းနေရာ (frame / ရလဒ် message) ယူထားသော state များ
+LIVE_STATES = (QUEUED, PLAYING, CASHED_OUT)
+
+class CrashSession:
+    """User တစ်ယောက်၏ crash game တစ်ပွဲ - state သည် TRANSITIONS အတိုင်းသာ ပြောင်းနိုင်သည်"""
+
+    __slots__ = ("user_id", "state", "amount", "auto_cashout", "message", "round", "cashout", "deadline", "_registry")
+
+    def __init__(self, registry, user_id, deadline):
+        self._registry = registry
+        self.user_id = user_id
+        self.state = AWAITING_BET
+        self.amount = 0
+        self.auto_cashout = None    # Server က အလိုအလျောက် cash out လုပ်ပေးမည့် multiplier
+        self.message = None         # Frame များ ပြမည့် Telegram message
+        self.round = None
+        self.cashout = None         # Cash out လုပ်ခဲ့သော multiplier
+        self.deadline = deadline    # ဤအချိန်ကျော်လျှင် reaper က ဖယ်ရှားမည်
+
+    def move(self, state, deadline=None):
+        if state not in TRANSITIONS[self.state]:
+            raise ValueError(f"crash session {self.user_id}: {self.state} -> {state}")
+        previous, self.state = self.state, state
+        if deadline is not None:
+            self.deadline = deadline
+        self._registry._moved(self, previous, state)
+
+class SessionRegistry:
+    """User ID ဖြင့် ရှာသော crash session registry (lookup သည် dict တစ်ခါသာ)
+
+    Session အရေအတွက်ကို max_sessions ဖြင့် ကန့်သတ်ထားပြီး deadline ကျော်သော session များကို
+    reap() က ဖယ်ရှားသည်။ ပြီးဆုံးသော session များကို ချက်ချင်း ဖယ်ရှားသဖြင့် memory သည်
+    လက်ရှိကစားနေသူ အရေအတွက်နှင့်သာ ဆိုင်သည်။ State အလိုက် အရေအတွက်နှင့် တန်းစီနေသူများကို
+    state ပြောင်းတိုင်း update လုပ်ထားသဖြင့် live() / waiting() သည် O(1) ဖြစ်သည်။
+    LIVE_STATES မှ ထွက်သွားတိုင်း on_release() ကို ခေါ်သည် (နေရာလွတ်သဖြင့် တန်းစီသူကို ဝင်ခွင့်ပေးရန်)။
+    """
+
+    def __init__(self, max_sessions=10000, bet_timeout=120.0, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.bet_timeout = bet_timeout
+        self._clock = clock
+        self._sessions = {}         # {user_id: CrashSession}
+        self._counts = dict.fromkeys(TRANSITIONS, 0)
+        self._waiting = OrderedDict()   # {user_id: CrashSession} တန်းစီသည့် အစဉ်အတိုင်း
+        self.on_release = None
+        self.reaped = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def now(self):
+        return self._clock()
+
+    def get(self, user_id):
+        return self._sessions.get(user_id)
+
+    def _moved(self, session, previous, state):
+        self._counts[previous] -= 1
+        if state != FINISHED:
+            self._counts[state] += 1
+        if previous == WAITING:
+            self._waiting.pop(session.user_id, None)
+        elif state == WAITING:
+            self._waiting[session.user_id] = session
+        if previous in LIVE_STATES and state not in LIVE_STATES and self.on_release is not None:
+            self.on_release()
+
+    def live(self):
+        """ဂိမ်းနေရာ ယူထားသော session အရေအတွက်"""
+        return sum(self._counts[state] for state in LIVE_STATES)
+
+    def waiting(self):
+        return len(self._waiting)
+
+    def next_waiting(self):
+        return next(iter(self._waiting.values()), None)
+
+    def waiting_sessions(self):
+        return list(self._waiting.values())
+
+    def position(self, session):
+        """တန်းစီနေရာ (1 မှစ၍၊ တန်းထဲမရှိလျှင် None) - တန်းအရှည်ကို ကန့်သတ်ထားသဖြင့် scan လုပ်သည်"""
+        for position, user_id in enumerate(self._waiting, 1):
+            if user_id == session.user_id:
+                return position
+        return None
+
+    def open(self, user_id):
+        """လောင်းကြေးစောင့်သော session အသစ်ဖွင့်ခြင်း (ကစားနေဆဲ (သို့) registry ပြည့်နေလျှင် None)"""
+        session = self._sessions.get(user_id)
+        if session is not None:
+            if session.state != AWAITING_BET:
+                return None
+            session.deadline = self.now() + self.bet_timeout
+            return session
+        if len(self._sessions) >= self.max_sessions:
+            return None
+        session = self._sessions[user_id] = CrashSession(self, user_id, self.now() + self.bet_timeout)
+        self._counts[AWAITING_BET] += 1
+        return session
+
+    def close(self, session):
+        """Session ကို ပြီးဆုံးစေပြီး ဖယ်ရှားခြင်း (ထို user ၏ session အသစ်ကို မထိပါ)"""
+        if session.state != FINISHED:
+            session.move(FINISHED)
+        if self._sessions.get(session.user_id) is session:
+            del self._sessions[session.user_id]
+
+    def reap(self):
+        """Deadline ကျော်သွားသော session များကို ပြီးဆုံးစေပြီး (session, ယခင် state) များကို ပြန်ပေးခြင်း"""
+        now = self.now()
+        expired = [s for s in self._sessions.values() if s.deadline <= now]
+        reaped = []
+        for session in expired:
+            reaped.append((session, session.state))
+            self.close(session)
+        self.reaped += len(reaped)
+        return reaped
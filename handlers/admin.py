@@ -2,8 +2,13 @@ import logging
 import re
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import load_bot_state, save_bot_state, get_user_data, update_user_data, add_user_history, get_all_users
-from config import OWNER_ID
+from database import (
+    get_user_data, adjust_balance, add_user_history,
+    count_users, iter_users, user_cursor, count_pending_exchanges, get_daily_stats,
+    approve_exchange, complete_exchange, reject_exchange, get_pending_exchanges, pending_exchange_total
+)
+from config import OWNER_ID, OWNER_PROFIT_PERCENT
+from handlers.crash_game import crash_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +26,17 @@ async def admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif query.data == "admin_edit_balance":
         await admin_edit_balance_start(query, context)
     elif query.data == "admin_view_all_users":
-        await view_all_users_list(query)
+        await view_all_users_list(query, context)
+    elif query.data.startswith("admin_users_"):
+        await view_all_users_list(query, context, query.data[len("admin_users_"):])
+    elif query.data == "admin_daily_stats":
+        await show_daily_stats(query)
+    elif query.data == "admin_view_pending":
+        await show_pending_exchanges(query)
 
 async def show_admin_panel(query):
     """Admin ပင်မစာမျက်နှာ"""
-    bot_state = load_bot_state()
-    pending_exchanges = bot_state.get("pending_exchanges", {})
-    pending_count = len(pending_exchanges)
+    pending_count = count_pending_exchanges()
     
     admin_text = (
         "🧑‍💼 **Admin Control Panel**\n\n"
@@ -40,11 +49,47 @@ async def show_admin_panel(query):
         [InlineKeyboardButton(f"📥 Pending Requests ({pending_count})", callback_data="admin_view_pending")],
         [InlineKeyboardButton("⚙️ Edit User Balance (+/-)", callback_data="admin_edit_balance")],
         [InlineKeyboardButton("👥 View All Users", callback_data="admin_view_all_users")],
+        [InlineKeyboardButton("📊 Daily Stats", callback_data="admin_daily_stats")],
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")]
     ]
     
     await query.edit_message_text(admin_text, reply_markup=InlineKeyboardMarkup(keyboard))
 
+async def show_daily_stats(query):
+    """ယနေ့နှင့် ပြီးခဲ့သော ရက်များ၏ စာရင်းဇယား"""
+    days = get_daily_stats(7)
+    today = days[0]
+    wagered = today['total_wagered'] - today['refunded_bets_mmk']
+    text = (
+        f"📊 **Daily Stats ({today['date']})**\n\n"
+        f"👤 Active Users: {today['active_users']}\n"
+        f"🎮 Games Played: {today['games_played']} ({today['games_refunded']} refunded)\n"
+        f"💵 Total Wagered: {wagered} MMK ({today['refunded_bets_mmk']} MMK refunded)\n"
+        f"🏆 Total Paid Out: {today['total_paid_out']} MMK\n"
+        f"👑 Owner Profit ({int(OWNER_PROFIT_PERCENT * 100)}%): {int(wagered * OWNER_PROFIT_PERCENT)} MMK\n"
+        f"💸 Withdrawals: {today['withdrawals']} ({today['withdrawn_mmk']} MMK)\n"
+        f"↩️ Refunded: {today['refunded_mmk']} MMK\n"
+    )
+    frames = crash_metrics()
+    text += (
+        f"\n🎞️ Crash Frames: {frames['frames_sent']} sent, {frames['frames_dropped']} skipped, "
+        f"{frames['flood_waits']} flood waits\n"
+        f"⏱️ Edit Latency: {frames['edit_latency_avg_ms']} ms avg, {frames['edit_latency_max_ms']} ms max\n"
+        f"🚦 Live Games: {frames['live_games']}/{frames['max_live_games']}, {frames['waiting']} waiting, "
+        f"backlog {frames['backlog']}, pressure {frames['pressure']}\n"
+        f"📤 Outbound: {frames['outbound']['pending']} pending, {frames['outbound']['flood_waits']} flood waits, "
+        f"reply wait {frames['outbound']['wait_avg_ms']['reply']} ms avg\n"
+    )
+    if len(days) > 1:
+        text += "\n--------------------------\n"
+        for day in days[1:]:
+            text += (
+                f"📅 {day['date']}: {day['active_users']} users, {day['games_played']} games, "
+                f"{day['total_wagered'] - day['refunded_bets_mmk'] - day['total_paid_out']} MMK net\n"
+            )
+
+    await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="admin_panel")]]))
+
 # --- MMK Balance Adjustment Logic ---
 
 async def admin_edit_balance_start(query, context):
@@ -86,13 +131,12 @@ async def handle_admin_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         try:
             amount_change = int(text)
             target_uid = context.user_data.get("admin_target_uid")
-            target_data = get_user_data(target_uid)
+            # ထပ်ပို့သော message က Balance ကို နှစ်ခါ မပြင်စေရန် state ကို await မတိုင်မီ ရှင်းသည်
+            context.user_data["admin_waiting_for_amount"] = False
             
-            new_balance = max(0, target_data.get('mmk', 0) + amount_change)
-            update_user_data(target_uid, {"mmk": new_balance})
+            new_balance = await adjust_balance(target_uid, amount_change, "admin_adjust", clamp=True)
             add_user_history(target_uid, "Admin Adjustment", f"{amount_change} MMK by Owner")
             
-            context.user_data["admin_waiting_for_amount"] = False
             await update.message.reply_text(f"✅ အောင်မြင်ပါသည်။\nBalance အသစ်: {new_balance} MMK")
             
             # Notify User
@@ -104,24 +148,52 @@ async def handle_admin_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 # --- Exchange (Withdrawal) Management ---
 
+PENDING_PAGE_SIZE = 10
+
+async def show_pending_exchanges(query):
+    """စစ်ဆေးရန်ကျန်သော ငွေထုတ်လွှာများ (အရင်တင်သူ အရင်)"""
+    pending = get_pending_exchanges(PENDING_PAGE_SIZE)
+    text = f"📥 **Pending Requests: {count_pending_exchanges()}** ({pending_exchange_total()} MMK)\n\n"
+    keyboard = []
+    for info in pending:
+        text += (
+            f"#{info['id']} | 👤 `{info['user_id']}` | 💸 {info['amount']} MMK\n"
+            f"    💳 {info['payment_method']} | 📞 {info['phone']} | {info['account_name']}\n"
+        )
+        keyboard.append([
+            InlineKeyboardButton(f"✅ #{info['id']}", callback_data=f"exchange_confirm_{info['id']}"),
+            InlineKeyboardButton(f"❌ #{info['id']}", callback_data=f"exchange_cancel_{info['id']}")
+        ])
+    if not pending:
+        text += "✅ စစ်ဆေးရန် မကျန်တော့ပါ။"
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="admin_panel")])
+    await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+
+def _exchange_id(callback_data):
+    """exchange_confirm_<id> / exchange_cancel_<id> မှ ID ကို ထုတ်ယူခြင်း"""
+    try:
+        return int(callback_data.rsplit("_", 1)[1])
+    except ValueError:
+        return None
+
 async def exchange_confirm_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """ငွေထုတ်လွှာကို အတည်ပြုရန် Slip တောင်းခြင်း"""
     query = update.callback_query
-    exchange_id = query.data.split("_")[2]
-    
-    bot_state = load_bot_state()
-    exchange_info = bot_state.get("pending_exchanges", {}).get(exchange_id)
-    
+    await query.answer()
+    if query.from_user.id != OWNER_ID:
+        return
+
+    exchange_info = await approve_exchange(_exchange_id(query.data))
     if not exchange_info:
         await query.edit_message_text("❌ ဤတောင်းဆိုမှုသည် မရှိတော့ပါ။")
         return
         
     context.user_data['pending_receipt_info'] = exchange_info
-    context.user_data['pending_exchange_id'] = exchange_id
+    context.user_data['pending_exchange_id'] = exchange_info['id']
     
     await query.edit_message_text(
-        f"✅ Approved: {exchange_info['amount']} MMK\n"
-        f"User: {exchange_info['username']}\n\n"
+        f"✅ Approved #{exchange_info['id']}: {exchange_info['amount']} MMK\n"
+        f"User: {exchange_info['user_id']}\n\n"
         "ကျေးဇူးပြု၍ **ငွေလွှဲပြီးကြောင်း Slip ပုံ** ကို ပို့ပေးပါ။"
     )
 
@@ -129,10 +201,10 @@ async def handle_receipt_upload(update: Update, context: ContextTypes.DEFAULT_TY
     """Admin တင်လိုက်သော Slip ကို User ထံ ပို့ပေးခြင်း"""
     if update.effective_user.id != OWNER_ID: return
     
-    info = context.user_data.get('pending_receipt_info')
-    ex_id = context.user_data.get('pending_exchange_id')
-    
-    if not info or not update.message.photo: return
+    if not context.user_data.get('pending_receipt_info') or not update.message.photo: return
+    # ပုံနှစ်ပုံ ပြိုင်တူရောက်လျှင် တစ်ပုံသာ လုပ်ဆောင်စေရန် state ကို await မတိုင်မီ ယူထားသည်
+    info = context.user_data.pop('pending_receipt_info')
+    ex_id = context.user_data.pop('pending_exchange_id', None)
 
     photo = update.message.photo[-1].file_id
     user_id = info['user_id']
@@ -142,43 +214,73 @@ async def handle_receipt_upload(update: Update, context: ContextTypes.DEFAULT_TY
     await context.bot.send_photo(user_id, photo, caption="ငွေလွှဲပြေစာ (Receipt)")
     
     # 2. Cleanup State
-    bot_state = load_bot_state()
-    if ex_id in bot_state["pending_exchanges"]:
-        del bot_state["pending_exchanges"][ex_id]
-        save_bot_state(bot_state)
+    await complete_exchange(ex_id)
     
-    context.user_data.pop('pending_receipt_info', None)
     await update.message.reply_text("✅ Slip ကို User ထံ ပို့ပြီးပါပြီ။")
 
 async def exchange_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """ငွေထုတ်လွှာကို ပယ်ဖျက်ပြီး User ထံ ငွေပြန်ထည့်ပေးခြင်း"""
     query = update.callback_query
-    exchange_id = query.data.split("_")[2]
-    
-    bot_state = load_bot_state()
-    info = bot_state.get("pending_exchanges", {}).get(exchange_id)
-    
-    if info:
-        user_id = info['user_id']
-        refund_amount = info['amount']
-        
-        user_data = get_user_data(user_id)
-        update_user_data(user_id, {"mmk": user_data.get('mmk', 0) + refund_amount})
-        
-        del bot_state["pending_exchanges"][exchange_id]
-        save_bot_state(bot_state)
-        
-        try:
-            await context.bot.send_message(user_id, f"❌ သင်၏ ငွေထုတ်ယူမှု ပယ်ဖျက်ခံရပါသည်။ {refund_amount} MMK ကို Balance ထဲ ပြန်ထည့်ပေးထားပါသည်။")
-        except: pass
+    await query.answer()
+    if query.from_user.id != OWNER_ID:
+        return
+
+    # ငွေပြန်အမ်းခြင်းကိုပါ reject_exchange က လုပ်သည် (တစ်ကြိမ်သာ)
+    info = await reject_exchange(_exchange_id(query.data))
+    if not info:
+        await query.edit_message_text("❌ ဤတောင်းဆိုမှုသည် မရှိတော့ပါ။")
+        return
+
+    user_id = info['user_id']
+    refund_amount = info['amount']
+    try:
+        await context.bot.send_message(user_id, f"❌ သင်၏ ငွေထုတ်ယူမှု ပယ်ဖျက်ခံရပါသည်။ {refund_amount} MMK ကို Balance ထဲ ပြန်ထည့်ပေးထားပါသည်။")
+    except: pass
         
     await query.edit_message_text("❌ ငွေထုတ်လွှာကို ပယ်ဖျက်ပြီး ငွေပြန်အမ်းလိုက်ပါပြီ။")
 
-async def view_all_users_list(query):
-    """အသုံးပြုသူအားလုံးကို ကြည့်ရှုခြင်း"""
-    users = get_all_users()
-    text = f"👥 **Total Users: {len(users)}**\n\n"
-    for u in users[:15]: # ပထမ ၁၅ ယောက်ပြရန်
-        text += f"🔹 {u.get('username') or 'NoName'} (ID: `{u['user_id']}`) - {u.get('mmk', 0)} MMK\n"
-    
-    await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="admin_panel")]]))
+USERS_PAGE_SIZE = 15
+USER_SORT_OPTIONS = {"mmk": "💰 Balance", "last_active": "🕒 Active", "referral_count": "👥 Referrals"}
+
+async def view_all_users_list(query, context, action="first"):
+    """အသုံးပြုသူများကို စာမျက်နှာအလိုက် ကြည့်ရှုခြင်း (စာမျက်နှာတစ်ခုစီ၏ cursor ကို မှတ်ထားသည်)"""
+    state = context.user_data.get("admin_users")
+    if state is None or action == "first":
+        state = context.user_data["admin_users"] = {"sort": (state or {}).get("sort", "mmk"), "pages": [None]}
+    if action.startswith("sort_") and action[len("sort_"):] in USER_SORT_OPTIONS:
+        state["sort"] = action[len("sort_"):]
+        state["pages"] = [None]
+    elif action == "next" and state.get("next"):
+        state["pages"].append(state["next"])
+    elif action == "prev" and len(state["pages"]) > 1:
+        state["pages"].pop()
+
+    sort_key = state["sort"]
+    # နောက်စာမျက်နှာ ရှိမရှိ သိရန် တစ်ယောက် ပိုယူသည်
+    users = list(iter_users(state["pages"][-1], USERS_PAGE_SIZE + 1, sort_key))
+    has_next = len(users) > USERS_PAGE_SIZE
+    users = users[:USERS_PAGE_SIZE]
+    state["next"] = user_cursor(users[-1], sort_key) if has_next else None
+
+    text = f"👥 **Total Users: {count_users()}** (Page {len(state['pages'])})\n\n"
+    for u in users:
+        text += f"🔹 {u.get('username') or 'NoName'} (ID: `{u['user_id']}`) - {u.get('mmk', 0)} MMK"
+        if sort_key == "referral_count":
+            text += f" | 👥 {u.get('referral_count', 0)}"
+        elif sort_key == "last_active":
+            text += f" | 🕒 {(u.get('last_active') or '-')[:16]}"
+        text += "\n"
+
+    keyboard = [[
+        InlineKeyboardButton(f"{'✅ ' if key == sort_key else ''}{label}", callback_data=f"admin_users_sort_{key}")
+        for key, label in USER_SORT_OPTIONS.items()
+    ]]
+    nav_buttons = []
+    if len(state["pages"]) > 1:
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data="admin_users_prev"))
+    if has_next:
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data="admin_users_next"))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="admin_panel")])
+    await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
@@ -1,111 +1,386 @@
+import os
 import logging
-import random
 import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_user_data, update_user_data, add_user_history
+from database import get_user_data, adjust_balance, add_user_history
+from config import (
+    CRASH_MULTIPLIERS, CRASH_POINT_RANGE, CRASH_BETTING_WINDOW, CRASH_TICK_INTERVAL,
+    CRASH_CHAIN_FILE, CRASH_CHAIN_LENGTH, CRASH_CHAIN_SALT, CRASH_CHAIN_REFILL,
+    CRASH_EDIT_RATE_GLOBAL, CRASH_EDIT_RATE_PER_CHAT, CRASH_MAX_SESSIONS, CRASH_BET_TIMEOUT,
+    CRASH_REAP_INTERVAL, CRASH_MAX_LIVE_GAMES, CRASH_MAX_WAITING, CRASH_QUEUE_TIMEOUT,
+    CRASH_SHED_BACKLOG, CRASH_SHED_PRESSURE, MIN_BET_AMOUNT, MAX_BET_AMOUNT,
+)
+from game.fairness import HashChain, crash_point
+from game.rounds import RoundEngine
+from game.scheduler import EditScheduler
+from game.sessions import SessionRegistry, AWAITING_BET, WAITING, QUEUED, PLAYING
+from utils.dispatcher import dispatcher, FRAME
+from utils.logger import log_event
 
 logger = logging.getLogger(__name__)
 
-async def crash_game_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """ဂိမ်းစတင်ခြင်းနှင့် Multiplier တက်ခြင်း Logic"""
-    user = update.effective_user
-    user_data = get_user_data(user.id)
-    
-    # လောင်းကြေးပမာဏကို context ထဲမှယူခြင်း
+CASH_OUT_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("💰 Cash Out", callback_data="cash_out")]])
+QUEUE_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("🔄 တန်းစီနေရာ", callback_data="crash_position"),
+    InlineKeyboardButton("❌ တန်းမှထွက်မည်", callback_data="crash_leave")
+]])
+GAME_OVER_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("🚀 Play Again", callback_data="crash_game"),
+    InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
+]])
+
+# Crash Point များကို provably-fair hash chain မှ ယူသည်
+chain = HashChain(CRASH_CHAIN_FILE)
+
+# နောက် chain ကို ကြိုထုတ်ထားသော ဖိုင် (write_atomic ဖြင့် ရေးသဖြင့် ရှိလျှင် ပြည့်စုံသည်)
+NEXT_CHAIN_FILE = CRASH_CHAIN_FILE + ".next"
+_next_chain_task = None
+
+def init_crash_game():
+    """Hash chain ကို ဖွင့်ခြင်း (မရှိ/ကုန်သွားလျှင် chain အသစ်သို့ ပြောင်းသည်)"""
+    if os.path.exists(CRASH_CHAIN_FILE):
+        chain.open()
+    if chain.remaining == 0:
+        _switch_chain()
+    logger.info(f"Crash chain commitment: {chain.commitment.hex()} ({chain.remaining} games left)")
+
+def _prepare_next_chain():
+    """Chain ကုန်ခါနီးလျှင် နောက် chain ကို event loop မပိတ်ဆို့ဘဲ thread ဖြင့် ကြိုထုတ်ခြင်း"""
+    global _next_chain_task
+    if _next_chain_task is None and not os.path.exists(NEXT_CHAIN_FILE):
+        _next_chain_task = asyncio.create_task(_generate_next_chain())
+
+async def _generate_next_chain():
+    global _next_chain_task
     try:
-        bet_amount = int(context.user_data.get("current_bet", 0))
-    except:
-        await update.message.reply_text("❌ လောင်းကြေးသတ်မှတ်မှု မှားယွင်းနေပါသည်။")
+        commitment = await asyncio.to_thread(HashChain.generate, NEXT_CHAIN_FILE, CRASH_CHAIN_LENGTH)
+        logger.info(f"Next crash chain ready (commitment {commitment})")
+    except Exception as e:
+        logger.error(f"Failed to pre-generate the next crash chain: {e}")
+    finally:
+        _next_chain_task = None
+
+def _switch_chain():
+    """ကုန်သွားသော chain မှ ကြိုထုတ်ထားသော chain သို့ ပြောင်းပြီး commitment အသစ်ကို ကြေညာခြင်း"""
+    previous = chain.commitment.hex() if chain.commitment else None
+    if os.path.exists(NEXT_CHAIN_FILE):
+        chain.install(NEXT_CHAIN_FILE)
+    else:
+        # ကြိုမထုတ်ရသေးလျှင်သာ (ပထမဆုံး run / thread မပြီးသေး) ချက်ချင်း ထုတ်သည်
+        logger.warning(f"Generating a new crash hash chain of {CRASH_CHAIN_LENGTH} games")
+        HashChain.generate(CRASH_CHAIN_FILE, CRASH_CHAIN_LENGTH)
+        chain.open()
+    message = f"🔐 Crash chain commitment: {chain.commitment.hex()} ({chain.length} games)"
+    if previous:
+        message += f"\nPrevious chain {previous} is exhausted"
+    logger.warning(message)
+    log_event(message)
+
+def _next_crash_point():
+    if chain.remaining == 0:
+        _switch_chain()
+    elif chain.remaining <= CRASH_CHAIN_REFILL:
+        _prepare_next_chain()
+    _, game_hash = chain.next()
+    return crash_point(game_hash, CRASH_CHAIN_SALT, *CRASH_POINT_RANGE), game_hash.hex()
+
+# Frame edit များကို global / chat budget အတွင်းသာ ပို့သည်
+scheduler = EditScheduler(
+    CRASH_EDIT_RATE_GLOBAL, CRASH_EDIT_RATE_PER_CHAT,
+    max_backlog=CRASH_SHED_BACKLOG, max_pressure=CRASH_SHED_PRESSURE,
+)
+BUSY_TEXT = "⏳ ကစားသူများပြားနေပါသည်။ ခဏနေမှ ပြန်ကြိုးစားပါ။"
+_result_tasks = set()
+_frame_rotation = 0
+
+def _edit(bet, text, reply_markup=None):
+    # Frame / ရလဒ် များကို outbound dispatcher ၏ ဦးစားပေးအဆင့် (FRAME) ဖြင့် ပို့သည်
+    message = bet.message
+    return lambda: message.get_bot().edit_message_text(
+        text, chat_id=message.chat_id, message_id=message.message_id, reply_markup=reply_markup,
+        rate_limit_args=FRAME,
+    )
+
+def _overloaded():
+    """Outbound budget (သို့) တန်း ပြည့်နေသဖြင့် ဂိမ်းအသစ် မလက်ခံသင့်လား (load shedding)"""
+    return scheduler.saturated() or dispatcher.saturated() or engine.queue_full()
+
+async def _render_frame(rnd):
+    """Tick တစ်ခုအတွက် frame ကို တစ်ကြိမ်သာ render လုပ်ပြီး budget ရှိသော player များထံ ဖြန့်ပေးခြင်း"""
+    global _frame_rotation
+    bets = rnd.live_bets()
+    if not bets:
         return
+    header = f"📈 **Multiplier: {rnd.multiplier}x {rnd.emoji}**\n👥 ကစားနေသူ: {rnd.live} ဦး\n"
+    # Global budget မလောက်လျှင် တူညီသော player များသာ frame မရစေရန် စတင်နေရာကို လှည့်သည်
+    offset = _frame_rotation % len(bets)
+    for bet in bets[offset:] + bets[:offset]:
+        text = header + f"💰 အနိုင်ရရှိနိုင်ခြေ: {int(bet.amount * rnd.multiplier)} MMK"
+        if bet.auto_cashout:
+            text += f"\n🎯 Auto Cash Out: {bet.auto_cashout}x"
+        if scheduler.offer(bet.message.chat_id, _edit(bet, text, CASH_OUT_MARKUP)):
+            _frame_rotation += 1
 
-    # ပိုက်ဆံစစ်ဆေးခြင်း
-    if user_data.get('mmk', 0) < bet_amount:
-        await update.message.reply_text("❌ လက်ကျန်ငွေ မလုံလောက်ပါ။")
+async def _render_crash(rnd):
+    """Round ပေါက်ကွဲသွားချိန်တွင် Cash Out မလုပ်ခဲ့သူများကို အကြောင်းကြားခြင်း"""
+    logger.info(f"Crash round {rnd.round_id} crashed at {rnd.crash_point}x, hash {rnd.proof}")
+    # Round တိုင်းကို log group digest ထဲ စာကြောင်းတစ်ကြောင်းစီ ထည့်သည် (message တစ်ခုစီ မပို့ပါ)
+    log_event(
+        f"🚀 Crash #{rnd.round_id}: {rnd.crash_point}x, {len(rnd.bets)} players, "
+        f"{sum(bet.amount for bet in rnd.bets.values())} MMK wagered"
+    )
+    for bet in rnd.live_bets():
+        add_user_history(bet.user_id, "Crash Game", f"Lost {bet.amount} MMK (Crash at {rnd.multiplier}x)")
+        text = (
+            f"💥 **BOOM! {rnd.multiplier}x** မှာ ပေါက်ကွဲသွားပါပြီ။\n💸 သင် {bet.amount} MMK ရှုံးနိမ့်သွားပါသည်။\n\n"
+            f"🔐 Round Hash: `{rnd.proof}`"
+        )
+        # Ticker ကို မပိတ်ဆို့စေရန် budget စောင့်ခြင်းကို background တွင် လုပ်သည်
+        task = asyncio.create_task(scheduler.push(bet.message.chat_id, _edit(bet, text, GAME_OVER_MARKUP)))
+        _result_tasks.add(task)
+        task.add_done_callback(_result_tasks.discard)
+
+async def _settle_cash_out(session):
+    """Cash out လုပ်ပြီးသော Session ကို ငွေပေးပြီး ရလဒ်ပြကာ ပိတ်ခြင်း (manual / auto နှစ်မျိုးလုံး)"""
+    try:
+        win_amount = int(session.amount * session.cashout)
+        new_balance = await adjust_balance(session.user_id, win_amount, "crash_win")
+        auto = session.auto_cashout == session.cashout
+        add_user_history(
+            session.user_id, "Crash Win", f"Won {win_amount} MMK at {session.cashout}x" + (" (auto)" if auto else "")
+        )
+        # ပို့နေဆဲ frame က ရလဒ် message ကို ပြန်မဖုံးစေရန် scheduler မှတစ်ဆင့် ပို့သည်
+        await scheduler.push(session.message.chat_id, _edit(
+            session,
+            f"✅ **{'Auto ' if auto else ''}Cash Out အောင်မြင်ပါသည်။**\n\n"
+            f"📈 Multiplier: {session.cashout}x\n"
+            f"💰 အနိုင်ရရှိငွေ: {win_amount} MMK\n"
+            f"💵 လက်ရှိလက်ကျန်: {new_balance} MMK",
+            GAME_OVER_MARKUP
+        ))
+    finally:
+        sessions.close(session)
+
+def _joined_text(amount, auto_cashout):
+    return (
+        f"🎟️ {amount} MMK လောင်းပြီးပါပြီ။\n"
+        + (f"🤖 Auto Cash Out: {auto_cashout}x\n" if auto_cashout else "")
+        + f"⏳ Round စတင်ရန် {int(engine.seconds_to_start())} စက္ကန့်ခန့် လိုပါသည်..."
+    )
+
+def _queue_text(amount, auto_cashout, position):
+    return (
+        f"🎟️ {amount} MMK လောင်းပြီးပါပြီ။\n"
+        + (f"🤖 Auto Cash Out: {auto_cashout}x\n" if auto_cashout else "")
+        + f"🚦 ကစားသူ ပြည့်နေသဖြင့် တန်းစီထားပါသည်။ သင့်နေရာ: #{position}\n"
+        f"နေရာလွတ်သည်နှင့် နောက် Round ထဲ အလိုအလျောက် ထည့်ပေးပါမည်။"
+    )
+
+async def _render_admit(session):
+    """တန်းစီနေသူ Round ထဲ ဝင်ရသည့်အခါ အကြောင်းကြားခြင်း"""
+    await scheduler.push(session.message.chat_id, _edit(session, _joined_text(session.amount, session.auto_cashout)))
+
+def crash_metrics():
+    """Frame ပို့ခြင်းနှင့် admission ဆိုင်ရာ metrics (ကျော်ခဲ့သော frame၊ edit latency၊ တန်းစီသူ စသည်)"""
+    metrics = scheduler.metrics()
+    metrics["live_games"] = sessions.live()
+    metrics["waiting"] = sessions.waiting()
+    metrics["max_live_games"] = engine.max_live
+    metrics["outbound"] = dispatcher.metrics()
+    return metrics
+
+# User တစ်ယောက်ချင်း၏ ဂိမ်း state (context.user_data flag များအစား)
+sessions = SessionRegistry(CRASH_MAX_SESSIONS, CRASH_BET_TIMEOUT)
+
+# Player အားလုံး မျှဝေသော round engine (ticker task တစ်ခုတည်း)
+engine = RoundEngine(
+    sessions, CRASH_MULTIPLIERS, _next_crash_point, _render_frame, _render_crash, _settle_cash_out,
+    betting_window=CRASH_BETTING_WINDOW, tick_interval=CRASH_TICK_INTERVAL, on_admit=_render_admit,
+    max_live=CRASH_MAX_LIVE_GAMES, max_waiting=CRASH_MAX_WAITING, queue_timeout=CRASH_QUEUE_TIMEOUT,
+)
+_reaper_task = None
+
+def awaiting_bet(user_id):
+    """User က လောင်းကြေး ရိုက်ထည့်ရန် စောင့်နေဆဲ ဖြစ်မဖြစ် (deadline ကျော်လျှင် မစောင့်တော့ပါ)"""
+    session = sessions.get(user_id)
+    return session is not None and session.state == AWAITING_BET and session.deadline > sessions.now()
+
+def cancel_bet_prompt(user_id):
+    """အခြား menu သို့ ပြောင်းသွားလျှင် လောင်းကြေးစောင့်ခြင်းကို ဖျက်ခြင်း"""
+    session = sessions.get(user_id)
+    if session is not None and session.state == AWAITING_BET:
+        sessions.close(session)
+
+async def crash_game_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """ဂိမ်းစတင်ရန် လောင်းကြေးတောင်းသည့်အပိုင်း"""
+    query = update.callback_query
+    user = query.from_user
+
+    # User ကို လောင်းကြေးရိုက်ခိုင်းရန် Session ဖွင့်ခြင်း
+    session = sessions.get(user.id)
+    if session is not None and session.state != AWAITING_BET:
+        await query.answer("⏳ လက်ရှိ Round ပြီးဆုံးသည်အထိ စောင့်ပေးပါ။", show_alert=True)
+        return
+    # Message budget ပြည့်နေလျှင် (သို့) တန်းပြည့်နေလျှင် ဂိမ်းအသစ် မဖွင့်ပါ (load shedding)
+    if _overloaded() or sessions.open(user.id) is None:
+        await query.answer(BUSY_TEXT, show_alert=True)
         return
+    await query.answer()
 
-    # ဂိမ်းအခြေအနေသတ်မှတ်ခြင်း
-    context.user_data["is_playing"] = True
-    update_user_data(user.id, {"mmk": user_data['mmk'] - bet_amount})
-    
-    # Crash Point ကို Random သတ်မှတ်ခြင်း (1.2 မှ 10.0 ကြား)
-    crash_point = round(random.uniform(1.2, 10.0), 1)
-    
-    # +0.2 စီတိုးမည့် Multipliers စာရင်း
-    multipliers = [
-        (1.0, "🥚"), (1.2, "🐣"), (1.4, "🐥"), (1.6, "🐤"), (1.8, "🐦"),
-        (2.0, "🐧"), (2.2, "🕊️"), (2.4, "🦅"), (2.6, "🦆"), (2.8, "🦢"),
-        (3.0, "🦉"), (3.2, "🦚"), (3.4, "🦜"), (3.6, "🦄"), (3.8, "🦊"),
-        (4.0, "🦁"), (4.2, "🐯"), (4.4, "🦄"), (4.6, "🦋"), (4.8, "🐝"),
-        (5.0, "🐲"), (5.2, "🐳"), (5.4, "🐘"), (5.6, "🦒"), (5.8, "🦓"),
-        (6.0, "🐆"), (6.2, "🐎"), (6.4, "🦌"), (6.6, "🐕"), (6.8, "🐈"),
-        (7.0, "🐿️"), (7.2, "🐇"), (7.4, "🐹"), (7.6, "🐼"), (7.8, "🐨"),
-        (8.0, "🐻"), (8.2, "🐮"), (8.4, "🐷"), (8.6, "🐸"), (8.8, "🐵"),
-        (9.0, "🌛"), (9.2, "🌟"), (9.4, "🌌"), (9.6, "🛰️"), (9.8, "🛸"),
-        (10.0, "🚀")
-    ]
-
-    game_msg = await update.message.reply_text("🚀 ဂိမ်းစတင်နေပါပြီ...")
-
-    for rate, emoji in multipliers:
-        # Cash Out နှိပ်လိုက်လျှင် Loop ကိုရပ်ရန်
-        if not context.user_data.get("is_playing"):
-            return
+    await query.edit_message_text(
+        f"🚀 **Crash Game**\n\n"
+        f"💰 Your Balance: {get_user_data(user.id).get('mmk', 0)} MMK\n"
+        f"🎯 လောင်းကြေး: {MIN_BET_AMOUNT} - {MAX_BET_AMOUNT} MMK\n\n"
+        f"လောင်းလိုသော ပမာဏကို စာရိုက်ပို့ပေးပါ (ဥပမာ - {MIN_BET_AMOUNT})\n"
+        f"🤖 Auto Cash Out လိုပါက Multiplier ကိုပါ ထည့်ပါ (ဥပမာ - {MIN_BET_AMOUNT} 2.0)",
+        reply_markup=InlineKeyboardMarkup([[
+            InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
+        ]])
+    )
 
-        # Crash Point ရောက်သွားလျှင် (ရှုံးလျှင်)
-        if rate >= crash_point:
-            context.user_data["is_playing"] = False
-            await game_msg.edit_text(f"💥 **BOOM! {rate}x** မှာ ပေါက်ကွဲသွားပါပြီ။\n💸 သင် {bet_amount} MMK ရှုံးနိမ့်သွားပါသည်။")
+async def crash_game_bet_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """User ရိုက်လိုက်သော လောင်းကြေးကို စစ်ဆေးပြီး လာမည့် Round ထဲ ထည့်ခြင်း"""
+    session = sessions.get(update.effective_user.id)
+    if session is None or session.state != AWAITING_BET:
+        return
+
+    # "ပမာဏ" (သို့) "ပမာဏ Auto-Cash-Out-Multiplier" (ဥပမာ - 500 2.0)
+    parts = update.message.text.strip().lower().split()
+    if not 1 <= len(parts) <= 2 or not parts[0].isdigit():
+        await update.message.reply_text("❌ ကျေးဇူးပြု၍ ဂဏန်းသီးသန့်သာ ရိုက်ပေးပါ။")
+        return
+
+    bet_amount = int(parts[0])
+    if not MIN_BET_AMOUNT <= bet_amount <= MAX_BET_AMOUNT:
+        await update.message.reply_text(f"❌ လောင်းကြေးသည် {MIN_BET_AMOUNT} မှ {MAX_BET_AMOUNT} MMK အတွင်း ဖြစ်ရပါမည်။")
+        return
+
+    auto_cashout = None
+    if len(parts) == 2:
+        try:
+            auto_cashout = engine.snap_target(float(parts[1].rstrip("x")))
+        except ValueError:
+            pass
+        if auto_cashout is None:
+            await update.message.reply_text(
+                f"❌ Auto Cash Out သည် {CRASH_MULTIPLIERS[0][0]}x ထက်ကြီးပြီး {CRASH_MULTIPLIERS[-1][0]}x ထက်ငယ်ရပါမည်။"
+            )
             return
 
-        # Multiplier တက်နေစဉ် Message ကို Update လုပ်ခြင်း
-        await game_msg.edit_text(
-            f"📈 **Multiplier: {rate}x {emoji}**\n"
-            f"💰 အနိုင်ရရှိနိုင်ခြေ: {int(bet_amount * rate)} MMK",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("💰 Cash Out", callback_data=f"cash_out_{rate}")
-            ]])
+    user = update.effective_user
+
+    # Budget / တန်း ပြည့်နေလျှင် ငွေမနုတ်မီ ငြင်းသည် (session ကို ဆက်ထားသဖြင့် နောက်မှ ပြန်ရိုက်နိုင်သည်)
+    if _overloaded():
+        await update.message.reply_text(BUSY_TEXT)
+        return
+
+    # ပိုက်ဆံစစ်ဆေးပြီး လောင်းကြေးနုတ်ခြင်း (lock တစ်ခုအောက်တွင်)
+    if await adjust_balance(user.id, -bet_amount, "crash_bet") is None:
+        await update.message.reply_text("❌ လက်ကျန်ငွေ မလုံလောက်ပါ။")
+        return
+
+    # Session ကို place_bet ကသာ (state စစ်ပြီးမှ) ပြင်သည် - ပြိုင်တူ message က ကစားနေသော session ၏
+    # လောင်းကြေး / target ကို မပြောင်းနိုင်စေရန်
+    queued = engine.is_full()
+    if queued:
+        game_msg = await update.message.reply_text(
+            _queue_text(bet_amount, auto_cashout, sessions.waiting() + 1), reply_markup=QUEUE_MARKUP
         )
-        
-        # Multiplier တက်သည့်အရှိန် (1.2 စက္ကန့် စောင့်ခြင်း)
-        await asyncio.sleep(1.2)
+    else:
+        game_msg = await update.message.reply_text(_joined_text(bet_amount, auto_cashout))
+    position = engine.place_bet(session, bet_amount, game_msg, auto_cashout)
+    if position is None:
+        # ပြိုင်တူ message နှစ်ခုမှ တစ်ခုသာ round ထဲ ဝင်ရသည် (သို့) session သက်တမ်းကုန်/တန်းပြည့်သွားသည်
+        await adjust_balance(user.id, bet_amount, "crash_refund")
+        await game_msg.edit_text("⏳ ယခု လောင်း၍မရပါ။ လောင်းကြေးကို ပြန်ပေးပြီးပါပြီ။", reply_markup=GAME_OVER_MARKUP)
+    elif position and not queued:
+        # Message ပို့နေစဉ် နေရာပြည့်သွားသဖြင့် တန်းစီရသည်
+        await game_msg.edit_text(_queue_text(bet_amount, auto_cashout, position), reply_markup=QUEUE_MARKUP)
 
 async def cash_out_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Cash Out ခလုတ်နှိပ်သည့်အခါ အလုပ်လုပ်မည့် Function"""
+    """Cash Out ခလုတ်နှိပ်သည့်အခါ Round ၏ လက်ရှိ Multiplier ဖြင့် ငွေထုတ်ပေးခြင်း"""
     query = update.callback_query
-    
-    # ဂိမ်းကစားနေဆဲဟုတ်မဟုတ် စစ်ဆေးခြင်း
-    if not context.user_data.get("is_playing"):
-        await query.answer("❌ ဂိမ်းက ပြီးဆုံးသွားပါပြီ။", show_alert=True)
-        return
+    user_id = query.from_user.id
 
-    # ဂိမ်းကိုချက်ချင်းရပ်ခြင်း
-    context.user_data["is_playing"] = False
+    # Multiplier ကို callback data မှ မယူဘဲ Session ၏ Round မှ server အချိန်အတိုင်းသာ တွက်သည်
+    bet = engine.cash_out(user_id)
+    if bet is None:
+        session = sessions.get(user_id)
+        if session is not None and session.cashout is not None:
+            await query.answer(f"🤖 {session.cashout}x တွင် Auto Cash Out ပြီးပါပြီ။", show_alert=True)
+        else:
+            await query.answer("❌ ဂိမ်းက ပြီးဆုံးသွားပါပြီ။", show_alert=True)
+        return
     await query.answer()
 
-    # Data ခွဲထုတ်ခြင်း (cash_out_1.4 ဆိုလျှင် 1.4 ကိုယူခြင်း)
     try:
-        rate = float(query.data.split("_")[2])
-        bet_amount = context.user_data.get("current_bet", 0)
-        win_amount = int(bet_amount * rate)
-        
-        user_id = query.from_user.id
-        user_data = get_user_data(user_id)
-        
-        # ပိုက်ဆံအသစ်တွက်ချက်ပြီး Update လုပ်ခြင်း
-        new_balance = user_data.get('mmk', 0) + win_amount
-        update_user_data(user_id, {"mmk": new_balance})
-        add_user_history(user_id, "Crash Win", f"Won {win_amount} MMK at {rate}x")
-
-        await query.edit_message_text(
-            f"✅ **Cash Out အောင်မြင်ပါသည်။**\n\n"
-            f"📈 Multiplier: {rate}x\n"
-            f"💰 အနိုင်ရရှိငွေ: {win_amount} MMK\n"
-            f"💵 လက်ရှိလက်ကျန်: {new_balance} MMK",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
-            ]])
-        )
+        await _settle_cash_out(bet)
     except Exception as e:
         logger.error(f"Cashout error: {e}")
         await query.message.reply_text("❌ အမှားအယွင်းတစ်ခု ဖြစ်သွားပါသည်။")
+
+async def crash_queue_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """တန်းစီနေရာ ကြည့်ခြင်း / တန်းမှထွက်၍ လောင်းကြေးပြန်ယူခြင်း"""
+    query = update.callback_query
+    session = sessions.get(query.from_user.id)
+    if session is None or session.state != WAITING:
+        await query.answer("✅ တန်းစီခြင်း ပြီးဆုံးသွားပါပြီ။", show_alert=True)
+        return
+
+    if query.data == "crash_position":
+        await query.answer(f"🚦 သင့်တန်းစီနေရာ: #{sessions.position(session)} / {sessions.waiting()}", show_alert=True)
+        return
+
+    # Round ထဲ မဝင်ခင် session ကို ပိတ်ပြီးမှ ငွေပြန်ပေးသဖြင့် နှစ်ခါ မပေးမိပါ
+    sessions.close(session)
+    await query.answer()
+    await adjust_balance(session.user_id, session.amount, "crash_refund")
+    await query.edit_message_text(
+        f"↩️ တန်းမှ ထွက်ပြီးပါပြီ။ {session.amount} MMK ကို ပြန်ပေးပြီးပါပြီ။", reply_markup=GAME_OVER_MARKUP
+    )
+
+async def _reaper_loop():
+    """သက်တမ်းကုန် Session များကို ပုံမှန် ဖယ်ရှားပြီး ငွေမရှင်းရသေးသော လောင်းကြေးကို ပြန်ပေးခြင်း"""
+    while True:
+        await asyncio.sleep(CRASH_REAP_INTERVAL)
+        for session, state in sessions.reap():
+            if state in (WAITING, QUEUED, PLAYING):
+                logger.warning(f"Refunding abandoned crash session of {session.user_id} ({state})")
+                await _refund_reaped(session)
+
+async def _refund_reaped(session):
+    """Reaper ဖယ်ရှားသော session ၏ လောင်းကြေးကို ပြန်ပေးပြီး ဂိမ်း message တွင် အသိပေးခြင်း"""
+    try:
+        await adjust_balance(session.user_id, session.amount, "crash_refund")
+    except Exception as e:
+        logger.error(f"Crash refund failed for {session.user_id}: {e}")
+        return
+    if session.message is None:
+        return
+    try:
+        await session.message.edit_text(
+            f"⌛ ဂိမ်းအချိန်ကုန်သွားပါသည်။ {session.amount} MMK ကို ပြန်ပေးပြီးပါပြီ။",
+            reply_markup=GAME_OVER_MARKUP
+        )
+    except Exception as e:
+        logger.warning(f"Could not notify {session.user_id} of crash refund: {e}")
+
+def start_crash_reaper():
+    """Session reaper task ကို စတင်ခြင်း (event loop အတွင်းမှ ခေါ်ရန်)"""
+    global _reaper_task
+    if _reaper_task is None:
+        _reaper_task = asyncio.create_task(_reaper_loop())
+
+async def stop_crash_engine():
+    """Bot ရပ်သည့်အခါ မပြီးသေးသော Round များရှိ လောင်းကြေးများကို ပြန်ပေးခြင်း"""
+    global _reaper_task
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+        try:
+            await _reaper_task
+        except asyncio.CancelledError:
+            pass
+        _reaper_task = None
+    for bet in await engine.stop():
+        await adjust_balance(bet.user_id, bet.amount, "crash_refund")
@@ -1,7 +1,7 @@
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_user_data, update_user_data, load_bot_state, add_user_history
+from database import get_user_data, update_user_data, adjust_balance, load_bot_state, add_user_history
 from config import EVENT_REWARD_MMK
 from utils.logger import log_to_group
 
@@ -120,16 +120,9 @@ async def event_done_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return
     
-    # Mark event as completed and give reward
-    current_mmk = user_data.get("mmk", 0)
-    new_mmk = current_mmk + EVENT_REWARD_MMK
-    update_user_data(user.id, {
-        "mmk": new_mmk,
-        "event_done": True
-    })
-    
-    # Add to history
-    add_user_history(user.id, "Event", f"Completed event, earned {EVENT_REWARD_MMK} MMK")
+    # Reward ကို await မလုပ်ခင် event_done နှင့် participant နေရာကို အရင်မှတ်သဖြင့်
+    # နှစ်ချက်နှိပ်ခြင်းကြောင့် နှစ်ကြိမ် မပေးမိ၊ limit ကိုလည်း မကျော်နိုင်ပါ
+    update_user_data(user.id, {"event_done": True})
     
     # Add to participants list
     if "event_participants" not in bot_state:
@@ -145,6 +138,12 @@ async def event_done_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     from database import save_bot_state
     save_bot_state(bot_state)
     
+    # Give reward
+    new_mmk = await adjust_balance(user.id, EVENT_REWARD_MMK, "event_reward")
+    
+    # Add to history
+    add_user_history(user.id, "Event", f"Completed event, earned {EVENT_REWARD_MMK} MMK")
+    
     # Show completion message
     await query.edit_message_text(
         f"🎯 Event Completed!\n\n"
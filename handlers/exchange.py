@@ -1,8 +1,9 @@
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_user_data, update_user_data, load_bot_state, save_bot_state
+from database import get_user_data, request_exchange, get_user_exchanges
 from config import OWNER_ID
+from handlers.crash_game import cancel_bet_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +15,18 @@ async def exchange_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = query.from_user
     user_data = get_user_data(user.id)
     
-    # User ကို Amount ရိုက်ခိုင်းရန် State မှတ်ခြင်း
+    # User ကို Amount ရိုက်ခိုင်းရန် State မှတ်ခြင်း (Crash လောင်းကြေးအဖြစ် မယူမိစေရန်)
+    cancel_bet_prompt(user.id)
     context.user_data['waiting_for_exchange_amount'] = True
     
     exchange_text = (
         f"📤 **Exchange MMK**\n\n"
-        f"💰 Your MMK: {user_data.get('mmk', 0)} MMK\n\n"
-        f"ထုတ်ယူလိုသော ပမာဏကို စာရိုက်ပို့ပေးပါ (ဂဏန်းသီးသန့်) -"
+        f"💰 Your MMK: {user_data.get('mmk', 0)} MMK\n"
     )
+    pending = get_user_exchanges(user.id)
+    if pending:
+        exchange_text += f"⏳ စစ်ဆေးဆဲ ငွေထုတ်လွှာ: {len(pending)} ခု ({sum(info['amount'] for info in pending)} MMK)\n"
+    exchange_text += "\nထုတ်ယူလိုသော ပမာဏကို စာရိုက်ပို့ပေးပါ (ဂဏန်းသီးသန့်) -"
     
     await query.edit_message_text(
         exchange_text,
@@ -107,34 +112,35 @@ async def handle_payment_info_message(update: Update, context: ContextTypes.DEFA
         return
     
     phone, name = lines[0].strip(), lines[1].strip()
+    if not context.user_data.get('pending_payment_method'):
+        await update.message.reply_text("❌ ငွေလက်ခံမည့် နည်းလမ်းကို အရင်ရွေးပေးပါ။")
+        return
+    # ထပ်ပို့သော message က တောင်းဆိုမှု နှစ်ခု မတင်နိုင်စေရန် state ကို await မတိုင်မီ ရှင်းသည်
     amount = context.user_data['pending_exchange_amount']
     payment_method = context.user_data['pending_payment_method']
+    context.user_data.clear()
     method_name = "KPay" if payment_method == "kpay" else "Wave Money"
 
     # Create request and send to Owner
     await create_exchange_request(update, context, user, amount, payment_method, method_name, phone, name)
 
 async def create_exchange_request(update, context, user, amount, payment_method, method_name, phone, name):
-    user_data = get_user_data(user.id)
-    user_mmk = user_data.get('mmk', 0)
-    
-    exchange_id = f"{user.id}_{amount}_{payment_method}"
-    bot_state = load_bot_state()
-    if "pending_exchanges" not in bot_state: bot_state["pending_exchanges"] = {}
-    
-    bot_state["pending_exchanges"][exchange_id] = {
-        "user_id": user.id, "amount": amount, "payment_method": method_name,
-        "phone": phone, "account_name": name
-    }
-    save_bot_state(bot_state)
-    
-    # Balance ကို ယာယီနုတ်ထားခြင်း
-    update_user_data(user.id, {"mmk": user_mmk - amount})
+    # Balance ကို နုတ်ပြီး လွှာတင်ခြင်း (မလုံလောက်တော့ပါက တောင်းဆိုမှုကို မတင်ပါ၊ မအောင်မြင်လျှင် ပြန်အမ်းသည်)
+    try:
+        info = await request_exchange(user.id, amount, method_name, phone, name)
+    except Exception:
+        await update.message.reply_text("❌ တောင်းဆိုမှု မအောင်မြင်ပါ၊ ငွေကို ပြန်အမ်းပြီးပါပြီ")
+        return
+    if info is None:
+        await update.message.reply_text("❌ လက်ကျန်ငွေ မလုံလောက်ပါ")
+        return
+
+    exchange_id = info["id"]
     
     # Admin ထံ တောင်းဆိုမှု ပို့ခြင်း
     username = f"@{user.username}" if user.username else user.first_name
     admin_msg = (
-        f"📤 **New Exchange Request**\n\n"
+        f"📤 **New Exchange Request #{exchange_id}**\n\n"
         f"👤 User: {username} ({user.id})\n"
         f"💸 Amount: {amount} MMK\n💳 Method: {method_name}\n"
         f"📞 Phone: {phone}\n👤 Name: {name}"
@@ -147,5 +153,4 @@ async def create_exchange_request(update, context, user, amount, payment_method,
     
     await context.bot.send_message(chat_id=OWNER_ID, text=admin_msg, reply_markup=InlineKeyboardMarkup(keyboard))
     
-    context.user_data.clear()
     await update.message.reply_text("✅ Request Sent! Admin အတည်ပြုချက်ကို စောင့်ပေးပါ။")
@@ -1,8 +1,7 @@
 import logging
-import random
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_all_users, update_user_data, add_user_history
+from database import count_users, pick_random_users, transaction
 from config import OWNER_ID
 
 logger = logging.getLogger(__name__)
@@ -36,25 +35,25 @@ async def jackpot_done_callback(update: Update, context: ContextTypes.DEFAULT_TY
 
     if query.from_user.id != OWNER_ID: return
 
-    all_users = get_all_users()
-    if len(all_users) < 1:
+    total_users = count_users()
+    if total_users < 1:
         await query.edit_message_text("❌ User မရှိသေးပါ။")
         return
 
     # လူ (၅) ယောက်ကို Random ရွေးချယ်ခြင်း (ရှိသလောက် လူဦးရေပေါ် မူတည်သည်)
-    winner_count = min(5, len(all_users))
-    winners = random.sample(all_users, winner_count)
+    winner_count = min(5, total_users)
+    winners = pick_random_users(winner_count)
     reward_amount = 5000
 
+    # ကံထူးရှင်အားလုံး၏ ပိုက်ဆံနှင့် မှတ်တမ်းကို commit တစ်ကြိမ်တည်းဖြင့် ရေးခြင်း
+    async with transaction() as txn:
+        for winner in winners:
+            txn.adjust_balance(winner['user_id'], reward_amount, "jackpot")
+            txn.add_history(winner['user_id'], "Jackpot Win", f"Received {reward_amount} MMK")
+
     winner_names = []
     for winner in winners:
         user_id = winner['user_id']
-        current_mmk = winner.get('mmk', 0)
-        
-        # ပိုက်ဆံတိုးပေးခြင်း
-        update_user_data(user_id, {"mmk": current_mmk + reward_amount})
-        add_user_history(user_id, "Jackpot Win", f"Received {reward_amount} MMK")
-        
         winner_names.append(f"👤 {winner.get('username') or user_id}")
         
         # ကံထူးရှင်ထံသို့ Message ပို့ပေးခြင်း
@@ -1,10 +1,14 @@
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_user_data, update_user_data, reset_daily_spins
-from config import OWNER_ID, HELP_GROUP_ID, REFERRAL_BONUS_MMK
+from database import (
+    get_user_data, update_user_data, adjust_balance, reset_daily_spins, get_user_history,
+    get_top_users, get_user_rank, mark_user_active
+)
+from config import OWNER_ID, HELP_GROUP_ID, REFERRAL_BONUS_MMK, HISTORY_PAGE_SIZE, LEADERBOARD_SIZE
 from datetime import date
 from utils.logger import log_to_group
+from handlers.crash_game import cancel_bet_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Get user data
     user_data = get_user_data(user.id)
     update_user_data(user.id, {"username": user.username or ""})
+    mark_user_active(user.id)
     
     welcome_text = (
         f"🎉 Welcome {user.first_name}!\n\n"
@@ -47,6 +52,7 @@ def get_main_menu_keyboard(user_id):
         [InlineKeyboardButton("💸 Exchange MMK", callback_data="exchange")],
         [InlineKeyboardButton("📨 Invite Friends", callback_data="invite_friends")],
         [InlineKeyboardButton("💰 My MMK", callback_data="my_points")],
+        [InlineKeyboardButton("🏆 Leaderboard", callback_data="leaderboard")],
         [InlineKeyboardButton("📜 History", callback_data="history")],
         [InlineKeyboardButton("❓ အကူအညီရယူရန်", callback_data="get_help")]
     ]
@@ -69,12 +75,17 @@ async def main_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if query.data == "my_points":
         await show_my_points(query, user_data)
     elif query.data == "history":
-        await show_history(query, user_data)
+        await show_history(query, user.id)
+    elif query.data.startswith("history_"):
+        await show_history(query, user.id, int(query.data.split("_")[1]))
+    elif query.data == "leaderboard":
+        await show_leaderboard(query, user.id)
     elif query.data == "invite_friends":
         await show_invite_friends(query, user.id)
     elif query.data == "get_help":
         await show_help_options(query)
     elif query.data == "main_menu":
+        cancel_bet_prompt(user.id)
         welcome_text = (
             f"🎉 Welcome {user.first_name}!\n\n"
             f"💰 Your MMK: {user_data.get('mmk', 0)} MMK\n"
@@ -91,15 +102,12 @@ async def handle_referral(user_id, referrer_id, context):
     referrer_data = get_user_data(referrer_id)
     
     if not user_data.get('referred_by') and referrer_data:
+        # Update များ ပြိုင်တူ run သဖြင့် ဖတ်/ရေးခြင်းကို await မတိုင်မီ တစ်ဆက်တည်း ပြီးအောင်လုပ်သည်
         update_user_data(user_id, {"referred_by": referrer_id})
-        current_mmk = referrer_data.get('mmk', 0)
-        ref_count = referrer_data.get('referral_count', 0)
+        update_user_data(referrer_id, {"referral_count": referrer_data.get('referral_count', 0) + 1})
         
         # သူငယ်ချင်းဖိတ်လျှင် ဆုကြေးပေးရန် (ဥပမာ 100 MMK)
-        update_user_data(referrer_id, {
-            "mmk": current_mmk + 100,
-            "referral_count": ref_count + 1
-        })
+        await adjust_balance(referrer_id, 100, "referral_bonus")
         
         try:
             await context.bot.send_message(
@@ -148,17 +156,38 @@ async def show_my_points(query, user_data):
         InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
     ]]))
 
-async def show_history(query, user_data):
-    """Show action history"""
-    history = user_data.get("history", [])
+async def show_leaderboard(query, user_id):
+    """MMK အများဆုံး User များနှင့် ကိုယ့်အဆင့်"""
+    medals = ["🥇", "🥈", "🥉"]
+    leaderboard_text = "🏆 Leaderboard\n\n"
+    for position, record in enumerate(get_top_users(LEADERBOARD_SIZE), 1):
+        name = record.get("username") or f"User {record.get('user_id')}"
+        badge = medals[position - 1] if position <= len(medals) else f"{position}."
+        leaderboard_text += f"{badge} {name} - {record.get('mmk', 0)} MMK\n"
+    rank, total = get_user_rank(user_id)
+    leaderboard_text += f"\n📍 Your Rank: {rank} / {total}"
+
+    await query.edit_message_text(leaderboard_text, reply_markup=InlineKeyboardMarkup([[
+        InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
+    ]]))
+
+async def show_history(query, user_id, page=0):
+    """Show action history (အသစ်ဆုံးမှစ၍ စာမျက်နှာအလိုက်)"""
+    history, total = get_user_history(user_id, page * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE)
     if not history:
         history_text = "📜 No history found."
     else:
-        history_text = "📜 Your Recent Activity\n\n"
-        for entry in history[-10:]:
+        pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        history_text = f"📜 Your Recent Activity ({page + 1}/{pages})\n\n"
+        for entry in history:
             date_str = entry.get("timestamp", "").split("T")[0]
             history_text += f"📅 {date_str}\n{entry.get('action','')}: {entry.get('details','')}\n\n"
-    
-    await query.edit_message_text(history_text, reply_markup=InlineKeyboardMarkup([[
-        InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")
-    ]]))
+
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton("⬅️ Newer", callback_data=f"history_{page - 1}"))
+    if (page + 1) * HISTORY_PAGE_SIZE < total:
+        nav_buttons.append(InlineKeyboardButton("Older ➡️", callback_data=f"history_{page + 1}"))
+    keyboard = [nav_buttons] if nav_buttons else []
+    keyboard.append([InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")])
+    await query.edit_message_text(history_text, reply_markup=InlineKeyboardMarkup(keyboard))
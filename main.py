@@ -3,10 +3,13 @@ import os
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters
 from telegram.ext import ContextTypes
 from config import BOT_TOKEN, OWNER_ID
-from database import init_database
+from database import init_database, start_flusher, stop_flusher
 # handlers.menu မှ လိုအပ်သော function များအားလုံးကို import လုပ်ထားပါသည်
-from handlers.menu import start, main_menu_callback, show_my_points, show_history, show_invite_friends, show_help_options 
-from handlers.crash_game import crash_game_start, cash_out_callback
+from handlers.menu import start, main_menu_callback, show_my_points, show_invite_friends, show_help_options 
+from handlers.crash_game import (
+    crash_game_start, crash_game_bet_handler, cash_out_callback, crash_queue_callback, awaiting_bet,
+    init_crash_game, start_crash_reaper, stop_crash_engine
+)
 from handlers.exchange import exchange_callback, exchange_manual_amount_handler, handle_payment_method_selection, handle_payment_info_message
 from handlers.jackpot import jackpot_control_callback, jackpot_done_callback
 from handlers.admin import (
@@ -15,19 +18,47 @@ from handlers.admin import (
     exchange_cancel_callback,
     handle_receipt_upload
 )
-from utils.logger import setup_logging
+from utils.logger import setup_logging, digest
+from utils.dispatcher import dispatcher
 
 # Set up logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+async def on_startup(application):
+    """Event loop စတင်ပြီးနောက် background task များကို စတင်ခြင်း"""
+    start_flusher()
+    start_crash_reaper()
+    digest.start(application.bot)
+
+async def on_stop(application):
+    """Bot ကို shutdown မလုပ်ခင် ကျန်နေသော log digest ကို ပို့ခြင်း"""
+    await digest.stop()
+
+async def on_shutdown(application):
+    """Bot ရပ်သည့်အခါ memory ထဲရှိ data များကို သိမ်းဆည်းခြင်း"""
+    await stop_crash_engine()
+    await stop_flusher()
+
 def main():
     """Start the bot."""
     # Initialize database
     init_database()
+    init_crash_game()
     
     # Create the Application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        # Balance mutation များကို per-user lock ဖြင့် ကာကွယ်ထားသဖြင့် update များကို ပြိုင်တူ run နိုင်သည်
+        .concurrent_updates(True)
+        # Message ပို့/ပြင်ခြင်း အားလုံးကို Telegram limit အတွင်း priority အလိုက် ပို့သည်
+        .rate_limiter(dispatcher)
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
 
     # --- Add command handlers ---
     application.add_handler(CommandHandler("start", start))
@@ -36,13 +67,15 @@ def main():
     # Main Menu & Basic Actions (Pattern များကို ခွဲခြားသတ်မှတ်ထားပါသည်)
     application.add_handler(CallbackQueryHandler(main_menu_callback, pattern="^main_menu$"))
     application.add_handler(CallbackQueryHandler(show_my_points, pattern="^my_points$"))
-    application.add_handler(CallbackQueryHandler(show_history, pattern="^history$"))
+    application.add_handler(CallbackQueryHandler(main_menu_callback, pattern="^history(_\\d+)?$"))
+    application.add_handler(CallbackQueryHandler(main_menu_callback, pattern="^leaderboard$"))
     application.add_handler(CallbackQueryHandler(show_invite_friends, pattern="^invite_friends$"))
     application.add_handler(CallbackQueryHandler(show_help_options, pattern="^get_help$"))
     
      # Crash Game
     application.add_handler(CallbackQueryHandler(crash_game_start, pattern="^crash_game$"))
-    application.add_handler(CallbackQueryHandler(cash_out_callback, pattern="^cash_out_"))
+    application.add_handler(CallbackQueryHandler(cash_out_callback, pattern="^cash_out"))
+    application.add_handler(CallbackQueryHandler(crash_queue_callback, pattern="^crash_(position|leave)$"))
 
     # Exchange MMK (စနစ်သစ်နှင့် ကိုက်ညီအောင် ပြင်ဆင်ထားပါသည်)
     application.add_handler(CallbackQueryHandler(exchange_callback, pattern="^exchange$"))
@@ -71,7 +104,7 @@ async def handle_all_text_inputs(update, context):
     user_data = context.user_data
     
     # 1. Crash Game လောင်းကြေး စစ်ဆေးခြင်း
-    if user_data.get("waiting_for_bet"):
+    if awaiting_bet(update.effective_user.id):
         await crash_game_bet_handler(update, context)
         
     # 2. Exchange Amount စစ်ဆေးခြင်း
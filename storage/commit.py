@@ -0,0 +1,44 @@
+import asyncio
+
+class GroupCommit:
+    """Window အတွင်း ဝင်လာသော commit တောင်းဆိုမှုများကို sync တစ်ကြိမ်တည်းဖြင့် ပြီးစေခြင်း
+
+    ပထမဆုံး ခေါ်သူက window (စက္ကန့်) စောင့်ပြီး sync ကို thread ထဲတွင် run သည်။ ထိုအတောအတွင်း
+    commit() ခေါ်သူအားလုံးသည် တူညီသော sync ကိုသာ စောင့်သည်။ Sync တစ်ကြိမ်သာ တစ်ချိန်တည်း
+    run သဖြင့် နောက်အသုတ်သည် ယခင်အသုတ် ပြီးမှ စသည်။
+    """
+
+    def __init__(self, sync, window=0.003):
+        self._sync = sync
+        self.window = window
+        self._next = None       # စုဆောင်းနေဆဲ အသုတ်၏ future
+        self._running = None    # Sync လုပ်နေဆဲ အသုတ်၏ future
+        self.requests = 0
+        self.commits = 0
+
+    async def commit(self):
+        """ယခုအချိန်အထိ ရေးထားသော data များ durable ဖြစ်သည်အထိ စောင့်ခြင်း"""
+        self.requests += 1
+        if self._next is None:
+            loop = asyncio.get_running_loop()
+            self._next = loop.create_future()
+            loop.create_task(self._run(self._next))
+        # ခေါ်သူ cancel ဖြစ်လည်း အခြားသူများ၏ sync ကို မထိခိုက်စေရန်
+        await asyncio.shield(self._next)
+
+    async def _run(self, future):
+        if self.window:
+            await asyncio.sleep(self.window)
+        if self._running is not None:
+            await asyncio.wait([self._running])
+        # ဤနေရာမှစ၍ ဝင်လာသော commit များသည် နောက်အသုတ်ထဲ ပါမည်
+        self._next = None
+        self._running = future
+        try:
+            await asyncio.to_thread(self._sync)
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self.commits += 1
+            self._running = None
@@ -0,0 +1,222 @@
+import json
+import os
+import time
+import logging
+import threading
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+APPROVED = "approved"     # Admin လက်ခံပြီး Slip စောင့်နေဆဲ
+PAID = "paid"
+REJECTED = "rejected"
+OPEN_STATUSES = (PENDING, APPROVED)
+
+class ExchangeQueue:
+    """ငွေထုတ်လွှာများ၏ queue (ID တိုးသွားသော၊ user နှင့် status အလိုက် index ပါသော)
+
+    ပြီးဆုံးခြင်းမရှိသေးသော (pending/approved) လွှာများကိုသာ memory ထဲတွင် ထားသည်။
+    ပြောင်းလဲမှုတိုင်းကို append-only log ထဲတွင် တစ်ကြောင်းစီ ရေးပြီး ပြီးဆုံးသွားသော
+    လွှာများ များလာလျှင် compact လုပ်သည်။
+    """
+
+    def __init__(self, log_file, fsync=True):
+        self.log_file = log_file
+        self.fsync = fsync
+        self.next_id = 1
+        self._items = {}                                    # {exchange_id: info}
+        self._by_status = {status: {} for status in OPEN_STATUSES}  # FIFO အစဉ် (dict ကို ordered set အဖြစ်)
+        self._by_user = {}                                  # {user_id: {exchange_id, ...}}
+        self._pending_total = 0
+        self._fh = None
+        self._fh_lock = threading.Lock()    # Compact ၏ ဖိုင်အစားထိုးခြင်းနှင့် write/flush ကို ခွဲရန်
+        self._compacting = None             # Compact လုပ်နေစဉ် ဝင်လာသော ကြောင်းများ
+        self._log_lines = 0
+
+    @property
+    def is_open(self):
+        return self._fh is not None
+
+    def exists(self):
+        return os.path.exists(self.log_file)
+
+    def open(self):
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        logger.warning(f"Skipping bad line in {self.log_file}")
+                        continue
+                    self._log_lines += 1
+        self._fh = open(self.log_file, 'a', encoding='utf-8')
+        logger.info(f"Exchange queue loaded: {len(self._items)} open requests")
+
+    # --- Log ---
+
+    def _apply(self, op):
+        if "next" in op:
+            self.next_id = max(self.next_id, op["next"])
+        elif "info" in op:
+            self._add(op["id"], op["info"])
+        else:
+            self._set_status(op["id"], op["status"])
+
+    def _write(self, op):
+        line = json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._fh_lock:
+            self._fh.write(line)
+            if self._compacting is not None:
+                self._compacting.append(line)
+            self._log_lines += 1
+
+    def sync(self):
+        """ရေးထားသော ကြောင်းများကို disk ပေါ်သို့ ရောက်အောင် လုပ်ခြင်း (thread ထဲတွင် run နိုင်သည်)"""
+        with self._fh_lock:
+            fh = self._fh
+            if fh is None:
+                return
+            fh.flush()
+        try:
+            if self.fsync:
+                os.fsync(fh.fileno())
+        except ValueError:
+            pass  # Compact က fsync လုပ်ပြီး အစားထိုးလိုက်သော ဖိုင် (ကြောင်းအားလုံး ဖိုင်အသစ်ထဲ ပါသည်)
+
+    # --- Indexes ---
+
+    def _add(self, exchange_id, info):
+        self._items[exchange_id] = info
+        self._by_status[info["status"]][exchange_id] = None
+        self._by_user.setdefault(info["user_id"], set()).add(exchange_id)
+        if info["status"] == PENDING:
+            self._pending_total += info["amount"]
+        self.next_id = max(self.next_id, exchange_id + 1)
+
+    def _set_status(self, exchange_id, status):
+        info = self._items[exchange_id]
+        del self._by_status[info["status"]][exchange_id]
+        if info["status"] == PENDING:
+            self._pending_total -= info["amount"]
+        info["status"] = status
+        if status in OPEN_STATUSES:
+            self._by_status[status][exchange_id] = None
+            return info
+        # ပြီးဆုံးသွားသော လွှာကို memory ထဲမှ ဖယ်ရှားခြင်း
+        del self._items[exchange_id]
+        user_ids = self._by_user[info["user_id"]]
+        user_ids.discard(exchange_id)
+        if not user_ids:
+            del self._by_user[info["user_id"]]
+        return info
+
+    # --- Operations ---
+
+    def submit(self, user_id, amount, payment_method, phone, account_name, created_at=None):
+        """လွှာအသစ်တင်ခြင်း (ID အသစ်ကို ပြန်ပေးသည်)"""
+        exchange_id = self.next_id
+        info = {
+            "id": exchange_id, "user_id": user_id, "amount": amount, "payment_method": payment_method,
+            "phone": phone, "account_name": account_name, "status": PENDING,
+            "created_at": int(created_at if created_at is not None else time.time()),
+        }
+        self._add(exchange_id, info)
+        self._write({"id": exchange_id, "info": info})
+        return info
+
+    def skip_to(self, next_id):
+        """next_id မတိုင်မီ ID များကို နောက်ထပ် မသုံးစေရန် မှတ်ခြင်း"""
+        if next_id > self.next_id:
+            self.next_id = next_id
+            self._write({"next": next_id})
+
+    def get(self, exchange_id):
+        return self._items.get(exchange_id)
+
+    def transition(self, exchange_id, from_statuses, status):
+        """လွှာ၏ status ကို ပြောင်းခြင်း (လက်ရှိ status မကိုက်ညီလျှင် None ပြန်ပေးသည်)"""
+        info = self._items.get(exchange_id)
+        if info is None or info["status"] not in from_statuses:
+            return None
+        info = self._set_status(exchange_id, status)
+        self._write({"id": exchange_id, "status": status})
+        return info
+
+    def count(self, status=PENDING):
+        return len(self._by_status[status])
+
+    @property
+    def pending_total(self):
+        return self._pending_total
+
+    def oldest(self, limit, status=PENDING):
+        """တင်ထားသည့်အစဉ်အတိုင်း (FIFO) လွှာ limit ခု"""
+        result = []
+        for exchange_id in self._by_status[status]:
+            if len(result) >= limit:
+                break
+            result.append(self._items[exchange_id])
+        return result
+
+    def for_user(self, user_id):
+        return [self._items[exchange_id] for exchange_id in sorted(self._by_user.get(user_id, ()))]
+
+    # --- Compaction ---
+
+    def needs_compaction(self):
+        return self._compacting is None and self._log_lines > 2 * len(self._items) + 1000
+
+    def begin_compaction(self):
+        """ပြီးဆုံးပြီးသော လွှာများကို log ထဲမှ ဖယ်ရှားမည့် function ကို ပြန်ပေးခြင်း (thread ထဲတွင် run နိုင်သည်)
+
+        ဖွင့်ထားသော လွှာများကို ယခု capture လုပ်ပြီး ထို့နောက် ဝင်လာသော ကြောင်းများကို ဖိုင်အသစ်၏
+        နောက်တွင် ထပ်ရေးသည်။ ဖိုင်အစားထိုးခြင်းကို _fh_lock အောက်တွင် လုပ်သဖြင့် sync() နှင့် မတိုက်ပါ။
+        """
+        lines = [json.dumps({"next": self.next_id}) + "\n"] + [
+            json.dumps({"id": exchange_id, "info": info}, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for exchange_id, info in self._items.items()
+        ]
+        self._compacting = []
+        tmp_file = self.log_file + ".tmp"
+
+        def write():
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                with self._fh_lock:
+                    with open(tmp_file, 'a', encoding='utf-8') as f:
+                        f.writelines(self._compacting)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._fh.close()
+                    os.replace(tmp_file, self.log_file)
+                    serializers.fsync_directory(self.log_file)
+                    self._fh = open(self.log_file, 'a', encoding='utf-8')
+                    self._log_lines = len(lines) + len(self._compacting)
+                    self._compacting = None
+            except Exception:
+                with self._fh_lock:
+                    self._compacting = None
+                    if self._fh.closed:
+                        self._fh = open(self.log_file, 'a', encoding='utf-8')
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                raise
+            logger.info(f"Exchange log compacted to {self._log_lines} lines")
+        return write
+
+    def compact(self):
+        """ပြီးဆုံးပြီးသော လွှာများကို log ထဲမှ ချက်ချင်း ဖယ်ရှားခြင်း"""
+        self.begin_compaction()()
+
+    def close(self):
+        if self._fh is not None:
+            self.sync()
+            self._fh.close()
+            self._fh = None
@@ -0,0 +1,230 @@
+import json
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+# History action များကို ဂဏန်း code ဖြင့် သိမ်းသည် (စာရင်းထဲမပါသော action ကို string အတိုင်း သိမ်းသည်)
+# စာရင်းနောက်ဆုံးတွင်သာ ထပ်တိုးပါ - code များသည် log ဖိုင်ထဲတွင် ရှိနေပြီးဖြစ်သည်
+ACTIONS = ["Crash Game", "Crash Win", "Jackpot Win", "Admin Adjustment", "Event", "Exchange", "Spin"]
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+DAY_SECONDS = 86400
+
+def encode_action(action):
+    return _ACTION_CODES.get(action, action)
+
+def decode_action(code):
+    return ACTIONS[code] if isinstance(code, int) else code
+
+def to_epoch(timestamp):
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+class HistoryStore:
+    """User တစ်ယောက်ချင်းစီ၏ history ကို fixed-size ring buffer ဖြင့် ထားသော store
+
+    Entry တစ်ခုသည် (epoch timestamp, action code, details) tuple ဖြစ်ပြီး append သည် O(1) ဖြစ်သည်။
+    Disk ပေါ်တွင် `[user_id, ts, code, details]` တစ်ကြောင်းစီ append-only log အဖြစ်သိမ်းပြီး
+    buffer ထဲမှ ကျသွားသော entry များ များလာလျှင် compact လုပ်သည်။
+    သက်တမ်းကုန် entry များကို ရှာရန် ရက် (UTC) အလိုက် user_id များကို index လုပ်ထားသည်။
+    Expire လုပ်လိုက်သော user အတွက် `[user_id, cutoff]` tombstone ကြောင်းကို log ထဲရေးသဖြင့်
+    restart ဖြစ်လျှင် cutoff မတိုင်မီ entry များ ပြန်မပေါ်လာပါ (compact လုပ်လျှင် tombstone များ ပျောက်သည်)။
+    """
+
+    def __init__(self, log_file, capacity=50):
+        self.log_file = log_file
+        self.capacity = capacity
+        self._buffers = {}          # {user_id_str: deque}
+        self._fh = None
+        self._fh_lock = threading.Lock()    # finish_compaction (thread) ၏ ဖိုင်အစားထိုးခြင်းနှင့် write ကို ခွဲရန်
+        self._log_lines = 0         # Log ဖိုင်ထဲရှိ စုစုပေါင်းကြောင်းရေ
+        self._live_entries = 0      # Buffer များထဲရှိ entry အရေအတွက်
+        self._compacting = None     # Compact လုပ်နေစဉ် ဝင်လာသော ကြောင်းများ
+        self._day_index = {}        # {epoch day: ထိုရက်တွင် entry ရှိသော user_id_str များ}
+
+    @property
+    def is_open(self):
+        return self._fh is not None
+
+    def exists(self):
+        return os.path.exists(self.log_file)
+
+    def open(self):
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        fields = json.loads(line)
+                        if len(fields) == 2:
+                            self._drop_before(*fields)
+                        else:
+                            user_id_str, ts, code, details = fields
+                            self._push(user_id_str, (ts, code, details))
+                    except (TypeError, ValueError):
+                        logger.warning(f"Skipping bad line in {self.log_file}")
+                        continue
+                    self._log_lines += 1
+        self._fh = open(self.log_file, 'a', encoding='utf-8')
+        logger.info(f"History loaded: {len(self._buffers)} users, {self._live_entries} entries")
+
+    def _push(self, user_id_str, entry):
+        buffer = self._buffers.get(user_id_str)
+        if buffer is None:
+            buffer = self._buffers[user_id_str] = deque(maxlen=self.capacity)
+        if len(buffer) < self.capacity:
+            self._live_entries += 1
+        buffer.append(entry)
+        day = entry[0] // DAY_SECONDS
+        users = self._day_index.get(day)
+        if users is None:
+            users = self._day_index[day] = set()
+        users.add(user_id_str)
+
+    def _drop_before(self, user_id_str, cutoff):
+        """User ၏ buffer ရှေ့ဆုံးမှ cutoff မတိုင်မီ entry များကို ဖယ်ပြီး အရေအတွက်ကို ပြန်ပေးခြင်း"""
+        buffer = self._buffers.get(user_id_str)
+        if buffer is None:
+            return 0
+        removed = 0
+        # Buffer သည် အချိန်အစဉ်လိုက်ဖြစ်၍ ရှေ့ဆုံးမှ ကုန်ဆုံးသော entry များကိုသာ ဖယ်ရသည်
+        while buffer and buffer[0][0] < cutoff:
+            buffer.popleft()
+            removed += 1
+        self._live_entries -= removed
+        if not buffer:
+            del self._buffers[user_id_str]
+        return removed
+
+    def _write_line(self, line):
+        with self._fh_lock:
+            self._fh.write(line)
+            self._log_lines += 1
+            if self._compacting is not None:
+                self._compacting.append(line)
+
+    def append(self, user_id, action, details, timestamp=None):
+        """Entry တစ်ခုကို buffer နှင့် log ထဲ ထည့်ခြင်း (fsync မလုပ်ပါ၊ flush() တွင် ရေးသည်)"""
+        user_id_str = str(user_id)
+        entry = (int(timestamp if timestamp is not None else time.time()), encode_action(action), details)
+        self._push(user_id_str, entry)
+        self._write_line(json.dumps([user_id_str, *entry], ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def count(self, user_id):
+        buffer = self._buffers.get(str(user_id))
+        return len(buffer) if buffer else 0
+
+    def page(self, user_id, offset=0, limit=10):
+        """အသစ်ဆုံးမှစ၍ offset/limit အလိုက် entry များကို dict list အဖြစ် ပြန်ပေးခြင်း"""
+        buffer = self._buffers.get(str(user_id))
+        if not buffer:
+            return []
+        entries = []
+        # deque ကို နောက်မှ ပြန်ဖတ်ခြင်း (limit အရေအတွက်သာ ထုတ်သည်)
+        for index in range(len(buffer) - 1 - offset, max(len(buffer) - 1 - offset - limit, -1), -1):
+            ts, code, details = buffer[index]
+            entries.append({
+                "timestamp": datetime.fromtimestamp(ts).isoformat(),
+                "action": decode_action(code),
+                "details": details,
+            })
+        return entries
+
+    def import_records(self, records):
+        """User record ဟောင်းများထဲရှိ history ကို ring buffer ထဲသို့ ကူးယူခြင်း"""
+        imported = 0
+        for user_id_str, record in records:
+            for entry in record.history:
+                self.append(user_id_str, entry.get("action", ""), entry.get("details", ""),
+                            to_epoch(entry.get("timestamp")))
+                imported += 1
+        self.flush()
+        return imported
+
+    def expire(self, cutoff, max_users=None):
+        """cutoff (epoch) မတိုင်မီ ရက်များ၏ entry များကို ရက်လိုက် ဖယ်ရှားခြင်း
+
+        User အများဆုံး max_users ယောက်ကိုသာ စစ်ပြီး ရပ်သည် (နောက်တစ်ကြိမ်တွင် ဆက်လုပ်သည်)။
+        ဖယ်ရှားလိုက်သော entry အရေအတွက်ကို ပြန်ပေးသည်။ ဖယ်ရှားမှုကို tombstone ဖြင့် log ထဲ မှတ်သည်
+        (fsync မလုပ်ပါ၊ flush() တွင် ရေးသည်)။
+        """
+        cutoff_day = cutoff // DAY_SECONDS
+        removed = 0
+        processed = 0
+        while self._day_index:
+            day = min(self._day_index)
+            if day >= cutoff_day:
+                break
+            users = self._day_index[day]
+            day_end = (day + 1) * DAY_SECONDS
+            while users:
+                if max_users is not None and processed >= max_users:
+                    return removed
+                user_id_str = users.pop()
+                processed += 1
+                dropped = self._drop_before(user_id_str, day_end)
+                if dropped:
+                    removed += dropped
+                    self._write_line(json.dumps([user_id_str, day_end], separators=(",", ":")) + "\n")
+            del self._day_index[day]
+        return removed
+
+    def flush(self):
+        with self._fh_lock:
+            if self._fh is not None:
+                self._fh.flush()
+
+    def needs_compaction(self):
+        return self._compacting is None and self._log_lines > 2 * self._live_entries + 1000
+
+    def begin_compaction(self):
+        """Buffer ထဲရှိ entry များကိုသာ ဖိုင်အသစ်ထဲ ရေးမည့် function ကို ပြန်ပေးခြင်း (thread ထဲတွင် run နိုင်သည်)"""
+        lines = [
+            json.dumps([user_id_str, *entry], ensure_ascii=False, separators=(",", ":")) + "\n"
+            for user_id_str, buffer in self._buffers.items() for entry in buffer
+        ]
+        self._compacting = []
+        tmp_file = self.log_file + ".tmp"
+
+        def write():
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+        return write
+
+    def finish_compaction(self):
+        """Compact လုပ်နေစဉ် ဝင်လာသော entry များကို ထပ်ရေးပြီး ဖိုင်အသစ်ဖြင့် အစားထိုးခြင်း (thread ထဲတွင် run နိုင်သည်)"""
+        tmp_file = self.log_file + ".tmp"
+        with self._fh_lock:
+            with open(tmp_file, 'a', encoding='utf-8') as f:
+                f.writelines(self._compacting)
+                f.flush()
+                os.fsync(f.fileno())
+            self._fh.close()
+            os.replace(tmp_file, self.log_file)
+            serializers.fsync_directory(self.log_file)
+            self._fh = open(self.log_file, 'a', encoding='utf-8')
+            self._log_lines = self._live_entries
+            self._compacting = None
+        logger.info(f"History log compacted to {self._log_lines} entries")
+
+    def abort_compaction(self):
+        with self._fh_lock:
+            self._compacting = None
+            if self._fh is not None and self._fh.closed:
+                self._fh = open(self.log_file, 'a', encoding='utf-8')
+        try:
+            os.remove(self.log_file + ".tmp")
+        except OSError:
+            pass
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
@@ -0,0 +1,288 @@
+import json
+import os
+import heapq
+import zlib
+import random
+import logging
+import threading
+from itertools import chain
+from storage import serializers
+from storage.leaderboard import FieldIndex
+from storage.records import FIELDS, UserRecord
+
+logger = logging.getLogger(__name__)
+
+def default_bot_state():
+    return {"current_event": None, "event_participants": [], "pending_exchanges": {}}
+
+def shard_of(user_id_str, shard_count):
+    """user_id ၏ hash ဖြင့် shard နံပါတ်ကို ရွေးခြင်း (process restart ဖြစ်လည်း မပြောင်းပါ)"""
+    if shard_count == 1:
+        return 0
+    return zlib.crc32(str(user_id_str).encode()) % shard_count
+
+def shard_paths(user_file, shard_count, generation=0):
+    """Shard ဖိုင်လမ်းကြောင်းများ (shard တစ်ခုတည်းဆိုလျှင် user_file ကိုယ်တိုင်)
+
+    Reshard တစ်ကြိမ်စီသည် generation အသစ် ဖိုင်အမည်များဖြင့် ရေးသည် (generation 0 သည် အမည်ဟောင်းများ)။
+    """
+    if shard_count == 1 and generation == 0:
+        return [user_file]
+    root, ext = os.path.splitext(user_file)
+    prefix = f"{root}.g{generation}" if generation else root
+    return [f"{prefix}.{i:03d}{ext}" for i in range(shard_count)]
+
+def manifest_path(user_file):
+    root, _ = os.path.splitext(user_file)
+    return f"{root}.shards.json"
+
+def read_layout(user_file):
+    """Disk ပေါ်ရှိ user data ၏ (shard အရေအတွက်, generation) (manifest မရှိလျှင် (1, 0))"""
+    try:
+        with open(manifest_path(user_file), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return 1, 0
+    return manifest["shards"], manifest.get("generation", 0)
+
+def read_shard_count(user_file):
+    """Disk ပေါ်ရှိ user data ၏ shard အရေအတွက် (manifest မရှိလျှင် 1)"""
+    return read_layout(user_file)[0]
+
+def _write_manifest(user_file, shard_count, generation):
+    manifest = {"shards": shard_count}
+    if generation:
+        manifest["generation"] = generation
+    _write_json(manifest_path(user_file), manifest)
+
+def _read_json(path):
+    """ဖိုင်မရှိလျှင် {} ပြန်ပေးသည်၊ ပျက်နေလျှင် data ပျောက်မည့်အစား RuntimeError ဖြစ်စေသည်"""
+    try:
+        return serializers.read_file(path)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise RuntimeError(f"{path} is corrupted ({e}); restore it from a backup before starting") from e
+
+def _write_json(path, data, fmt="json"):
+    serializers.write_file(path, data, fmt)
+
+def reshard(user_file, new_count, fmt="json"):
+    """User data ကို shard အရေအတွက်အသစ်ဖြင့် ပြန်ခွဲရေးခြင်း (Bot ကို ရပ်ထားပြီးမှ run ရန်)
+
+    Shard အသစ်များကို generation အသစ်၏ ဖိုင်အမည်များဖြင့် ရေးပြီးမှ manifest ကို atomic အစားထိုးသည်။
+    ကြားတွင် crash ဖြစ်လျှင် layout ဟောင်း (သို့) အသစ် တစ်ခုလုံးကိုသာ ဖတ်မိမည်ဖြစ်ပြီး ဖိုင်ဟောင်းများကို
+    manifest ပြောင်းပြီးမှ ဖျက်သည်။
+    """
+    old_count, old_gen = read_layout(user_file)
+    old_paths = shard_paths(user_file, old_count, old_gen)
+    new_gen = 0 if new_count == 1 else old_gen + 1
+    new_paths = shard_paths(user_file, new_count, new_gen)
+
+    shards = [{} for _ in range(new_count)]
+    total = 0
+    for path in old_paths:
+        for user_id_str, record in _read_json(path).items():
+            shards[shard_of(user_id_str, new_count)][user_id_str] = record
+            total += 1
+
+    for path, shard in zip(new_paths, shards):
+        _write_json(path, shard, fmt)
+    if new_count == 1:
+        # Manifest ရှိနေသရွေ့ user_file ကို မဖတ်သဖြင့် manifest ဖျက်ခြင်းက layout ပြောင်းခြင်း ဖြစ်သည်
+        if os.path.exists(manifest_path(user_file)):
+            os.remove(manifest_path(user_file))
+            serializers.fsync_directory(user_file)
+    else:
+        _write_manifest(user_file, new_count, new_gen)
+    for path in set(old_paths) - set(new_paths):
+        if path == user_file:
+            # Shard မခွဲမီ မူရင်းဖိုင်ကို backup အဖြစ် ထားခဲ့သည်
+            os.replace(path, path + ".unsharded.bak")
+        elif os.path.exists(path):
+            os.remove(path)
+
+    logger.info(f"Resharded {total} users from {old_count} to {new_count} shard(s)")
+    return total
+
+class JsonUserStore:
+    """User data ကို memory ထဲတွင် ထားပြီး dirty ဖြစ်သော shard ဖိုင်များကိုသာ ပြန်ရေးသော store
+
+    shards > 1 ဆိုလျှင် user_id hash ဖြင့် ဖိုင် N ခုသို့ ခွဲသိမ်းပြီး shard တစ်ခုကို
+    ၎င်းထဲရှိ User တစ်ယောက်ယောက်ကို ပထမဆုံး သုံးချိန်တွင်မှ ဖတ်သည်။
+    """
+
+    def __init__(self, user_file, state_file, shards=1, fmt="json"):
+        self.user_file = user_file
+        self.state_file = state_file
+        self.fmt = fmt
+        self.shard_count = shards
+        self.generation = read_layout(user_file)[1] if shards > 1 else 0
+        self._paths = shard_paths(user_file, shards, self.generation)
+        self._shards = [None] * shards
+        self._dirty = set()
+        self._dirty_shards = set()
+        self._write_lock = threading.Lock()
+        self._taken_gen = 0                 # နောက်ဆုံး serialize လုပ်ခဲ့သော generation
+        self._written_gen = [0] * shards    # Shard တစ်ခုချင်း နောက်ဆုံး ရေးခဲ့သော generation
+        self._indexes = {}                  # {sort_key: FieldIndex} (admin စာမျက်နှာ စီရန်၊ ပထမဆုံးသုံးမှ ဆောက်သည်)
+
+    def exists(self):
+        if self.shard_count == 1:
+            return os.path.exists(self.user_file)
+        return os.path.exists(manifest_path(self.user_file))
+
+    def check_layout(self):
+        """Disk ပေါ်ရှိ shard အရေအတွက်နှင့် config ကိုက်ညီမှု စစ်ဆေးခြင်း"""
+        on_disk = read_shard_count(self.user_file)
+        if on_disk == self.shard_count:
+            return
+        if on_disk == 1 and not os.path.exists(self.user_file):
+            return  # Install အသစ်
+        if on_disk == 1 and self.shard_count > 1 and os.path.exists(self.user_file):
+            logger.info(f"Splitting {self.user_file} into {self.shard_count} shards")
+            reshard(self.user_file, self.shard_count, self.fmt)
+            self.generation = read_layout(self.user_file)[1]
+            self._paths = shard_paths(self.user_file, self.shard_count, self.generation)
+            return
+        raise RuntimeError(
+            f"{self.user_file} is stored in {on_disk} shard(s) but USER_DATA_SHARDS={self.shard_count}; "
+            f"run `python -m tools.reshard_user_data {self.shard_count}` first"
+        )
+
+    # --- Users ---
+
+    def _shard(self, index):
+        shard = self._shards[index]
+        if shard is None:
+            raw = _read_json(self._paths[index])
+            shard = self._shards[index] = {uid: UserRecord.from_dict(uid, data) for uid, data in raw.items()}
+        return shard
+
+    def _shard_for(self, user_id_str):
+        return self._shard(shard_of(user_id_str, self.shard_count))
+
+    def load(self):
+        """User အားလုံးကို {user_id: record} အဖြစ် ပြန်ပေးခြင်း (shard တစ်ခုတည်းဆိုလျှင် live dict)"""
+        shards = [self._shard(i) for i in range(self.shard_count)]
+        if self.shard_count == 1:
+            return shards[0]
+        merged = {}
+        for shard in shards:
+            merged.update(shard)
+        return merged
+
+    def get(self, user_id_str):
+        return self._shard_for(user_id_str).get(user_id_str)
+
+    def insert(self, user_id_str, record):
+        self._shard_for(user_id_str)[user_id_str] = record
+        self.mark_dirty(user_id_str)
+        return record
+
+    def mark_dirty(self, user_id_str):
+        self._dirty.add(user_id_str)
+        self._dirty_shards.add(shard_of(user_id_str, self.shard_count))
+        if self._indexes:
+            record = self.get(user_id_str)
+            if record is not None:
+                for index in self._indexes.values():
+                    index.update(record)
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def all_records(self):
+        return chain.from_iterable(self._shard(i).items() for i in range(self.shard_count))
+
+    def replace_all(self, data):
+        shards = [{} for _ in range(self.shard_count)]
+        for user_id_str, record in data.items():
+            if not isinstance(record, UserRecord):
+                record = UserRecord.from_dict(user_id_str, record)
+            shards[shard_of(user_id_str, self.shard_count)][user_id_str] = record
+        self._shards = shards
+        self._indexes.clear()
+        self._dirty.clear()
+        self._dirty_shards = set(range(self.shard_count))
+        job = self.take_flush_job()
+        job()
+        if self.shard_count > 1:
+            _write_manifest(self.user_file, self.shard_count, self.generation)
+
+    def drop_history(self):
+        """History store သို့ ကူးပြီးနောက် record များထဲရှိ history ဟောင်းကို ဖယ်ရှားခြင်း"""
+        for index in range(self.shard_count):
+            for record in self._shard(index).values():
+                record.history = []
+        self._dirty_shards = set(range(self.shard_count))
+
+    # --- Queries (Python scan fallback) ---
+
+    def count(self):
+        return sum(len(self._shard(i)) for i in range(self.shard_count))
+
+    def balances(self):
+        return ((uid, record.mmk) for uid, record in self.all_records())
+
+    def top_users(self, limit, key="mmk"):
+        items = heapq.nlargest(limit, self.all_records(), key=lambda kv: kv[1].get(key) or 0)
+        return [record for _, record in items]
+
+    def random_user_ids(self, k):
+        keys = [uid for uid, _ in self.all_records()]
+        return [int(uid) for uid in random.sample(keys, min(k, len(keys)))]
+
+    def iter_users(self, cursor, limit, sort_key="user_id"):
+        """Cursor (value, user_id) ၏ နောက်မှစ၍ User limit ယောက် (sort_key တစ်ခုစီအတွက် sorted index ဖြင့်)"""
+        if sort_key != "user_id" and sort_key not in FIELDS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        index = self._indexes.get(sort_key)
+        if index is None:
+            index = self._indexes[sort_key] = FieldIndex(sort_key, self.all_records())
+        return [self.get(str(user_id)) for user_id in index.page(cursor, limit)]
+
+    # --- Persistence ---
+
+    def _write(self, index, payload, gen):
+        with self._write_lock:
+            # ပိုသစ်သော payload ရေးပြီးသွားပါက ဟောင်းသော payload ကို မရေးတော့ပါ
+            if gen < self._written_gen[index]:
+                return
+            serializers.write_atomic(self._paths[index], payload)
+            self._written_gen[index] = gen
+
+    def take_flush_job(self):
+        """Dirty shard များကို serialize လုပ်ပြီး ဖိုင်ရေးမည့် function ကို ပြန်ပေးခြင်း (thread ထဲတွင် run နိုင်သည်)"""
+        if not self._dirty_shards:
+            return None
+        self._taken_gen += 1
+        gen = self._taken_gen
+        payloads = [
+            (index, serializers.dumps(
+                {uid: record.to_dict() for uid, record in self._shard(index).items()}, self.fmt
+            ))
+            for index in sorted(self._dirty_shards)
+        ]
+        self._dirty.clear()
+        self._dirty_shards.clear()
+
+        def job():
+            for index, payload in payloads:
+                self._write(index, payload, gen)
+        return job
+
+    def close(self):
+        pass
+
+    # --- Bot state ---
+
+    def load_state(self):
+        if not os.path.exists(self.state_file):
+            return default_bot_state()
+        return _read_json(self.state_file)
+
+    def save_state(self, state):
+        serializers.write_file(self.state_file, state, self.fmt)
+
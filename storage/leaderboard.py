@@ -0,0 +1,212 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+class SortedKeyList:
+    """Key များကို အရွယ်အစား load ခန့်ရှိသော sorted sublist များအဖြစ် ခွဲထားသော sorted list
+
+    Sublist အရှည်များကို Fenwick tree ဖြင့် ပေါင်းထားသည်။ add / discard / count_less သည် O(log n)၊
+    key တစ်ခု၏ ရှေ့/နောက်မှ k ခု ဖတ်ခြင်းသည် O(log n + k) ဖြစ်သည်။
+    """
+
+    def __init__(self, keys=(), load=500):
+        self._load = load
+        keys = sorted(keys)
+        self._len = len(keys)
+        self._lists = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes = [sublist[-1] for sublist in self._lists]
+        self._rebuild_tree()
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        self._len += 1
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._lists[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._lists[i], key)
+        self._tree_add(i, 1)
+        sublist = self._lists[i]
+        if len(sublist) > 2 * self._load:
+            # Sublist ကြီးလွန်းလျှင် ထက်ဝက်ခွဲခြင်း (Fenwick tree ကို ပြန်ဆောက်ရသည်)
+            half = sublist[self._load:]
+            del sublist[self._load:]
+            self._lists.insert(i + 1, half)
+            self._maxes[i] = sublist[-1]
+            self._maxes.insert(i + 1, half[-1])
+            self._rebuild_tree()
+
+    def discard(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        sublist = self._lists[i]
+        j = bisect_left(sublist, key)
+        if sublist[j] != key:
+            return
+        self._len -= 1
+        del sublist[j]
+        if not sublist:
+            del self._lists[i]
+            del self._maxes[i]
+            self._rebuild_tree()
+            return
+        self._maxes[i] = sublist[-1]
+        self._tree_add(i, -1)
+
+    def count_less(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._prefix(i) + bisect_left(self._lists[i], key)
+
+    def after(self, key=None):
+        """key ထက်ကြီးသော key များကို ငယ်စဉ်ကြီးလိုက် (key=None ဆိုလျှင် အစမှ)"""
+        i = j = 0
+        if key is not None:
+            i = bisect_right(self._maxes, key)
+            if i < len(self._lists):
+                j = bisect_right(self._lists[i], key)
+        for index in range(i, len(self._lists)):
+            sublist = self._lists[index]
+            for position in range(j, len(sublist)):
+                yield sublist[position]
+            j = 0
+
+    def before(self, key=None):
+        """key ထက်ငယ်သော key များကို ကြီးစဉ်ငယ်လိုက် (key=None ဆိုလျှင် အဆုံးမှ)"""
+        if key is None:
+            i = len(self._lists) - 1
+            j = len(self._lists[i]) if self._lists else 0
+        else:
+            i = bisect_left(self._maxes, key)
+            if i == len(self._lists):
+                i -= 1
+                j = len(self._lists[i]) if self._lists else 0
+            else:
+                j = bisect_left(self._lists[i], key)
+        for index in range(i, -1, -1):
+            sublist = self._lists[index]
+            for position in range(j - 1, -1, -1):
+                yield sublist[position]
+            if index:
+                j = len(self._lists[index - 1])
+
+    # --- Fenwick tree (sublist အရှည်များ) ---
+
+    def _rebuild_tree(self):
+        tree = [len(sublist) for sublist in self._lists]
+        for i in range(1, len(tree) + 1):
+            parent = i + (i & -i)
+            if parent <= len(tree):
+                tree[parent - 1] += tree[i - 1]
+        self._tree = tree
+
+    def _tree_add(self, index, delta):
+        i = index + 1
+        while i <= len(self._tree):
+            self._tree[i - 1] += delta
+            i += i & -i
+
+    def _prefix(self, index):
+        """ပထမ index ခုမြောက် sublist များ၏ စုစုပေါင်းအရှည်"""
+        total = 0
+        while index > 0:
+            total += self._tree[index - 1]
+            index -= index & -index
+        return total
+
+class Leaderboard:
+    """User များကို mmk အလိုက် စီထားသော order-statistics index
+
+    (-mmk, -user_id) key များကို SortedKeyList ထဲတွင် ထားသည်။ Update နှင့် rank သည် O(log n)၊
+    top K သည် O(log n + K) ဖြစ်သည်။
+    """
+
+    def __init__(self, load=500):
+        self._load = load
+        self._keys = SortedKeyList(load=load)
+        self._scores = {}   # {user_id: mmk}
+        self.is_built = False
+
+    def __len__(self):
+        return len(self._scores)
+
+    def build(self, balances):
+        """(user_id, mmk) များမှ index ကို အစမှ ပြန်ဆောက်ခြင်း"""
+        self._scores = {int(user_id): mmk or 0 for user_id, mmk in balances}
+        self._keys = SortedKeyList(((-mmk, -user_id) for user_id, mmk in self._scores.items()), self._load)
+        self.is_built = True
+
+    def update(self, user_id, mmk):
+        user_id = int(user_id)
+        old = self._scores.get(user_id)
+        if old == mmk:
+            return
+        if old is not None:
+            self._keys.discard((-old, -user_id))
+        self._keys.add((-mmk, -user_id))
+        self._scores[user_id] = mmk
+
+    def rank(self, user_id):
+        """mmk ပိုများသော User အရေအတွက် + 1"""
+        mmk = self._scores.get(int(user_id), 0)
+        return self._keys.count_less((-mmk, float("-inf"))) + 1
+
+    def top(self, k, after=None):
+        """mmk အများဆုံး User k ယောက်ကို (user_id, mmk) အဖြစ် ပြန်ပေးခြင်း
+
+        after=(mmk, user_id) ပေးလျှင် ထို User ၏ နောက်မှစ၍ ယူသည် (mmk DESC, user_id DESC အစဉ်)။
+        """
+        key = (-after[0], -int(after[1])) if after is not None else None
+        return [(-neg_user_id, -neg_mmk) for neg_mmk, neg_user_id in islice(self._keys.after(key), k)]
+
+class FieldIndex:
+    """User record field တစ်ခုအလိုက် (value DESC, user_id DESC) စီထားသော index (admin စာမျက်နှာများအတွက်)
+
+    user_id ကိုယ်တိုင်ဆိုလျှင် ငယ်စဉ်ကြီးလိုက် စီသည်။ Value None ဖြစ်သော User များကို နောက်ဆုံးတွင် ထားသည်။
+    Record ပြောင်းတိုင်း update() ကို ခေါ်ရမည်။ စာမျက်နှာတစ်ခုသည် O(log n + page size) ဖြစ်သည်။
+    """
+
+    def __init__(self, field, records=(), load=500):
+        self.field = field
+        self._keys_by_user = {int(uid): self._key(record) for uid, record in records}
+        self._keys = SortedKeyList(self._keys_by_user.values(), load)
+
+    def _key(self, record):
+        if self.field == "user_id":
+            return (record.user_id,)
+        value = record.get(self.field)
+        # None ကို DESC အစဉ်တွင် နောက်ဆုံးထားရန်
+        return (value is not None, value if value is not None else 0, record.user_id)
+
+    def update(self, record):
+        user_id = record.user_id
+        key = self._key(record)
+        old = self._keys_by_user.get(user_id)
+        if old == key:
+            return
+        if old is not None:
+            self._keys.discard(old)
+        self._keys.add(key)
+        self._keys_by_user[user_id] = key
+
+    def page(self, cursor, limit):
+        """Cursor (value, user_id) ၏ နောက်မှစ၍ user_id limit ခု"""
+        if self.field == "user_id":
+            keys = self._keys.after((cursor[1],) if cursor else None)
+        else:
+            bound = None
+            if cursor is not None:
+                value, user_id = cursor
+                bound = (value is not None, value if value is not None else 0, user_id)
+            keys = self._keys.before(bound)
+        return [key[-1] for key in islice(keys, limit)]
@@ -0,0 +1,157 @@
+import glob
+import json
+import os
+import time
+import logging
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+class BalanceLedger:
+    """Balance ပြောင်းလဲမှုတိုင်းကို တစ်ကြောင်းစီ append လုပ်သော ledger
+
+    Balance များကို memory ထဲတွင် တွက်ထားပြီး snapshot ဖိုင် + snapshot နောက်ပိုင်း ledger
+    ကြောင်းများကို replay လုပ်၍ ပြန်တည်ဆောက်သည်။ Snapshot ယူချိန်တွင် ledger ဖိုင်ကို
+    `<ledger>.<seq>` အဖြစ် archive လုပ်ထားသဖြင့် audit trail အပြည့်အစုံ ကျန်ရှိသည်။
+
+    Entry တွင် ref ပါလျှင် release() မခေါ်မချင်း refs ထဲတွင် (snapshot ကိုဖြတ်၍) မှတ်ထားသဖြင့်
+    အခြား log တစ်ခုနှင့် တွဲရေးရသော ပြောင်းလဲမှုကို crash ပြီးနောက် ပြီးမပြီး စစ်နိုင်သည်။
+    """
+
+    def __init__(self, ledger_file, snapshot_file, fsync=True):
+        self.ledger_file = ledger_file
+        self.snapshot_file = snapshot_file
+        self.fsync = fsync
+        self.balances = {}       # {user_id_str: balance}
+        self.seq = 0             # နောက်ဆုံး append လုပ်ခဲ့သော entry နံပါတ်
+        self.snapshot_seq = 0
+        self.refs = {}           # {ref: [user_id_str, amount]} (release မလုပ်ရသေးသော entry များ)
+        self._fh = None
+
+    @property
+    def is_open(self):
+        return self._fh is not None
+
+    @property
+    def entries_since_snapshot(self):
+        return self.seq - self.snapshot_seq
+
+    def exists(self):
+        return os.path.exists(self.snapshot_file) or os.path.exists(self.ledger_file)
+
+    def _segments(self):
+        """Replay လုပ်ရမည့် ledger ဖိုင်များ (archive များ seq အစဉ်လိုက်၊ နောက်ဆုံး လက်ရှိဖိုင်)"""
+        archives = []
+        for path in glob.glob(glob.escape(self.ledger_file) + ".*"):
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit() and int(suffix) > self.snapshot_seq:
+                archives.append((int(suffix), path))
+        return [path for _, path in sorted(archives)] + [self.ledger_file]
+
+    def open(self):
+        """Snapshot ကို ဖတ်ပြီး ledger ကို replay လုပ်ခြင်း၊ replay တွင် ပါဝင်သော user_id များကို ပြန်ပေးသည်"""
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.balances = snapshot["balances"]
+            self.refs = snapshot.get("refs", {})
+            self.seq = self.snapshot_seq = snapshot["seq"]
+
+        touched = set()
+        replayed = 0
+        for path in self._segments():
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Crash ဖြစ်စဉ် တစ်ဝက်သာ ရေးမိသော နောက်ဆုံးကြောင်း
+                        logger.warning(f"Skipping truncated line in {path}")
+                        continue
+                    if entry["s"] <= self.seq:
+                        continue
+                    self.balances[entry["u"]] = self.balances.get(entry["u"], 0) + entry["a"]
+                    self.seq = entry["s"]
+                    if "x" in entry:
+                        self.refs[entry["x"]] = [entry["u"], entry["a"]]
+                    touched.add(entry["u"])
+                    replayed += 1
+
+        self._fh = open(self.ledger_file, 'a', encoding='utf-8')
+        logger.info(f"Ledger loaded: {len(self.balances)} balances, replayed {replayed} entries")
+        return touched
+
+    def balance(self, user_id):
+        return self.balances.get(str(user_id), 0)
+
+    def knows(self, user_id):
+        return str(user_id) in self.balances
+
+    def append(self, user_id, amount, reason, sync=True, ref=None):
+        """Delta တစ်ခုကို ledger ထဲ ရေးပြီး Balance အသစ်ကို ပြန်ပေးခြင်း
+
+        sync=False ဆိုလျှင် fsync ကို ခေါ်သူဘက်မှ sync() ဖြင့် နောက်မှ လုပ်ရမည်။
+        """
+        user_id_str = str(user_id)
+        self.seq += 1
+        entry = {"s": self.seq, "u": user_id_str, "a": amount, "r": reason, "t": int(time.time())}
+        if ref is not None:
+            entry["x"] = ref
+            self.refs[ref] = [user_id_str, amount]
+        self._fh.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        if sync:
+            self.sync()
+        new_balance = self.balances.get(user_id_str, 0) + amount
+        self.balances[user_id_str] = new_balance
+        return new_balance
+
+    def release(self, ref):
+        """တွဲရေးရသော ပြောင်းလဲမှု ပြီးဆုံးသဖြင့် ref ကို မမှတ်တော့ခြင်း (နောက် snapshot မှစ၍)"""
+        self.refs.pop(ref, None)
+
+    def sync(self):
+        """ရေးပြီးသော entry များကို disk ပေါ်သို့ fsync လုပ်ခြင်း"""
+        fh = self._fh
+        if self.fsync and fh is not None:
+            try:
+                os.fsync(fh.fileno())
+            except ValueError:
+                pass  # begin_snapshot က fsync လုပ်ပြီး ပိတ်လိုက်သော ဖိုင်
+
+    def begin_snapshot(self):
+        """လက်ရှိ Balance များကို capture လုပ်ပြီး ledger ဖိုင်ကို archive သို့ ရွှေ့ခြင်း
+
+        Snapshot ဖိုင်ရေးမည့် function ကို ပြန်ပေးသည် (thread ထဲတွင် run နိုင်သည်)။ ထို function
+        မပြီးခင် crash ဖြစ်ပါက archive ဖိုင်မှ ပြန် replay လုပ်မည်။
+        """
+        seq = self.seq
+        snapshot = {"seq": seq, "balances": self.balances}
+        if self.refs:
+            snapshot["refs"] = self.refs
+        payload = json.dumps(snapshot, separators=(",", ":"))
+        if self._fh is not None:
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self._fh.close()
+        if os.path.exists(self.ledger_file) and os.path.getsize(self.ledger_file) > 0:
+            os.replace(self.ledger_file, f"{self.ledger_file}.{seq}")
+        self._fh = open(self.ledger_file, 'a', encoding='utf-8')
+        self.snapshot_seq = seq
+
+        def write():
+            serializers.write_atomic(self.snapshot_file, payload.encode('utf-8'))
+            logger.info(f"Ledger snapshot written at seq {seq}")
+        return write
+
+    def snapshot(self):
+        """Balance အားလုံးကို ချက်ချင်း snapshot ယူခြင်း"""
+        self.begin_snapshot()()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
@@ -0,0 +1,225 @@
+import codecs
+import json
+import os
+import logging
+from collections import Counter
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+# --- Migrations ---
+# Migration တစ်ခုချင်းသည် (version, ဖော်ပြချက်, user record function, bot_state function) ဖြစ်သည်။
+# Function များသည် data ကို နေရာတွင်ပင် ပြင်ပြီး stats dict ထဲ counter များ တိုးသည်။
+# ထပ်ခါ run လည်း ရလဒ်မပြောင်းရ (idempotent) - checkpoint မှ ပြန်စလျှင် ထပ်ကြုံနိုင်သည်။
+
+LEGACY_USER_FIELDS = ("points", "spins_today", "last_spin_date")
+
+def _user_v1(record, stats):
+    """Spin ခေတ် points ကို mmk သို့ ပြောင်းပြီး spin field များကို ဖယ်ရှားခြင်း"""
+    if "points" in record:
+        points = record.pop("points")
+        if "mmk" in record:
+            stats["points_dropped"] += 1      # mmk ရှိပြီးသားဖြစ်၍ points သည် အဟောင်းသာ
+        else:
+            record["mmk"] = points or 0
+            stats["points_to_mmk"] += 1
+    for field in LEGACY_USER_FIELDS[1:]:
+        if record.pop(field, None) is not None:
+            stats["spin_fields_removed"] += 1
+
+def _state_v1(state, stats):
+    """Pending exchange များရှိ remaining_points ကို remaining_mmk သို့ ပြောင်းခြင်း"""
+    for info in (state.get("pending_exchanges") or {}).values():
+        if "remaining_points" in info:
+            remaining = info.pop("remaining_points")
+            info.setdefault("remaining_mmk", remaining)
+            stats["remaining_points_renamed"] += 1
+
+MIGRATIONS = [
+    (1, "spin-era points → mmk", _user_v1, _state_v1),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def pending_migrations(from_version):
+    return [m for m in MIGRATIONS if m[0] > from_version]
+
+def schema_version(state):
+    return state.get("schema_version", 0)
+
+# --- Streaming JSON object reader ---
+
+_WHITESPACE = " \t\n\r"
+
+def _skip(buf, i):
+    while i < len(buf) and buf[i] in _WHITESPACE:
+        i += 1
+    return i
+
+def iter_json_object(f, offset=None, chunk_size=1 << 16):
+    """Top-level JSON object ၏ (key, value, byte offset) များကို တစ်ခုချင်း ဖတ်ခြင်း
+
+    f သည် binary mode ဖိုင်ဖြစ်ရမည်။ Memory ထဲတွင် chunk တစ်ခုနှင့် item တစ်ခုစာသာ ထားသည်။
+    ပြန်ပေးသော offset သည် ထို item ၏ နောက်ဆုံး byte ၏ နောက်ဖြစ်ပြီး offset= ဖြင့် ထိုနေရာမှ
+    ပြန်စနိုင်သည်။
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    f.seek(offset or 0)
+    position = offset or 0     # buf[start] ၏ byte offset
+    buf = ""
+    start = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, start, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        # ဖတ်ပြီးသော အပိုင်းကို chunk အသစ်ထည့်ချိန်တွင်သာ ဖယ်ရှားသည်
+        buf = buf[start:] + utf8.decode(chunk, final=eof)
+        start = 0
+
+    def skip_ws(i):
+        while True:
+            i = _skip(buf, i)
+            if i < len(buf) or eof:
+                return i
+            i -= start
+            fill()
+
+    def consume(i):
+        nonlocal position, start
+        position += len(buf[start:i].encode("utf-8"))
+        start = i
+
+    if offset is None:
+        i = skip_ws(start)
+        if buf[i:i + 1] != "{":
+            raise ValueError("top-level value is not a JSON object")
+        consume(i + 1)
+        first = True
+    else:
+        first = False
+
+    while True:
+        i = skip_ws(start)
+        if i >= len(buf):
+            raise ValueError("unexpected end of file")
+        if buf[i] == "}":
+            return
+        if not first:
+            if buf[i] != ",":
+                raise ValueError(f"expected ',' at byte {position}")
+            consume(i + 1)
+        first = False
+        # Item တစ်ခုလုံး ("key": value) buffer ထဲ ရောက်သည်အထိ chunk များ ထပ်ဖတ်ခြင်း
+        while True:
+            try:
+                key, j = decoder.raw_decode(buf, _skip(buf, start))
+                j = _skip(buf, j)
+                if j >= len(buf):
+                    raise json.JSONDecodeError("need more data", buf, j)
+                if buf[j] != ":":
+                    raise ValueError(f"expected ':' at byte {position}")
+                value, end = decoder.raw_decode(buf, _skip(buf, j + 1))
+                if end == len(buf) and not eof:
+                    # ဂဏန်းကဲ့သို့ value သည် chunk အဆုံးတွင် ပြတ်နေနိုင်သည်
+                    raise json.JSONDecodeError("value may continue", buf, end)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"truncated or invalid JSON near byte {position}")
+                fill()
+        consume(end)
+        yield key, value, position
+
+# --- Runner ---
+
+def checkpoint_path(path):
+    return path + ".migrate.json"
+
+def _load_checkpoint(path, input_stat):
+    try:
+        with open(checkpoint_path(path), 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    if (checkpoint["input_size"], checkpoint["input_mtime"]) != (input_stat.st_size, input_stat.st_mtime):
+        raise RuntimeError(f"{path} changed since the checkpoint was written; delete {checkpoint_path(path)}")
+    return checkpoint
+
+def migrate_user_file(path, migrations, dry_run=False, checkpoint_every=10000):
+    """User data ဖိုင်တစ်ခုကို stream လုပ်ပြီး migrate လုပ်ခြင်း (stats Counter ကို ပြန်ပေးသည်)
+
+    ရလဒ်ကို path.migrating ထဲ ရေးပြီး checkpoint_every record တိုင်း checkpoint သိမ်းသည်။
+    ပြတ်တောက်သွားပါက ပြန် run လျှင် checkpoint မှ ဆက်လုပ်သည်။ ပြီးလျှင် မူရင်းဖိုင်ကို
+    path.v<version>.bak အဖြစ် ထားခဲ့သည်။
+    """
+    with open(path, 'rb') as f:
+        if f.read(1 << 10).lstrip()[:1] != b"{":
+            raise RuntimeError(f"{path} is not JSON; migrate it with STORAGE_FORMAT=json")
+    input_stat = os.stat(path)
+    output_path = path + ".migrating"
+    checkpoint = None if dry_run else _load_checkpoint(path, input_stat)
+    stats = Counter(checkpoint["stats"] if checkpoint else {})
+    if checkpoint:
+        logger.info(f"Resuming {path} at record {stats['records']}")
+
+    out = None
+    if not dry_run:
+        out = open(output_path, 'r+b' if checkpoint else 'wb')
+        if checkpoint:
+            out.truncate(checkpoint["output_size"])
+            out.seek(checkpoint["output_size"])
+        else:
+            out.write(b"{")
+
+    def save_checkpoint(offset):
+        out.flush()
+        os.fsync(out.fileno())
+        serializers.write_atomic(checkpoint_path(path), json.dumps({
+            "input_offset": offset, "output_size": out.tell(), "stats": stats,
+            "input_size": input_stat.st_size, "input_mtime": input_stat.st_mtime,
+        }).encode("utf-8"))
+
+    try:
+        with open(path, 'rb') as f:
+            for user_id_str, record, offset in iter_json_object(f, checkpoint["input_offset"] if checkpoint else None):
+                before = json.dumps(record, sort_keys=True)
+                for _, _, migrate_user, _ in migrations:
+                    migrate_user(record, stats)
+                if json.dumps(record, sort_keys=True) != before:
+                    stats["changed"] += 1
+                stats["records"] += 1
+                if out is None:
+                    continue
+                item = json.dumps({user_id_str: record}, ensure_ascii=False, separators=(",", ":"))[1:-1]
+                out.write((b"," if stats["records"] > 1 else b"") + item.encode("utf-8"))
+                if stats["records"] % checkpoint_every == 0:
+                    save_checkpoint(offset)
+        if out is None:
+            return stats
+        out.write(b"}")
+        out.flush()
+        os.fsync(out.fileno())
+    finally:
+        if out is not None:
+            out.close()
+
+    # ယခင် run တစ်ခုက ထားခဲ့သော backup သည်သာ မူရင်းဖိုင် ဖြစ်သဖြင့် မဖျက်ပါ
+    backup_path = f"{path}.v{migrations[0][0] - 1}.bak"
+    if os.path.exists(backup_path):
+        os.replace(output_path, path)
+    else:
+        os.replace(path, backup_path)
+        os.replace(output_path, path)
+    if os.path.exists(checkpoint_path(path)):
+        os.remove(checkpoint_path(path))
+    return stats
+
+def migrate_state(state, migrations):
+    """bot_state ကို migrate လုပ်ပြီး schema_version ကို မှတ်ခြင်း (stats Counter ကို ပြန်ပေးသည်)"""
+    stats = Counter()
+    for _, _, _, migrate_bot_state in migrations:
+        migrate_bot_state(state, stats)
+    state["schema_version"] = migrations[-1][0]
+    return stats
@@ -0,0 +1,132 @@
+# User record ကို dict အစား __slots__ class ဖြင့် ထားခြင်း
+# (User ၁၀၀k ခန့်တွင် dict-of-dicts ထက် memory အများကြီး သက်သာသည်၊ tools/bench_user_memory.py ကိုကြည့်ပါ)
+
+FIELDS = ("user_id", "username", "mmk", "total_games_played", "referred_by",
+          "referral_count", "event_done", "last_active")
+
+DEFAULTS = {
+    "username": "",
+    "mmk": 0,
+    "total_games_played": 0,
+    "referred_by": None,
+    "referral_count": 0,
+    "event_done": False,
+    "last_active": None,
+}
+
+def pack_history(history):
+    """History dict list ကို (timestamp, action, details) tuple များအဖြစ် ချုံ့ခြင်း"""
+    return tuple((e.get("timestamp", ""), e.get("action", ""), e.get("details", "")) for e in history)
+
+class UserRecord:
+    """User တစ်ယောက်၏ data (handler များက dict ကဲ့သို့ .get() / [] ဖြင့် သုံးနိုင်သည်)
+
+    History ကို လိုအပ်မှသာ dict list အဖြစ် ပြောင်းသည် - ဖိုင်မှဖတ်လျှင် packed tuple များအဖြစ်၊
+    SQLite မှဖတ်လျှင် loader function အဖြစ်သာ ထားသည်။ Spin ခေတ်က field ဟောင်းများ
+    (points, spins_today စသည်) ကို extra ထဲတွင်သာ ထားသည်။
+    """
+
+    __slots__ = FIELDS + ("extra", "_history", "__weakref__")
+
+    def __init__(self, user_id, history=None, extra=None, **fields):
+        self.user_id = user_id
+        for name, default in DEFAULTS.items():
+            setattr(self, name, fields.pop(name, default))
+        if fields:
+            extra = dict(extra or {}, **fields)
+        self.extra = extra or None
+        self._history = history if history is not None else []
+
+    @classmethod
+    def from_dict(cls, user_id_str, data, history_loader=None):
+        data = dict(data)
+        data.pop("user_id", None)
+        history = data.pop("history", None)
+        if history_loader is not None:
+            packed = history_loader
+        else:
+            packed = pack_history(history or ())
+        return cls(int(user_id_str), history=packed, **data)
+
+    @property
+    def history(self):
+        history = self._history
+        if isinstance(history, list):
+            return history
+        if callable(history):
+            history = history()
+        self._history = [{"timestamp": t, "action": a, "details": d} for t, a, d in history]
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value
+
+    def history_loaded(self):
+        return isinstance(self._history, list)
+
+    def append_history(self, entry, limit):
+        history = self.history
+        history.append(entry)
+        if len(history) > limit:
+            del history[:-limit]
+
+    def to_dict(self, include_history=True):
+        data = {name: getattr(self, name) for name in FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        if include_history and self._history:
+            history = self._history
+            if isinstance(history, tuple):
+                data["history"] = [{"timestamp": t, "action": a, "details": d} for t, a, d in history]
+            else:
+                data["history"] = self.history
+        return data
+
+    # --- dict-compatible access ---
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            # Slot ၏ None သည် "မသတ်မှတ်ရသေး" ဖြစ်သဖြင့် ခေါ်သူ၏ default ကို ပြန်ပေးသည်
+            value = getattr(self, key)
+            return default if value is None else value
+        if key == "history":
+            return self.history
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if key == "history":
+            return self.history
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELDS or key == "history":
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in FIELDS or key == "history" or bool(self.extra and key in self.extra)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, updates):
+        for key, value in updates.items():
+            self[key] = value
+
+    def keys(self):
+        return self.to_dict(include_history=False).keys() | {"history"}
+
+    def __repr__(self):
+        return f"UserRecord({self.to_dict(include_history=False)!r})"
@@ -0,0 +1,95 @@
+import json
+import os
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# ဖိုင်ရေးရာတွင် သုံးနိုင်သော format များ
+#   json-pretty : indent=2 (ယခင် format၊ ဖတ်ရလွယ်သော်လည်း အကြီးဆုံး/အနှေးဆုံး)
+#   json        : stdlib compact JSON
+#   orjson      : orjson ထည့်ထားလျှင် compact JSON ကို အမြန်ဆုံး ရေးသည်
+#   msgpack     : msgpack ထည့်ထားလျှင် binary format (အသေးဆုံး)
+FORMATS = ("json-pretty", "json", "orjson", "msgpack")
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt not in ("orjson", "msgpack") or globals()[fmt] is not None]
+
+def resolve_format(fmt):
+    """Config ထဲမှ format ကို စစ်ဆေးပြီး library မရှိလျှင် compact JSON သို့ ပြောင်းခြင်း"""
+    if fmt not in FORMATS:
+        logger.warning(f"Unknown storage format '{fmt}', using compact JSON")
+        return "json"
+    if fmt not in available_formats():
+        logger.warning(f"{fmt} is not installed, using compact JSON")
+        return "json"
+    return fmt
+
+def dumps(data, fmt):
+    """Data ကို bytes အဖြစ် serialize လုပ်ခြင်း"""
+    if fmt == "orjson":
+        return orjson.dumps(data)
+    if fmt == "msgpack":
+        return msgpack.packb(data, use_bin_type=True)
+    if fmt == "json-pretty":
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+def loads(raw):
+    """ဖိုင်ထဲမှ bytes ကို format အလိုအလျောက် ခွဲခြားပြီး ဖတ်ခြင်း"""
+    head = raw.lstrip()[:1]
+    if head in (b"{", b"["):
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if not head:
+        raise ValueError("empty file")
+    if msgpack is None:
+        raise RuntimeError("file looks like msgpack but msgpack is not installed")
+    return msgpack.unpackb(raw, raw=False)
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def write_atomic(path, payload):
+    """Temp ဖိုင်ထဲ ရေးပြီး fsync လုပ်ကာ rename ဖြင့် အစားထိုးခြင်း
+
+    ရေးနေစဉ် crash ဖြစ်လျှင်လည်း ဖိုင်ဟောင်း (သို့) ဖိုင်အသစ် တစ်ခုခုသာ ကျန်မည်ဖြစ်ပြီး
+    တစ်ဝက်တစ်ပျက် ဖိုင် မဖြစ်နိုင်ပါ။
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(path)
+
+def fsync_directory(path):
+    """Rename ကိုယ်တိုင် disk ပေါ်ရောက်စေရန် path ရှိရာ directory ကို fsync လုပ်ခြင်း (POSIX)"""
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def write_file(path, data, fmt):
+    write_atomic(path, dumps(data, fmt))
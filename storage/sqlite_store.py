@@ -0,0 +1,345 @@
+import json
+import os
+import random
+import sqlite3
+import logging
+import threading
+import weakref
+from storage.json_store import default_bot_state
+from storage.records import UserRecord
+
+logger = logging.getLogger(__name__)
+
+# users table တွင် column အဖြစ်ထားမည့် field များ (ကျန် field များကို extra JSON ထဲ ထည့်သည်)
+USER_COLUMNS = ("username", "mmk", "total_games_played", "referred_by", "referral_count", "event_done", "last_active")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL DEFAULT '',
+    mmk INTEGER NOT NULL DEFAULT 0,
+    total_games_played INTEGER NOT NULL DEFAULT 0,
+    referred_by INTEGER,
+    referral_count INTEGER NOT NULL DEFAULT 0,
+    event_done INTEGER NOT NULL DEFAULT 0,
+    last_active TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_users_mmk ON users (mmk);
+CREATE INDEX IF NOT EXISTS idx_users_last_active ON users (last_active);
+CREATE INDEX IF NOT EXISTS idx_users_referred_by ON users (referred_by);
+CREATE INDEX IF NOT EXISTS idx_users_referral_count ON users (referral_count);
+
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_user_id ON history (user_id, id);
+
+CREATE TABLE IF NOT EXISTS pending_exchanges (
+    exchange_id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pending_exchanges_user_id ON pending_exchanges (user_id);
+
+CREATE TABLE IF NOT EXISTS bot_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+USER_SELECT = "SELECT user_id, " + ", ".join(USER_COLUMNS) + ", extra FROM users"
+
+def _row_to_record(row, history_loader):
+    fields = dict(zip(USER_COLUMNS, row[1:-1]))
+    fields["event_done"] = bool(fields["event_done"])
+    extra = json.loads(row[-1]) if row[-1] != "{}" else None
+    return UserRecord(row[0], history=history_loader, extra=extra, **fields)
+
+def _record_to_row(user_id_str, record):
+    return (
+        int(user_id_str),
+        record.username or "",
+        record.mmk,
+        record.total_games_played,
+        record.referred_by,
+        record.referral_count,
+        int(bool(record.event_done)),
+        record.last_active,
+        json.dumps(record.extra or {}, ensure_ascii=False),
+    )
+
+class SqliteUserStore:
+    """Users, history နှင့် pending_exchanges ကို SQLite (WAL) ထဲတွင် သိမ်းသော store
+
+    ဖတ်/ပြင်ထားသော record များကိုသာ memory ထဲတွင် cache လုပ်ပြီး dirty rows များကို
+    flush တစ်ကြိမ်တွင် transaction တစ်ခုတည်းဖြင့် upsert လုပ်သည်။ Cache ပြည့်လျှင် dirty မဟုတ်သော
+    record များကိုသာ ဖယ်ပြီး handler များ ကိုင်ထားဆဲ record များကို weak reference ဖြင့် ဆက်ရှာနိုင်သဖြင့်
+    get() သည် တူညီသော object ကိုသာ ပြန်ပေးသည် (ထို object ကို ပြင်လျှင် ဆက်သိမ်းမည်)။
+    """
+
+    def __init__(self, db_file, cache_size=10000):
+        self.db_file = db_file
+        self.cache_size = cache_size
+        self._cache = {}
+        self._evicted = weakref.WeakValueDictionary()   # Cache မှ ဖယ်ပြီး သုံးနေဆဲ record များ
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._taken_gen = 0
+        self._row_gen = {}       # {user_id: နောက်ဆုံး ရေးခဲ့သော generation}
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _query(self, sql, params=()):
+        # SQL query မလုပ်ခင် dirty rows များကို ရေးထားမှ မှန်ကန်သော ရလဒ်ရမည်
+        self.flush()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- Users ---
+
+    def load(self):
+        return self
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+    def _history_loader(self, user_id):
+        # History ကို record.history ကို ပထမဆုံး သုံးချိန်တွင်မှ query လုပ်သည်
+        return lambda: self._query(
+            "SELECT timestamp, action, details FROM history WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+
+    def _to_record(self, row):
+        """Row ၏ record (cache ထဲ သို့မဟုတ် သုံးနေဆဲ record ရှိလျှင် ထို object ကိုသာ ပြန်ပေးသည်)"""
+        user_id_str = str(row[0])
+        record = self._cache.get(user_id_str)
+        if record is None:
+            record = self._evicted.get(user_id_str)
+        if record is None:
+            record = _row_to_record(row, self._history_loader(row[0]))
+            # Query ရလဒ်ကို ကိုင်ထားစဉ် get() က တူညီသော object ကို ပြန်ပေးစေရန်
+            self._evicted[user_id_str] = record
+        return record
+
+    def get(self, user_id_str):
+        record = self._cache.get(user_id_str)
+        if record is not None:
+            return record
+        record = self._evicted.get(user_id_str)
+        if record is not None:
+            self._cache[user_id_str] = record
+            return record
+        with self._lock:
+            row = self._conn.execute(USER_SELECT + " WHERE user_id = ?", (int(user_id_str),)).fetchone()
+        if row is None:
+            return None
+        record = self._to_record(row)
+        self._cache[user_id_str] = record
+        return record
+
+    def insert(self, user_id_str, record):
+        self._cache[user_id_str] = record
+        self._dirty.add(user_id_str)
+        return record
+
+    def mark_dirty(self, user_id_str):
+        # Evict လုပ်ပြီးနောက် ပြင်ခံရသော record ကို cache ထဲ ပြန်ထည့်မှ flush တွင် ပါမည်
+        if user_id_str not in self._cache and self.get(user_id_str) is None:
+            return
+        self._dirty.add(user_id_str)
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def all_records(self):
+        """User အားလုံးကို (user_id_str, record) အဖြစ် ပြန်ပေးခြင်း (history မပါ)"""
+        return [(str(row[0]), self._to_record(row)) for row in self._query(USER_SELECT)]
+
+    def replace_all(self, data):
+        self.flush()
+        records = {
+            uid: record if isinstance(record, UserRecord) else UserRecord.from_dict(uid, record)
+            for uid, record in data.items()
+        }
+        history = [
+            (int(uid), e.get("timestamp", ""), e.get("action", ""), e.get("details", ""))
+            for uid, record in records.items() for e in record.history
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM users")
+            self._conn.execute("DELETE FROM history")
+            self._conn.executemany(
+                "INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [_record_to_row(uid, record) for uid, record in records.items()]
+            )
+            self._conn.executemany(
+                "INSERT INTO history (user_id, timestamp, action, details) VALUES (?, ?, ?, ?)", history
+            )
+        self._cache.clear()
+        self._evicted.clear()
+
+    def drop_history(self):
+        """History store သို့ ကူးပြီးနောက် history table ဟောင်းကို ရှင်းလင်းခြင်း
+
+        Cache ထဲရှိ record များ (ledger ပြင်ဆင်မှု စသည် dirty ဖြစ်နေနိုင်သည်) ကို မဖယ်ဘဲ history ကိုသာ ရှင်းသည်။
+        """
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+        for record in list(self._cache.values()) + list(self._evicted.values()):
+            record.history = []
+
+    # --- Indexed queries ---
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM users")[0][0]
+
+    def balances(self):
+        return self._query("SELECT user_id, mmk FROM users")
+
+    def top_users(self, limit, key="mmk"):
+        if key not in USER_COLUMNS:
+            raise ValueError(f"Unknown sort key: {key}")
+        rows = self._query(f"{USER_SELECT} ORDER BY {key} DESC LIMIT ?", (limit,))
+        return [self._to_record(row) for row in rows]
+
+    def random_user_ids(self, k):
+        """User k ယောက်ကို ကျပန်းရွေးခြင်း
+
+        user_id range ထဲမှ ကျပန်းတန်ဖိုးကို primary key ပေါ်တွင် seek လုပ်သဖြင့် ရွေးချယ်မှုတစ်ခုလျှင် O(log n)
+        ဖြစ်သည် (user_id များကြား ကွာဟချက် ကြီးသူ အနည်းငယ် ပိုရွေးခံရနိုင်သည်)။
+        """
+        low, high, total = self._query("SELECT MIN(user_id), MAX(user_id), COUNT(*) FROM users")[0]
+        k = min(k, total)
+        if 2 * k > total:
+            # User အများစုကို ရွေးရမည်ဆိုလျှင် တစ်ကြိမ်တည်း ဖတ်ခြင်းက ပိုမြန်သည်
+            return random.sample([row[0] for row in self._query("SELECT user_id FROM users")], k)
+        picked = []
+        seen = set()
+        with self._lock:
+            for _ in range(8 * k):
+                if len(picked) >= k:
+                    break
+                row = self._conn.execute(
+                    "SELECT user_id FROM users WHERE user_id >= ? ORDER BY user_id LIMIT 1",
+                    (random.randint(low, high),)
+                ).fetchone()
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    picked.append(row[0])
+        if len(picked) < k:
+            rest = [row[0] for row in self._query("SELECT user_id FROM users") if row[0] not in seen]
+            picked.extend(random.sample(rest, k - len(picked)))
+        return picked
+
+    def iter_users(self, cursor, limit, sort_key="user_id"):
+        """Cursor (value, user_id) ၏ နောက်မှစ၍ User limit ယောက် (index ပေါ်မှ keyset pagination)"""
+        if sort_key == "user_id":
+            where, params = ("WHERE user_id > ?", (cursor[1],)) if cursor else ("", ())
+            rows = self._query(f"{USER_SELECT} {where} ORDER BY user_id LIMIT ?", (*params, limit))
+            return [self._to_record(row) for row in rows]
+        if sort_key not in USER_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+
+        # (value, user_id) DESC အစဉ်ကို index seek ဖြစ်စေရန် အပိုင်းသုံးပိုင်း ခွဲ query လုပ်သည်:
+        # cursor value တူပြီး user_id ငယ်သူများ၊ value ငယ်သူများ၊ နောက်ဆုံးတွင် NULL များ
+        order = f"ORDER BY {sort_key} DESC, user_id DESC"
+        if cursor is None:
+            segments = [(f"{sort_key} IS NOT NULL", ()), (f"{sort_key} IS NULL", ())]
+        elif cursor[0] is None:
+            segments = [(f"{sort_key} IS NULL AND user_id < ?", (cursor[1],))]
+        else:
+            segments = [
+                (f"{sort_key} = ? AND user_id < ?", (cursor[0], cursor[1])),
+                (f"{sort_key} < ?", (cursor[0],)),
+                (f"{sort_key} IS NULL", ()),
+            ]
+        records = []
+        for where, params in segments:
+            rows = self._query(f"{USER_SELECT} WHERE {where} {order} LIMIT ?", (*params, limit - len(records)))
+            records.extend(self._to_record(row) for row in rows)
+            if len(records) >= limit:
+                break
+        return records
+
+    # --- Persistence ---
+
+    def take_flush_job(self):
+        """Dirty rows များကို snapshot ယူပြီး transaction တစ်ခုဖြင့် ရေးမည့် function ကို ပြန်ပေးခြင်း"""
+        if not self._dirty:
+            return None
+        # Dirty record များကို cache မှ မဖယ်သဖြင့် အမြဲရှိသည်
+        rows = [_record_to_row(uid, self._cache[uid]) for uid in self._dirty]
+        self._taken_gen += 1
+        gen = self._taken_gen
+        self._dirty = set()
+        if len(self._cache) > self.cache_size:
+            self._evict()
+
+        def job():
+            with self._lock, self._conn:
+                # ပိုသစ်သော job က ရေးပြီးသော row များကို ဟောင်းသော data ဖြင့် ပြန်မရေးစေရန်
+                fresh = [row for row in rows if self._row_gen.get(row[0], 0) < gen]
+                self._row_gen.update((row[0], gen) for row in fresh)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", fresh
+                )
+        return job
+
+    def _evict(self):
+        """Dirty မဟုတ်သော record များကို cache မှ ဖယ်ခြင်း (ကိုင်ထားဆဲ record များကို weak ref ဖြင့် ဆက်ရှာနိုင်သည်)"""
+        for uid in [uid for uid in self._cache if uid not in self._dirty]:
+            self._evicted[uid] = self._cache.pop(uid)
+
+    def flush(self):
+        job = self.take_flush_job()
+        if job is not None:
+            job()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # --- Bot state ---
+
+    def load_state(self):
+        state = default_bot_state()
+        with self._lock:
+            for key, value in self._conn.execute("SELECT key, value FROM bot_state"):
+                state[key] = json.loads(value)
+            state["pending_exchanges"] = {
+                exchange_id: json.loads(data)
+                for exchange_id, data in self._conn.execute("SELECT exchange_id, data FROM pending_exchanges")
+            }
+        return state
+
+    def save_state(self, state):
+        pending = state.get("pending_exchanges", {})
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bot_state (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v, ensure_ascii=False)) for k, v in state.items() if k != "pending_exchanges"]
+            )
+            self._conn.execute("DELETE FROM pending_exchanges")
+            self._conn.executemany(
+                "INSERT INTO pending_exchanges (exchange_id, user_id, data) VALUES (?, ?, ?)",
+                [(ex_id, info.get("user_id", 0), json.dumps(info, ensure_ascii=False)) for ex_id, info in pending.items()]
+            )
+
+
+    def import_json(self, json_store):
+        """JSON ဖိုင်များမှ data ကို SQLite ထဲသို့ တစ်ကြိမ်တည်း ကူးယူခြင်း"""
+        self.replace_all(dict(json_store.all_records()))
+        if os.path.exists(json_store.state_file):
+            self.save_state(json_store.load_state())
+        logger.info(f"Imported {self.count()} users from {json_store.user_file}")
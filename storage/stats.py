@@ -0,0 +1,111 @@
+import json
+import logging
+from datetime import date
+from storage import serializers
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    "active_users", "games_played", "total_wagered", "total_paid_out",
+    "games_refunded", "refunded_bets_mmk", "withdrawals", "withdrawn_mmk", "refunded_mmk",
+)
+
+def _new_bucket():
+    return dict.fromkeys(COUNTERS, 0)
+
+class DailyStats:
+    """ရက်အလိုက် စာရင်းဇယားများကို event ဖြစ်တိုင်း တိုးပေးသော aggregator
+
+    ယနေ့၏ bucket ကို memory ထဲတွင် ထားပြီး ရက်ပြောင်းသွားလျှင် bucket အသစ်ဖွင့်သည်။
+    ဖတ်ခြင်းသည် counter များကို ယူရုံသာဖြစ်၍ User များကို scan မလုပ်ပါ။
+    """
+
+    def __init__(self, stats_file, keep_days=30):
+        self.stats_file = stats_file
+        self.keep_days = keep_days
+        self._days = {}         # {date_iso: bucket}
+        self._day = None
+        self._today = None
+        self._active = set()    # ယနေ့ active ဖြစ်ခဲ့သော user_id များ
+        self._dirty = False
+
+    def load(self):
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except ValueError as e:
+            logger.error(f"Error reading {self.stats_file}, starting fresh: {e}")
+            data = {}
+        self._days = {day: {**_new_bucket(), **bucket} for day, bucket in data.get("days", {}).items()}
+        self._day = data.get("day")
+        self._today = self._days.get(self._day)
+        self._active = set(data.get("active", []))
+        self._roll()
+
+    def _roll(self):
+        today = date.today().isoformat()
+        if today == self._day and self._today is not None:
+            return
+        # ရက်ပြောင်းသွားခြင်း: bucket အသစ်ဖွင့်ပြီး ရက်ဟောင်းများကို ဖယ်ရှားသည်
+        self._day = today
+        self._today = self._days.setdefault(today, _new_bucket())
+        self._active = set()
+        for old_day in sorted(self._days)[:-self.keep_days]:
+            del self._days[old_day]
+        self._dirty = True
+
+    def mark_active(self, user_id):
+        self._roll()
+        if user_id not in self._active:
+            self._active.add(user_id)
+            self._today["active_users"] = len(self._active)
+            self._dirty = True
+
+    def record_balance(self, user_id, delta, reason):
+        """Ledger reason အလိုက် သက်ဆိုင်ရာ counter များကို တိုးခြင်း"""
+        self._roll()
+        bucket = self._today
+        if reason == "crash_bet":
+            bucket["games_played"] += 1
+            bucket["total_wagered"] -= delta
+        elif reason == "crash_refund":
+            # မပြီးဆုံးခဲ့သော Round မှ ပြန်ပေးသော လောင်းကြေး (မနေ့က လောင်းခဲ့သော bet လည်း ဖြစ်နိုင်သဖြင့်
+            # games_played / total_wagered မှ မနုတ်ဘဲ သီးခြား counter ဖြင့် မှတ်သည်)
+            bucket["games_refunded"] += 1
+            bucket["refunded_bets_mmk"] += delta
+        elif reason == "crash_win":
+            bucket["total_paid_out"] += delta
+        elif reason == "exchange_request":
+            bucket["withdrawals"] += 1
+            bucket["withdrawn_mmk"] -= delta
+        elif reason == "exchange_refund":
+            bucket["refunded_mmk"] += delta
+        else:
+            return
+        self._dirty = True
+        if reason not in ("crash_refund", "exchange_refund"):
+            self.mark_active(int(user_id))
+
+    def today(self):
+        self._roll()
+        return dict(self._today, date=self._day)
+
+    def recent(self, days=7):
+        """နောက်ဆုံး ရက် days ခု၏ bucket များ (ယနေ့မှစ၍)"""
+        self._roll()
+        return [dict(self._days[day], date=day) for day in sorted(self._days, reverse=True)[:days]]
+
+    def take_save_job(self):
+        """ပြောင်းလဲမှုရှိလျှင် ဖိုင်ရေးမည့် function ကို ပြန်ပေးခြင်း (thread ထဲတွင် run နိုင်သည်)"""
+        if not self._dirty:
+            return None
+        payload = json.dumps(
+            {"day": self._day, "active": list(self._active), "days": self._days}, separators=(",", ":")
+        )
+        self._dirty = False
+
+        def job():
+            serializers.write_atomic(self.stats_file, payload.encode('utf-8'))
+        return job
@@ -0,0 +1,17 @@
+"""Shared pytest fixtures"""
+import pytest
+
+
+class FakeClock:
+    """Test က now ကို ကိုယ်တိုင် ရှေ့တိုးရသော monotonic clock (clock= parameter များအတွက်)"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,93 @@
+"""Tests for storage.commit.GroupCommit"""
+import asyncio
+import threading
+
+import pytest
+
+from storage.commit import GroupCommit
+
+
+class CountingSync:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        if self.fail:
+            raise OSError("disk full")
+
+
+def test_concurrent_commits_share_one_sync():
+    sync = CountingSync()
+    group = GroupCommit(sync, window=0.01)
+
+    async def run():
+        await asyncio.gather(*(group.commit() for _ in range(20)))
+    asyncio.run(run())
+    assert sync.calls == 1
+    assert group.requests == 20 and group.commits == 1
+
+
+def test_commit_after_batch_starts_new_sync():
+    sync = CountingSync()
+    group = GroupCommit(sync, window=0)
+
+    async def run():
+        await group.commit()
+        await group.commit()
+    asyncio.run(run())
+    assert sync.calls == 2
+
+
+def test_commits_during_sync_join_next_batch():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_sync():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            started.set()
+            release.wait(1)
+
+    group = GroupCommit(slow_sync, window=0)
+
+    async def run():
+        first = asyncio.create_task(group.commit())
+        await asyncio.to_thread(started.wait, 1)
+        # ပထမအသုတ် sync လုပ်နေစဉ် ဝင်လာသော commit များသည် နောက်အသုတ်တစ်ခုတည်းကို စောင့်ရမည်
+        later = [asyncio.create_task(group.commit()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert len(calls) == 1
+        release.set()
+        await asyncio.gather(first, *later)
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_sync_failure_reaches_every_waiter():
+    group = GroupCommit(CountingSync(fail=True), window=0.005)
+
+    async def run():
+        return await asyncio.gather(*(group.commit() for _ in range(3)), return_exceptions=True)
+    results = asyncio.run(run())
+    assert all(isinstance(r, OSError) for r in results)
+
+
+def test_cancelled_waiter_does_not_cancel_sync():
+    sync = CountingSync()
+    group = GroupCommit(sync, window=0.01)
+
+    async def run():
+        cancelled = asyncio.create_task(group.commit())
+        other = asyncio.create_task(group.commit())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await other
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+    asyncio.run(run())
+    assert sync.calls == 1
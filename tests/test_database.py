@@ -0,0 +1,177 @@
+"""Tests for the balance / transaction API in database.py"""
+import asyncio
+import os
+
+import pytest
+
+import database
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fresh_database(tmp_path_factory):
+    # Config ၏ ဖိုင်လမ်းကြောင်းများသည် relative ဖြစ်သဖြင့် temp directory ထဲတွင်သာ ရေးမည်
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("data"))
+    database.init_database()
+    yield
+    asyncio.run(database.stop_flusher())
+    database._store = None
+    os.chdir(cwd)
+
+
+def balance(user_id):
+    return database.get_user_data(user_id).get("mmk", 0)
+
+
+def test_adjust_balance_rejects_overdraft():
+    assert asyncio.run(database.adjust_balance(101, 500, "deposit")) == 500
+    assert asyncio.run(database.adjust_balance(101, -600, "bet")) is None
+    assert asyncio.run(database.adjust_balance(101, -600, "bet", clamp=True)) == 0
+    assert database._ledger.balance(101) == 0
+
+
+def test_concurrent_adjustments_are_serialised():
+    async def run():
+        await database.adjust_balance(102, 100, "deposit")
+        results = await asyncio.gather(*(database.adjust_balance(102, -30, "bet") for _ in range(5)))
+        return results
+    results = asyncio.run(run())
+    # 100 MMK ဖြင့် 30 စီ သုံးကြိမ်သာ အောင်မြင်ရမည်
+    assert sorted(r for r in results if r is not None) == [10, 40, 70]
+    assert results.count(None) == 2
+    assert balance(102) == 10
+
+
+def test_transaction_commits_all_changes():
+    async def run():
+        await database.adjust_balance(103, 300, "deposit")
+        async with database.transaction() as txn:
+            txn.adjust_balance(103, -200, "transfer")
+            txn.adjust_balance(104, 200, "transfer")
+            txn.update_user(104, {"username": "receiver"})
+            txn.add_history(104, "Event", "transfer in")
+    asyncio.run(run())
+    assert balance(103) == 100
+    assert balance(104) == 200
+    assert database.get_user_data(104)["username"] == "receiver"
+    entries, total = database.get_user_history(104)
+    assert total == 1 and entries[0]["details"] == "transfer in"
+
+
+def test_transaction_is_all_or_nothing():
+    async def run():
+        await database.adjust_balance(105, 50, "deposit")
+        async with database.transaction() as txn:
+            txn.adjust_balance(106, 100, "transfer")
+            txn.adjust_balance(105, -100, "transfer")
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert balance(105) == 50
+    assert balance(106) == 0
+
+
+def test_transaction_rejects_mixing_delta_and_absolute_balance():
+    txn = database.Transaction()
+    txn.adjust_balance(107, 10, "bonus")
+    with pytest.raises(ValueError):
+        txn.update_user(107, {"mmk": 500})
+
+    txn = database.Transaction()
+    txn.update_user(108, {"mmk": 500})
+    with pytest.raises(ValueError):
+        txn.adjust_balance(108, 10, "bonus")
+
+
+def test_update_many_sets_absolute_balance_through_ledger():
+    database.get_user_data(110)
+    asyncio.run(database.update_many({109: {"mmk": 700, "username": "a"}, 110: {"username": "b"}}))
+    assert balance(109) == 700
+    assert database._ledger.balance(109) == 700
+    assert database.get_user_data(110)["username"] == "b"
+
+
+def test_update_user_data_refuses_balance():
+    with pytest.raises(ValueError):
+        database.update_user_data(111, {"mmk": 5})
+
+
+def walk_users(sort_key, limit=2):
+    """iter_users ကို cursor ဖြင့် စာမျက်နှာအလိုက် အဆုံးထိ ဖတ်ခြင်း"""
+    seen, cursor = [], None
+    while True:
+        page = list(database.iter_users(cursor, limit, sort_key))
+        if not page:
+            return seen
+        seen.extend(page)
+        cursor = database.user_cursor(page[-1], sort_key)
+
+
+@pytest.mark.parametrize("sort_key", ["user_id", "mmk", "last_active", "referral_count"])
+def test_iter_users_pages_across_ties_and_none(sort_key):
+    # Value တူသော User များနှင့် None value များ စာမျက်နှာနယ်ခြားကို ဖြတ်သွားစေရန်
+    fields = {
+        301: {"referral_count": 2, "last_active": "2026-01-02T00:00:00"},
+        302: {"referral_count": 2, "last_active": "2026-01-02T00:00:00"},
+        303: {"referral_count": 2, "last_active": None},
+        304: {"referral_count": 0, "last_active": None},
+        305: {"referral_count": 5, "last_active": "2026-01-01T00:00:00"},
+    }
+    for user_id, updates in fields.items():
+        database.get_user_data(user_id)
+        database.update_user_data(user_id, updates)
+    asyncio.run(database.adjust_balance(302, 50, "deposit"))
+    asyncio.run(database.adjust_balance(303, 50, "deposit"))
+
+    records = walk_users(sort_key)
+    user_ids = [record.user_id for record in records]
+    assert len(user_ids) == len(set(user_ids)) == database.get_store().count()
+    if sort_key == "user_id":
+        assert user_ids == sorted(user_ids)
+        return
+
+    def key(record):
+        value = record.get(sort_key)
+        return (value is not None, value if value is not None else 0, record.user_id)
+    assert [key(r) for r in records] == sorted((key(r) for r in records), reverse=True)
+    # Index သည် ပြောင်းလဲမှုများကို လိုက်ရမည်
+    database.update_user_data(304, {"referral_count": 9, "last_active": "2027-01-01T00:00:00"})
+    if sort_key != "mmk":
+        assert next(database.iter_users(None, 1, sort_key)).user_id == 304
+
+
+def request(user_id, amount):
+    return asyncio.run(database.request_exchange(user_id, amount, "KPay", "09123456789", "Mg Mg"))
+
+
+def test_exchange_reject_refunds_once():
+    asyncio.run(database.adjust_balance(401, 1000, "deposit"))
+    assert request(401, 5000) is None
+    info = request(401, 600)
+    assert balance(401) == 400
+    assert not any(ref.endswith(f":{info['id']}") for ref in database._ledger.refs)
+
+    async def reject_twice():
+        return await asyncio.gather(database.reject_exchange(info["id"]), database.reject_exchange(info["id"]))
+    results = asyncio.run(reject_twice())
+    assert sum(result is not None for result in results) == 1
+    assert balance(401) == 1000
+    assert asyncio.run(database.complete_exchange(info["id"])) is None
+
+
+def test_reconcile_finishes_half_done_exchanges():
+    asyncio.run(database.adjust_balance(402, 1000, "deposit"))
+    # ပြန်အမ်းငွေ commit ပြီးမှ REJECTED မရေးရခင် crash ဖြစ်ခဲ့သည်ဟု ယူဆခြင်း
+    refunded = request(402, 300)
+    database.change_balance(402, 300, "exchange_refund", ref=f"exchange_refund:{refunded['id']}")
+    # Balance နုတ်ပြီး လွှာမတင်ရခင် crash ဖြစ်ခဲ့သည်ဟု ယူဆခြင်း
+    lost_id = database._exchanges.next_id
+    database.change_balance(402, -200, "exchange_request", ref=f"exchange_request:{lost_id}")
+    assert balance(402) == 800
+
+    database._reconcile_exchanges()
+    assert database.get_exchange(refunded["id"]) is None
+    assert balance(402) == 1000
+    assert database._exchanges.next_id == lost_id + 1
+    # ထပ်ခါ run လည်း ထပ်မအမ်းရ
+    database._reconcile_exchanges()
+    assert balance(402) == 1000
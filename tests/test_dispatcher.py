@@ -0,0 +1,177 @@
+"""Tests for utils.dispatcher.OutboundDispatcher"""
+import asyncio
+
+import pytest
+
+from config import OWNER_ID, LOG_GROUP_ID
+import utils.dispatcher
+from utils.dispatcher import OutboundDispatcher, TokenBucket, FRAME, REPLY, ADMIN, LOG
+
+
+class Flood(Exception):
+    """RetryAfter ကဲ့သို့ retry_after ပါသော error (စက္ကန့်အပိုင်းဖြင့် စမ်းနိုင်ရန်)"""
+    retry_after = 0.02
+
+
+def recorder(log, name, errors=()):
+    errors = list(errors)
+
+    async def callback():
+        log.append(name)
+        if errors:
+            raise errors.pop(0)
+        return name
+    return callback
+
+
+async def request(dispatcher, callback, chat_id, priority=None, endpoint="sendMessage"):
+    return await dispatcher.process_request(callback, (), {}, endpoint, {"chat_id": chat_id}, priority)
+
+
+def run_with(dispatcher, coro_factory):
+    async def run():
+        await dispatcher.initialize()
+        try:
+            return await coro_factory()
+        finally:
+            await dispatcher.shutdown()
+    return asyncio.run(run())
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, burst=2, now=0.0)
+    assert bucket.available(0.0)
+    bucket.take()
+    bucket.take()
+    assert not bucket.available(0.0)
+    assert bucket.wait_time(0.0) == pytest.approx(0.5)
+    assert bucket.available(0.5)
+    bucket.blocked_until = 3.0
+    assert not bucket.available(2.0) and bucket.wait_time(2.0) == pytest.approx(1.0)
+
+
+def test_default_priority_by_chat():
+    dispatcher = OutboundDispatcher()
+    assert dispatcher._priority(LOG_GROUP_ID, None) == LOG
+    assert dispatcher._priority(OWNER_ID, None) == ADMIN
+    assert dispatcher._priority(12345, None) == REPLY
+    assert dispatcher._priority(LOG_GROUP_ID, FRAME) == FRAME
+
+
+def test_higher_priority_chats_are_sent_first():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100)
+    sent = []
+
+    async def run():
+        # Global budget ကုန်နေစဉ် ဝင်လာသော message များကို priority အစဉ်အတိုင်း ပို့ရမည်
+        dispatcher._global.tokens = 0
+        requests = [
+            request(dispatcher, recorder(sent, name), chat_id, priority)
+            for chat_id, (name, priority) in enumerate(
+                [("log", LOG), ("reply", REPLY), ("admin", ADMIN), ("frame", FRAME), ("reply2", REPLY)], 1
+            )
+        ]
+        return await asyncio.gather(*requests)
+    results = run_with(dispatcher, run)
+    assert results == ["log", "reply", "admin", "frame", "reply2"]
+    assert sent == ["frame", "reply", "reply2", "admin", "log"]
+    assert dispatcher.metrics()["sent"] == {"frame": 1, "reply": 2, "admin": 1, "log": 1}
+
+
+def test_messages_to_one_chat_keep_their_order():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100, chat_burst=10)
+    sent = []
+
+    async def run():
+        await asyncio.gather(*(
+            request(dispatcher, recorder(sent, i), 7, FRAME if i % 2 else REPLY) for i in range(6)
+        ))
+    run_with(dispatcher, run)
+    assert sent == list(range(6))
+
+
+def test_chat_rate_spaces_messages():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=20, chat_burst=1)
+    times = []
+
+    async def send():
+        times.append(asyncio.get_running_loop().time())
+
+    async def run():
+        await asyncio.gather(*(request(dispatcher, send, 7) for _ in range(3)))
+    run_with(dispatcher, run)
+    assert times[2] - times[0] >= 2 / 20 * 0.9
+
+
+def test_flood_control_retries_replies_but_not_frames():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100)
+    sent = []
+
+    async def run():
+        reply = await request(dispatcher, recorder(sent, "reply", [Flood()]), 1, REPLY)
+        with pytest.raises(Flood):
+            await request(dispatcher, recorder(sent, "frame", [Flood()]), 2, FRAME)
+        return reply
+    assert run_with(dispatcher, run) == "reply"
+    assert sent == ["reply", "reply", "frame"]
+    assert dispatcher.flood_waits == 2 and dispatcher.failed == 1
+
+
+def test_retries_are_bounded_and_other_errors_propagate():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100, max_retries=2)
+    sent = []
+
+    async def run():
+        with pytest.raises(Flood):
+            await request(dispatcher, recorder(sent, "flood", [Flood()] * 5), 1)
+        with pytest.raises(ValueError):
+            await request(dispatcher, recorder(sent, "bad", [ValueError("chat not found")]), 2)
+    run_with(dispatcher, run)
+    assert sent.count("flood") == 3 and sent.count("bad") == 1
+    assert dispatcher.pending == 0
+
+
+def test_requests_without_chat_bypass_the_queue():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100)
+    sent = []
+
+    async def run():
+        dispatcher._global.tokens = 0
+        assert await dispatcher.process_request(recorder(sent, "answer"), (), {}, "answerCallbackQuery", {}, None) == "answer"
+        assert await request(dispatcher, recorder(sent, "get"), 1, endpoint="getChat") == "get"
+    run_with(dispatcher, run)
+    assert sent == ["answer", "get"]
+
+
+def test_saturated_when_pending_reaches_limit():
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100, max_pending=2)
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def blocked():
+            await gate.wait()
+        tasks = [asyncio.create_task(request(dispatcher, blocked, chat_id)) for chat_id in (1, 2)]
+        await asyncio.sleep(0.01)
+        assert dispatcher.saturated() and dispatcher.metrics()["pending"] == 2
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert not dispatcher.saturated()
+    run_with(dispatcher, run)
+
+
+def test_shutdown_fails_unsent_messages(monkeypatch):
+    monkeypatch.setattr(utils.dispatcher, "SHUTDOWN_TIMEOUT", 0.05)
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100)
+
+    async def run():
+        await dispatcher.initialize()
+        # Flood control ဖြင့် ပိတ်ခံထားရသော chat ၏ message သည် shutdown မတိုင်ခင် မပို့နိုင်
+        dispatcher._chat(1).bucket.blocked_until = dispatcher._clock() + 60
+        task = asyncio.create_task(request(dispatcher, recorder([], "late"), 1))
+        await asyncio.sleep(0)
+        await dispatcher.shutdown()
+        with pytest.raises(RuntimeError):
+            await task
+        assert dispatcher.pending == 0
+    asyncio.run(run())
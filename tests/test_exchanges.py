@@ -0,0 +1,120 @@
+"""Tests for storage.exchanges.ExchangeQueue"""
+from storage.exchanges import ExchangeQueue, PENDING, APPROVED, PAID, REJECTED
+
+
+def make_queue(tmp_path):
+    queue = ExchangeQueue(str(tmp_path / "exchanges.jsonl"), fsync=False)
+    queue.open()
+    return queue
+
+
+def reopen(queue):
+    queue.close()
+    reopened = ExchangeQueue(queue.log_file, fsync=False)
+    reopened.open()
+    return reopened
+
+
+def submit(queue, user_id, amount):
+    return queue.submit(user_id, amount, "KBZPay", "09123456789", "Mg Mg")["id"]
+
+
+def test_submit_indexes_by_status_and_user(tmp_path):
+    queue = make_queue(tmp_path)
+    first = submit(queue, 1, 1000)
+    second = submit(queue, 2, 500)
+    third = submit(queue, 1, 200)
+    assert (first, second, third) == (1, 2, 3)
+    assert queue.count() == 3 and queue.pending_total == 1700
+    assert [info["id"] for info in queue.oldest(2)] == [1, 2]
+    assert [info["id"] for info in queue.for_user(1)] == [1, 3]
+
+
+def test_transitions_update_indexes(tmp_path):
+    queue = make_queue(tmp_path)
+    exchange_id = submit(queue, 1, 1000)
+    assert queue.transition(exchange_id, (PENDING,), APPROVED)["status"] == APPROVED
+    assert queue.count(PENDING) == 0 and queue.count(APPROVED) == 1
+    assert queue.pending_total == 0
+    assert queue.transition(exchange_id, (APPROVED,), PAID)["status"] == PAID
+    # ပြီးဆုံးသော လွှာကို memory ထဲမှ ဖယ်ရှားသည်
+    assert queue.get(exchange_id) is None
+    assert queue.for_user(1) == []
+
+
+def test_double_transition_is_rejected(tmp_path):
+    queue = make_queue(tmp_path)
+    exchange_id = submit(queue, 1, 1000)
+    assert queue.transition(exchange_id, (PENDING,), REJECTED) is not None
+    # Admin နှစ်ယောက် တစ်ပြိုင်နက် နှိပ်လျှင် တစ်ကြိမ်သာ အောင်မြင်ရမည်
+    assert queue.transition(exchange_id, (PENDING,), REJECTED) is None
+    assert queue.transition(exchange_id, (PENDING, APPROVED), PAID) is None
+    assert queue.transition(404, (PENDING,), APPROVED) is None
+
+
+def test_replay_restores_open_requests_and_ids(tmp_path):
+    queue = make_queue(tmp_path)
+    paid = submit(queue, 1, 1000)
+    approved = submit(queue, 2, 500)
+    pending = submit(queue, 3, 200)
+    queue.transition(paid, (PENDING,), PAID)
+    queue.transition(approved, (PENDING,), APPROVED)
+
+    queue = reopen(queue)
+    assert queue.get(paid) is None
+    assert queue.get(approved)["status"] == APPROVED
+    assert queue.get(pending)["status"] == PENDING
+    assert queue.pending_total == 200
+    # ID များကို ထပ်မသုံးရ
+    assert submit(queue, 4, 100) == 4
+
+
+def test_compaction_keeps_open_requests_and_next_id(tmp_path):
+    queue = make_queue(tmp_path)
+    for user_id in range(600):
+        exchange_id = submit(queue, user_id, 100)
+        queue.transition(exchange_id, (PENDING,), REJECTED)
+    kept = submit(queue, 1, 300)
+    assert queue.needs_compaction()
+    queue.compact()
+    assert not queue.needs_compaction()
+
+    queue = reopen(queue)
+    assert [info["id"] for info in queue.oldest(10)] == [kept]
+    assert submit(queue, 2, 100) == kept + 1
+
+
+def test_bad_lines_are_skipped(tmp_path):
+    queue = make_queue(tmp_path)
+    submit(queue, 1, 100)
+    queue.close()
+    with open(queue.log_file, "a", encoding="utf-8") as f:
+        f.write('{"id":1,"status":\n{"id":99,"status":"paid"}\n')
+    queue = reopen(queue)
+    assert queue.count() == 1
+
+
+def test_lines_written_during_compaction_are_kept(tmp_path):
+    queue = make_queue(tmp_path)
+    first = submit(queue, 1, 100)
+    job = queue.begin_compaction()
+    assert not queue.needs_compaction()
+    # Thread ထဲတွင် ဖိုင်ရေးနေစဉ် event loop မှ ဝင်လာသော ပြောင်းလဲမှုများ
+    second = submit(queue, 2, 200)
+    queue.transition(first, (PENDING,), PAID)
+    job()
+    queue.sync()
+    third = submit(queue, 3, 300)
+
+    queue = reopen(queue)
+    assert queue.get(first) is None
+    assert [info["id"] for info in queue.oldest(10)] == [second, third]
+
+
+def test_skip_to_is_durable(tmp_path):
+    queue = make_queue(tmp_path)
+    submit(queue, 1, 100)
+    queue.skip_to(10)
+    queue.skip_to(5)
+    queue = reopen(queue)
+    assert submit(queue, 2, 100) == 10
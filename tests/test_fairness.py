@@ -0,0 +1,78 @@
+"""Tests for game.fairness (provably-fair hash chain)"""
+import hashlib
+
+import pytest
+
+from game.fairness import HashChain, crash_point, next_hash
+
+
+def open_chain(path, length=10, interval=3, seed=b"s" * 32, reserve=4):
+    commitment = HashChain.generate(path, length, interval=interval, seed=seed)
+    chain = HashChain(path, reserve=reserve)
+    chain.open()
+    assert chain.commitment.hex() == commitment
+    return chain
+
+
+def test_games_verify_back_to_commitment(tmp_path):
+    chain = open_chain(str(tmp_path / "chain.bin"))
+    previous = chain.commitment
+    for game in range(1, 11):
+        number, game_hash = chain.next()
+        assert number == game
+        # Game တစ်ခု၏ hash ကို sha256 လုပ်လျှင် ယခင် game ၏ hash (game 1 ဆိုလျှင် commitment) ရရမည်
+        assert next_hash(game_hash) == previous
+        previous = game_hash
+    assert chain.remaining == 0
+    with pytest.raises(RuntimeError):
+        chain.next()
+
+
+def test_hashes_match_a_plain_sha256_chain(tmp_path):
+    seed = b"x" * 32
+    chain = open_chain(str(tmp_path / "chain.bin"), length=7, interval=2, seed=seed)
+    hashes = [seed]
+    for _ in range(6):
+        hashes.append(hashlib.sha256(hashes[-1]).digest())
+    assert [chain.next()[1] for _ in range(7)] == hashes[::-1]
+
+
+def test_restart_skips_reserved_games(tmp_path):
+    path = str(tmp_path / "chain.bin")
+    chain = open_chain(path, reserve=4)
+    chain.next()
+    # Restart ဖြစ်လျှင် reserve လုပ်ထားသော game များကို ထပ်မသုံးရ
+    reopened = HashChain(path, reserve=4)
+    reopened.open()
+    assert reopened.games == 4
+    assert reopened.next()[0] == 5
+
+
+def test_tampered_chain_is_rejected(tmp_path):
+    path = str(tmp_path / "chain.bin")
+    open_chain(path)
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"\x00")
+    with pytest.raises(RuntimeError):
+        HashChain(path).open()
+
+
+def test_install_switches_to_pre_generated_chain(tmp_path):
+    path = str(tmp_path / "chain.bin")
+    chain = open_chain(path, length=3)
+    for _ in range(3):
+        chain.next()
+    commitment = HashChain.generate(path + ".next", 5)
+    chain.install(path + ".next")
+    # Chain ဟောင်း၏ cursor ကို မသုံးရ
+    assert chain.commitment.hex() == commitment
+    assert chain.remaining == 5 and chain.next()[0] == 1
+    assert not (tmp_path / "chain.bin.next").exists()
+
+
+def test_crash_point_is_deterministic_and_in_range():
+    points = [crash_point(bytes([i]) * 32, "salt", 1.2, 10.0) for i in range(200)]
+    assert all(1.2 <= p <= 10.0 for p in points)
+    assert points == [crash_point(bytes([i]) * 32, "salt", 1.2, 10.0) for i in range(200)]
+    assert points != [crash_point(bytes([i]) * 32, "other", 1.2, 10.0) for i in range(200)]
@@ -0,0 +1,124 @@
+"""Tests for storage.history.HistoryStore"""
+import asyncio
+
+from storage.history import HistoryStore, DAY_SECONDS, ACTIONS
+
+
+def make_store(tmp_path, capacity=50):
+    store = HistoryStore(str(tmp_path / "history.jsonl"), capacity=capacity)
+    store.open()
+    return store
+
+
+def reopen(store):
+    store.close()
+    reopened = HistoryStore(store.log_file, capacity=store.capacity)
+    reopened.open()
+    return reopened
+
+
+def test_ring_buffer_keeps_newest_entries(tmp_path):
+    store = make_store(tmp_path, capacity=3)
+    for i in range(5):
+        store.append(1, "Spin", f"#{i}", timestamp=i)
+    assert store.count(1) == 3
+    assert [e["details"] for e in store.page(1)] == ["#4", "#3", "#2"]
+    assert [e["details"] for e in store.page(1, offset=1, limit=1)] == ["#3"]
+    assert store.page(2) == []
+
+
+def test_actions_are_encoded_and_survive_reopen(tmp_path):
+    store = make_store(tmp_path)
+    store.append(1, ACTIONS[0], "known", timestamp=10)
+    store.append(1, "Custom Action", "unknown", timestamp=11)
+    store = reopen(store)
+    assert [e["action"] for e in store.page(1)] == ["Custom Action", ACTIONS[0]]
+
+
+def test_expire_removes_old_days(tmp_path):
+    store = make_store(tmp_path)
+    for day in range(4):
+        store.append(1, "Spin", f"day {day}", timestamp=day * DAY_SECONDS + 60)
+    store.append(2, "Spin", "old", timestamp=60)
+    assert store.expire(2 * DAY_SECONDS) == 3
+    assert [e["details"] for e in store.page(1)] == ["day 3", "day 2"]
+    assert store.count(2) == 0
+
+
+def test_expire_respects_max_users(tmp_path):
+    store = make_store(tmp_path)
+    for user_id in range(5):
+        store.append(user_id, "Spin", "old", timestamp=60)
+    assert store.expire(DAY_SECONDS, max_users=2) == 2
+    # နောက်တစ်ကြိမ်တွင် ကျန်သော user များကို ဆက်လုပ်သည်
+    assert store.expire(DAY_SECONDS) == 3
+    assert all(store.count(user_id) == 0 for user_id in range(5))
+
+
+def test_expiry_is_persisted(tmp_path):
+    store = make_store(tmp_path)
+    store.append(1, "Spin", "old", timestamp=60)
+    store.append(1, "Spin", "new", timestamp=3 * DAY_SECONDS)
+    store.expire(2 * DAY_SECONDS)
+    store = reopen(store)
+    assert [e["details"] for e in store.page(1)] == ["new"]
+    assert store.count(1) == 1
+
+
+def test_compaction_keeps_live_entries_and_concurrent_appends(tmp_path):
+    store = make_store(tmp_path, capacity=2)
+    for i in range(6):
+        store.append(1, "Spin", f"#{i}", timestamp=i)
+    store.expire(DAY_SECONDS)
+    store.append(2, "Spin", "live", timestamp=2 * DAY_SECONDS)
+
+    write = store.begin_compaction()
+    write()
+    # Compact လုပ်နေစဉ် ဝင်လာသော entry ကို ဖိုင်အသစ်ထဲ ထည့်ရမည်
+    store.append(2, "Spin", "during", timestamp=2 * DAY_SECONDS + 1)
+    store.finish_compaction()
+    with open(store.log_file, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+    store = reopen(store)
+    assert store.count(1) == 0
+    assert [e["details"] for e in store.page(2)] == ["during", "live"]
+
+
+def test_finish_compaction_in_thread_keeps_concurrent_appends(tmp_path):
+    store = make_store(tmp_path, capacity=500)
+    store.append(1, "Spin", "before", timestamp=1)
+
+    async def run():
+        store.begin_compaction()()
+        finish = asyncio.create_task(asyncio.to_thread(store.finish_compaction))
+        for i in range(200):
+            store.append(2, "Spin", str(i), timestamp=10 + i)
+            await asyncio.sleep(0)
+        await finish
+    asyncio.run(run())
+    store.flush()
+
+    store = reopen(store)
+    assert store.count(1) == 1 and store.count(2) == 200
+
+
+def test_needs_compaction_after_many_overwrites(tmp_path):
+    store = make_store(tmp_path, capacity=1)
+    for i in range(1010):
+        store.append(1, "Spin", str(i), timestamp=i)
+    assert store.needs_compaction()
+    store.begin_compaction()()
+    store.finish_compaction()
+    assert not store.needs_compaction()
+
+
+def test_aborted_compaction_leaves_log_untouched(tmp_path):
+    store = make_store(tmp_path, capacity=1)
+    store.append(1, "Spin", "a", timestamp=1)
+    store.append(1, "Spin", "b", timestamp=2)
+    store.begin_compaction()()
+    store.abort_compaction()
+    store = reopen(store)
+    assert [e["details"] for e in store.page(1)] == ["b"]
+    assert not (tmp_path / "history.jsonl.tmp").exists()
@@ -0,0 +1,101 @@
+"""Tests for storage.json_store sharding (shard_of, reshard, JsonUserStore)"""
+import os
+
+import pytest
+
+from storage import json_store
+from storage.json_store import JsonUserStore, read_layout, reshard, shard_of, shard_paths
+
+
+def make_store(tmp_path, shards=1):
+    return JsonUserStore(str(tmp_path / "users.json"), str(tmp_path / "state.json"), shards=shards)
+
+
+def user_data(count=19):
+    return {str(1000 + i): {"username": f"u{i}", "mmk": i * 10} for i in range(count)}
+
+
+def load_all(tmp_path, shards):
+    store = make_store(tmp_path, shards)
+    store.check_layout()
+    return {uid: record.mmk for uid, record in store.all_records()}
+
+
+def test_shard_of_is_stable_and_in_range():
+    assert shard_of("12345", 1) == 0
+    assert shard_of("12345", 8) == shard_of(12345, 8)
+    counts = [0] * 4
+    for user_id in range(1000):
+        counts[shard_of(str(user_id), 4)] += 1
+    assert all(150 < count < 350 for count in counts)
+
+
+def test_reshard_round_trip_keeps_every_user(tmp_path):
+    user_file = str(tmp_path / "users.json")
+    make_store(tmp_path).replace_all(user_data())
+    expected = {uid: data["mmk"] for uid, data in user_data().items()}
+
+    assert reshard(user_file, 4) == 19
+    assert read_layout(user_file) == (4, 1)
+    assert os.path.exists(user_file + ".unsharded.bak") and not os.path.exists(user_file)
+    assert load_all(tmp_path, 4) == expected
+
+    assert reshard(user_file, 2) == 19
+    assert read_layout(user_file) == (2, 2)
+    # Generation ဟောင်း၏ ဖိုင်များကို manifest ပြောင်းပြီးမှ ဖျက်သည်
+    assert not any(os.path.exists(path) for path in shard_paths(user_file, 4, 1))
+    assert load_all(tmp_path, 2) == expected
+
+    assert reshard(user_file, 1) == 19
+    assert read_layout(user_file) == (1, 0)
+    assert not any(os.path.exists(path) for path in shard_paths(user_file, 2, 2))
+    assert load_all(tmp_path, 1) == expected
+
+
+def test_crash_before_manifest_flip_keeps_old_layout(tmp_path, monkeypatch):
+    user_file = str(tmp_path / "users.json")
+    make_store(tmp_path).replace_all(user_data())
+    reshard(user_file, 4)
+    expected = load_all(tmp_path, 4)
+
+    def crash(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(json_store, "_write_manifest", crash)
+    with pytest.raises(OSError):
+        reshard(user_file, 3)
+    # Shard အသစ်များ ရေးပြီးသော်လည်း manifest မပြောင်းသဖြင့် layout ဟောင်းကိုသာ ဖတ်သည်
+    assert read_layout(user_file) == (4, 1)
+    assert load_all(tmp_path, 4) == expected
+
+    monkeypatch.undo()
+    reshard(user_file, 3)
+    assert load_all(tmp_path, 3) == expected
+
+
+def test_check_layout_splits_or_refuses(tmp_path):
+    user_file = str(tmp_path / "users.json")
+    make_store(tmp_path, 3).check_layout()   # Install အသစ်
+    make_store(tmp_path).replace_all(user_data())
+
+    store = make_store(tmp_path, 3)
+    store.check_layout()
+    assert read_layout(user_file) == (3, 1)
+    assert store.count() == 19
+    with pytest.raises(RuntimeError):
+        make_store(tmp_path, 2).check_layout()
+
+
+def test_flush_rewrites_only_dirty_shards(tmp_path, monkeypatch):
+    store = make_store(tmp_path, 4)
+    store.replace_all(user_data())
+    store = make_store(tmp_path, 4)
+    store.check_layout()
+    record = store.get("1003")
+    record.mmk = 5
+    store.mark_dirty("1003")
+
+    written = []
+    monkeypatch.setattr(json_store.serializers, "write_atomic", lambda path, payload: written.append(path))
+    store.take_flush_job()()
+    assert written == [shard_paths(store.user_file, 4, store.generation)[shard_of("1003", 4)]]
+    assert store.take_flush_job() is None
@@ -0,0 +1,85 @@
+"""Tests for storage.leaderboard.Leaderboard and FieldIndex"""
+import random
+
+from storage.leaderboard import FieldIndex, Leaderboard
+from storage.records import UserRecord
+
+
+def brute_force(scores):
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+def test_rank_and_top():
+    board = Leaderboard()
+    board.build([("1", 100), ("2", 300), ("3", 200), ("4", None)])
+    assert board.top(3) == [(2, 300), (3, 200), (1, 100)]
+    assert board.rank(2) == 1 and board.rank(1) == 3 and board.rank(4) == 4
+    # Index ထဲမရှိသော user သည် 0 MMK ရှိသူများနှင့် အဆင့်တူသည်
+    assert board.rank(99) == 4
+    assert len(board) == 4
+
+
+def test_ties_share_rank_and_order_by_user_id_desc():
+    board = Leaderboard()
+    board.build([(1, 50), (2, 50), (3, 10)])
+    assert board.rank(1) == board.rank(2) == 1
+    assert board.rank(3) == 3
+    assert board.top(3) == [(2, 50), (1, 50), (3, 10)]
+
+
+def test_top_after_cursor_pages_through_everyone():
+    board = Leaderboard(load=4)
+    board.build([(user_id, user_id % 7) for user_id in range(1, 40)])
+    pages, after = [], None
+    while True:
+        page = board.top(5, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        user_id, mmk = page[-1]
+        after = (mmk, user_id)
+    assert pages == brute_force({user_id: user_id % 7 for user_id in range(1, 40)})
+
+
+def test_updates_match_brute_force():
+    rng = random.Random(7)
+    board = Leaderboard(load=3)     # Sublist ခွဲခြင်း/ဖျက်ခြင်း များများဖြစ်စေရန်
+    board.build([])
+    scores = {}
+    for _ in range(2000):
+        user_id = rng.randrange(60)
+        scores[user_id] = rng.randrange(20)
+        board.update(user_id, scores[user_id])
+    expected = brute_force(scores)
+    assert board.top(len(scores)) == expected
+    for user_id, mmk in scores.items():
+        assert board.rank(user_id) == 1 + sum(1 for other in scores.values() if other > mmk)
+
+
+def test_field_index_pages_match_sorted_scan():
+    rng = random.Random(7)
+    records = {uid: UserRecord.from_dict(str(uid), {"referral_count": rng.choice([None, 0, 1, 2])})
+               for uid in range(1, 60)}
+    index = FieldIndex("referral_count", ((str(uid), r) for uid, r in records.items()), load=3)
+    for _ in range(100):
+        uid = rng.randrange(1, 80)
+        record = records.setdefault(uid, UserRecord.from_dict(str(uid), {}))
+        record["referral_count"] = rng.choice([None, 0, 1, 2, 3])
+        index.update(record)
+
+    def key(record):
+        value = record.get("referral_count")
+        return (value is not None, value if value is not None else 0, record.user_id)
+    expected = [r.user_id for r in sorted(records.values(), key=key, reverse=True)]
+    seen, cursor = [], None
+    while True:
+        page = index.page(cursor, 4)
+        if not page:
+            break
+        seen.extend(page)
+        last = records[page[-1]]
+        cursor = (last.get("referral_count"), last.user_id)
+    assert seen == expected
+
+    by_id = FieldIndex("user_id", ((str(uid), r) for uid, r in records.items()), load=3)
+    assert by_id.page((None, 10), 3) == [11, 12, 13]
@@ -0,0 +1,102 @@
+"""Tests for storage.ledger.BalanceLedger"""
+import json
+import os
+
+from storage.ledger import BalanceLedger
+
+
+def make_ledger(tmp_path, fsync=False):
+    ledger = BalanceLedger(str(tmp_path / "ledger.jsonl"), str(tmp_path / "snapshot.json"), fsync=fsync)
+    ledger.open()
+    return ledger
+
+
+def test_append_tracks_balances(tmp_path):
+    ledger = make_ledger(tmp_path)
+    assert ledger.append(1, 500, "deposit") == 500
+    assert ledger.append(1, -200, "bet") == 300
+    assert ledger.append("2", 50, "bonus") == 50
+    assert ledger.balance(1) == 300
+    assert ledger.knows(2) and not ledger.knows(3)
+    assert ledger.seq == 3
+
+
+def test_replay_without_snapshot(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.append(1, 500, "deposit")
+    ledger.append(2, 70, "deposit")
+    ledger.append(1, -100, "bet")
+    ledger.close()
+
+    reopened = BalanceLedger(ledger.ledger_file, ledger.snapshot_file, fsync=False)
+    assert reopened.open() == {"1", "2"}
+    assert reopened.balance(1) == 400
+    assert reopened.balance(2) == 70
+    assert reopened.seq == 3
+
+
+def test_snapshot_archives_ledger_and_replays_tail(tmp_path):
+    ledger = make_ledger(tmp_path, fsync=True)
+    ledger.append(1, 500, "deposit")
+    ledger.append(1, -100, "bet")
+    ledger.snapshot()
+    ledger.append(1, 30, "win")
+    ledger.close()
+
+    # Snapshot မတိုင်မီ ကြောင်းများကို `<ledger>.<seq>` အဖြစ် archive လုပ်ထားရမည်
+    assert os.path.exists(ledger.ledger_file + ".2")
+    with open(ledger.snapshot_file, encoding="utf-8") as f:
+        assert json.load(f) == {"seq": 2, "balances": {"1": 400}}
+
+    reopened = BalanceLedger(ledger.ledger_file, ledger.snapshot_file, fsync=False)
+    assert reopened.open() == {"1"}
+    assert reopened.balance(1) == 430
+    assert reopened.snapshot_seq == 2 and reopened.seq == 3
+
+
+def test_crash_before_snapshot_write_replays_archive(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.append(1, 500, "deposit")
+    ledger.snapshot()
+    ledger.append(1, -50, "bet")
+    ledger.begin_snapshot()     # Snapshot ဖိုင် မရေးခင် crash ဖြစ်သည်
+    ledger.append(1, 5, "win")
+    ledger.close()
+
+    reopened = BalanceLedger(ledger.ledger_file, ledger.snapshot_file, fsync=False)
+    reopened.open()
+    assert reopened.balance(1) == 455
+    assert reopened.seq == 3
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.append(1, 500, "deposit")
+    ledger.close()
+    with open(ledger.ledger_file, "a", encoding="utf-8") as f:
+        f.write('{"s":2,"u":"1","a":')
+
+    reopened = BalanceLedger(ledger.ledger_file, ledger.snapshot_file, fsync=False)
+    reopened.open()
+    assert reopened.balance(1) == 500
+    assert reopened.seq == 1
+
+
+def test_refs_survive_replay_and_snapshot_until_released(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.append(1, 500, "deposit")
+    ledger.append(1, -200, "exchange_request", ref="exchange_request:7")
+    ledger.append(1, 100, "exchange_refund", ref="exchange_refund:3")
+    ledger.release("exchange_refund:3")
+    ledger.close()
+
+    ledger = make_ledger(tmp_path)
+    # Release ကို snapshot မှသာ မှတ်သဖြင့် replay တွင် ref နှစ်ခုလုံး ပြန်ပေါ်သည်
+    assert ledger.refs == {"exchange_request:7": ["1", -200], "exchange_refund:3": ["1", 100]}
+    ledger.release("exchange_refund:3")
+    ledger.snapshot()
+    ledger.close()
+
+    ledger = make_ledger(tmp_path)
+    assert ledger.refs == {"exchange_request:7": ["1", -200]}
+    assert ledger.balance(1) == 400
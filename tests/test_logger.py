@@ -0,0 +1,88 @@
+"""Tests for utils.logger.LogDigest and split_message"""
+import asyncio
+import time
+
+from config import LOG_GROUP_ID
+from utils.dispatcher import LOG
+from utils.logger import LogDigest, split_message
+
+
+class FakeBot:
+    """send_message ခေါ်ချိန်နှင့် စာသားကို မှတ်ထားသော bot"""
+
+    def __init__(self, clock=time.monotonic):
+        self.sent = []
+        self._clock = clock
+
+    async def send_message(self, chat_id, text, rate_limit_args=None):
+        assert chat_id == LOG_GROUP_ID and rate_limit_args == LOG
+        self.sent.append((self._clock(), text))
+
+
+def test_duplicate_lines_are_folded():
+    digest = LogDigest()
+    for _ in range(3):
+        digest.add("Bet placed\n  user 1 ")
+    digest.add("Cash out")
+    digest.add("Bet placed\nuser 1")
+    [text] = digest.render()
+    header, *lines = text.split("\n")
+    assert header.startswith("📋 Log Digest (5 events since ")
+    assert lines == ["Bet placed · user 1 ×4", "Cash out"]
+    # Render ပြီးလျှင် buffer ကို ရှင်းသည်
+    assert digest.render() == []
+
+
+def test_events_over_capacity_are_counted():
+    digest = LogDigest(max_length=600, max_messages=1)   # capacity 88
+    for i in range(4):
+        digest.add(f"event {i} " + "x" * 30)
+    digest.add("event 0 " + "x" * 30)                    # Buffer ထဲရှိပြီးသား ကြောင်းကို ဆက်ရေတွက်သည်
+    [text] = digest.render()
+    assert text.split("\n")[1:] == ["event 0 " + "x" * 30 + " ×2", "event 1 " + "x" * 30, "… +2 more events"]
+
+
+def test_render_respects_message_limits():
+    digest = LogDigest(max_length=1000, max_messages=3)
+    for i in range(200):
+        digest.add(f"event {i:03d} " + "y" * 40)
+    messages = digest.render()
+    assert 1 < len(messages) <= 3
+    assert all(len(text) <= 1000 for text in messages)
+    assert messages[-1].endswith("more events")
+
+    for i in range(200):
+        digest.add(f"event {i:03d} " + "y" * 40)
+    digest.max_messages = 1
+    assert len(digest.render()) == 1
+
+
+def test_split_message_prefers_line_boundaries():
+    assert split_message("a\nb\nc", limit=3) == ["a\nb", "c"]
+    assert split_message("", limit=10) == []
+    long_line = "z" * 9000
+    chunks = split_message("head\n" + long_line + "\ntail")
+    assert chunks == ["head", "z" * 4096, "z" * 4096, "z" * 808 + "\ntail"]
+
+
+def test_size_triggered_flushes_are_spaced_by_min_gap():
+    async def run():
+        bot = FakeBot()
+        digest = LogDigest(interval=30.0, max_length=1000, max_messages=3, min_gap=0.2)
+        started = time.monotonic()
+        digest.start(bot)
+        # Burst တစ်ခုစီသည် message တစ်စောင်ပြည့်ရုံ (size-triggered flush)
+        for burst in range(2):
+            for i in range(25):
+                digest.add(f"burst {burst} event {i:02d} " + "w" * 30)
+            await asyncio.sleep(0.25)
+        await asyncio.sleep(0.3)
+        await digest.stop()
+        return started, bot.sent, digest.messages_sent
+    started, sent, messages_sent = asyncio.run(run())
+    assert messages_sent == len(sent) >= 2
+    flush_times = sorted({round(at, 2) for at, _ in sent})
+    # ပထမ flush သည် စတင်ချိန်မှ min_gap အကြာ၊ နောက် flush များလည်း min_gap စီ ခြားရမည်
+    assert flush_times[0] - started >= 0.19
+    assert all(b - a >= 0.19 for a, b in zip(flush_times, flush_times[1:]))
+    assert "burst 1" in sent[-1][1] and "more events" not in "".join(text for _, text in sent)
@@ -0,0 +1,111 @@
+"""Tests for storage.migrations"""
+import io
+import json
+import os
+
+import pytest
+
+from storage.migrations import (
+    MIGRATIONS, checkpoint_path, iter_json_object, migrate_state, migrate_user_file, pending_migrations,
+)
+
+
+def legacy_users(count):
+    users = {}
+    for i in range(count):
+        record = {"username": f"မောင်{i}", "points": i * 10, "spins_today": 1}
+        if i % 3 == 0:
+            record["mmk"] = 5       # mmk ရှိပြီးသား record ၏ points ကို ဖယ်ရမည်
+        users[str(i)] = record
+    return users
+
+
+def write_users(tmp_path, users):
+    path = str(tmp_path / "user_data.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(users, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def test_iter_json_object_streams_small_chunks():
+    users = legacy_users(20)
+    raw = json.dumps(users, ensure_ascii=False, indent=1).encode("utf-8")
+    items = list(iter_json_object(io.BytesIO(raw), chunk_size=7))
+    assert {key: value for key, value, _ in items} == users
+
+    # Offset မှ ပြန်စလျှင် ကျန်သော item များကိုသာ ရရမည်
+    _, _, offset = items[9]
+    rest = list(iter_json_object(io.BytesIO(raw), offset=offset, chunk_size=7))
+    assert [key for key, _, _ in rest] == [key for key, _, _ in items[10:]]
+
+
+def test_iter_json_object_rejects_truncated_file():
+    with pytest.raises(ValueError):
+        list(iter_json_object(io.BytesIO(b'{"1": {"mmk": 5}, "2": {"mm'), chunk_size=4))
+
+
+def test_migrate_user_file(tmp_path):
+    path = write_users(tmp_path, legacy_users(10))
+    stats = migrate_user_file(path, pending_migrations(0), checkpoint_every=3)
+    with open(path, encoding="utf-8") as f:
+        migrated = json.load(f)
+    assert migrated["1"] == {"username": "မောင်1", "mmk": 10}
+    assert migrated["3"] == {"username": "မောင်3", "mmk": 5}
+    assert stats["records"] == 10 and stats["changed"] == 10
+    assert stats["points_to_mmk"] == 6 and stats["points_dropped"] == 4
+    assert os.path.exists(path + ".v0.bak")
+    assert not os.path.exists(checkpoint_path(path))
+
+
+def test_dry_run_leaves_file_untouched(tmp_path):
+    users = legacy_users(5)
+    path = write_users(tmp_path, users)
+    assert migrate_user_file(path, pending_migrations(0), dry_run=True)["changed"] == 5
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == users
+    assert os.listdir(tmp_path) == ["user_data.json"]
+
+
+def test_interrupted_migration_resumes_from_checkpoint(tmp_path):
+    users = legacy_users(10)
+    path = write_users(tmp_path, users)
+    seen = []
+
+    def crashing(record, stats):
+        seen.append(record["username"])
+        if len(seen) == 8:
+            raise KeyboardInterrupt
+        MIGRATIONS[0][2](record, stats)
+
+    with pytest.raises(KeyboardInterrupt):
+        migrate_user_file(path, [(1, "test", crashing, None)], checkpoint_every=3)
+    with open(checkpoint_path(path), encoding="utf-8") as f:
+        assert json.load(f)["stats"]["records"] == 6
+
+    seen.clear()
+    stats = migrate_user_file(path, [(1, "test", crashing, None)], checkpoint_every=3)
+    # Checkpoint (record 6) နောက်မှသာ ဆက်လုပ်ရမည်
+    assert seen == [users[str(i)]["username"] for i in range(6, 10)]
+    assert stats["records"] == 10
+    with open(path, encoding="utf-8") as f:
+        migrated = json.load(f)
+    assert list(migrated) == list(users)
+    assert all("points" not in record for record in migrated.values())
+    with open(path + ".v0.bak", encoding="utf-8") as f:
+        assert json.load(f) == users
+
+
+def test_changed_input_invalidates_checkpoint(tmp_path):
+    path = write_users(tmp_path, legacy_users(4))
+    with open(checkpoint_path(path), "w", encoding="utf-8") as f:
+        json.dump({"input_offset": 1, "output_size": 1, "stats": {}, "input_size": 1, "input_mtime": 0}, f)
+    with pytest.raises(RuntimeError):
+        migrate_user_file(path, pending_migrations(0))
+
+
+def test_migrate_state():
+    state = {"pending_exchanges": {"1": {"remaining_points": 300}}}
+    stats = migrate_state(state, pending_migrations(0))
+    assert state["pending_exchanges"]["1"] == {"remaining_mmk": 300}
+    assert state["schema_version"] == MIGRATIONS[-1][0]
+    assert stats["remaining_points_renamed"] == 1
@@ -0,0 +1,72 @@
+"""Tests for storage.records.UserRecord"""
+import pytest
+
+from storage.records import UserRecord, pack_history
+
+
+HISTORY = [
+    {"timestamp": "2026-01-01 10:00", "action": "Crash Game", "details": "bet 100"},
+    {"timestamp": "2026-01-01 10:01", "action": "Crash Win", "details": "won 180"},
+]
+
+
+def test_get_returns_default_for_unset_fields():
+    record = UserRecord(1)
+    assert record.get("referred_by") is None
+    assert record.get("referred_by", 0) == 0
+    assert record.get("last_active", "never") == "never"
+    # None မဟုတ်သော falsy value များကို default ဖြင့် မအစားထိုးရ
+    assert record.get("mmk", 100) == 0 and record.get("event_done", True) is False
+    assert record.get("points", 5) == 5
+    assert record["referred_by"] is None
+    with pytest.raises(KeyError):
+        record["points"]
+
+
+def test_unknown_keys_go_into_extra():
+    record = UserRecord(1, points=3)
+    assert record.extra == {"points": 3}
+    record["spins_today"] = 2
+    record["mmk"] = 500
+    assert record.extra == {"points": 3, "spins_today": 2}
+    assert record.mmk == 500
+    assert "spins_today" in record and "history" in record and "missing" not in record
+    assert record.setdefault("bonus", 7) == 7 and record["bonus"] == 7
+    record.update({"username": "mg", "level": 4})
+    assert record.username == "mg" and record.get("level") == 4
+
+
+def test_history_is_unpacked_lazily_from_tuples():
+    record = UserRecord.from_dict("5", {"mmk": 10, "history": HISTORY})
+    assert isinstance(record._history, tuple) and not record.history_loaded()
+    assert record.to_dict()["history"] == HISTORY
+    assert not record.history_loaded()
+    assert record.history == HISTORY and record.history_loaded()
+    record.append_history({"timestamp": "t", "action": "Spin", "details": "x"}, limit=2)
+    assert [e["action"] for e in record.history] == ["Crash Win", "Spin"]
+
+
+def test_history_loader_is_called_once_on_first_use():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pack_history(HISTORY)
+    record = UserRecord.from_dict("5", {"mmk": 10}, history_loader=loader)
+    assert calls == [] and record.to_dict(include_history=False)["mmk"] == 10
+    assert record.history == HISTORY
+    assert record.get("history") == HISTORY
+    assert calls == [1]
+
+
+def test_to_dict_round_trip():
+    data = {
+        "username": "mg", "mmk": 250, "total_games_played": 3, "referred_by": 9, "referral_count": 1,
+        "event_done": True, "last_active": "2026-01-02T00:00:00", "points": 40, "history": HISTORY,
+    }
+    record = UserRecord.from_dict("77", data)
+    assert record.user_id == 77
+    assert record.to_dict() == {"user_id": 77, **data}
+    assert UserRecord.from_dict("77", record.to_dict()).to_dict() == record.to_dict()
+    assert "history" not in UserRecord(1).to_dict()
+    assert record.keys() == set(data) | {"user_id"}
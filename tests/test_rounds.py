@@ -0,0 +1,173 @@
+"""Tests for game.rounds (CrashRound / RoundEngine)"""
+import asyncio
+
+from game.rounds import CrashRound, RoundEngine, RUNNING, CRASHED
+from game.sessions import SessionRegistry, WAITING, QUEUED, PLAYING, CASHED_OUT, FINISHED
+
+LADDER = [(1.0, ""), (1.5, ""), (2.0, ""), (3.0, ""), (5.0, ""), (10.0, "")]
+TICK = 0.01
+
+
+def playing_round(registry, crash_point, targets):
+    """targets: {user_id: auto cash out ladder step (သို့) None}"""
+    rnd = CrashRound(1, crash_point, LADDER, tick_interval=1.0)
+    for user_id, auto_step in targets.items():
+        session = registry.open(user_id)
+        session.move(QUEUED)
+        rnd.add_bet(session, auto_step)
+    rnd.start(now=0.0, deadline=100.0)
+    return rnd
+
+
+def test_crash_step_and_multiplier_follow_time():
+    registry = SessionRegistry()
+    rnd = playing_round(registry, 2.5, {1: None})
+    assert rnd.crash_step == 3 and rnd.state == RUNNING
+    rnd.update(1.5)
+    assert rnd.step == 1 and rnd.multiplier == 1.5
+    rnd.update(99)
+    assert rnd.step == 3 and rnd.state == CRASHED
+    # Ladder ကို ကျော်သော crash point သည် နောက်ဆုံးအဆင့်တွင် crash ဖြစ်သည်
+    assert CrashRound(2, 50.0, LADDER, 1.0).crash_step == len(LADDER) - 1
+
+
+def test_late_tick_pays_every_target_passed_before_crash():
+    registry = SessionRegistry()
+    rnd = playing_round(registry, 3.0, {1: 1, 2: 2, 3: 3, 4: None})
+    # Tick နောက်ကျ၍ crash အဆင့် (3) သို့ တန်းရောက်သည်
+    rnd.update(10)
+    due = rnd.take_auto_cashouts()
+    assert sorted((s.user_id, s.cashout) for s in due) == [(1, 1.5), (2, 2.0)]
+    assert all(s.state == CASHED_OUT for s in due)
+    # Crash အဆင့်ရှိ target သည် ရှုံးသည်
+    assert registry.get(3).state == PLAYING and registry.get(3).cashout is None
+    assert rnd.live == 2
+    assert rnd.take_auto_cashouts() == []
+
+
+def test_manual_cash_out_uses_server_time():
+    registry = SessionRegistry()
+    rnd = playing_round(registry, 5.0, {1: None, 2: None})
+    assert rnd.cash_out(registry.get(1), now=2.2).cashout == 2.0
+    assert rnd.cash_out(registry.get(1), now=2.5) is None
+    assert rnd.cash_out(registry.get(2), now=10) is None
+    assert rnd.state == CRASHED
+
+
+class Recorder:
+    """Engine callback များကို မှတ်တမ်းတင်ပြီး cash out လုပ်သူများကို handler ကဲ့သို့ ပိတ်သည်"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.events = []
+
+    async def frame(self, rnd):
+        self.events.append(("frame", rnd.round_id, rnd.step))
+
+    async def crash(self, rnd):
+        self.events.append(("crash", rnd.round_id, sorted(s.user_id for s in rnd.live_bets())))
+
+    async def cash_out(self, session):
+        self.events.append(("cash_out", session.user_id, session.cashout))
+        self.registry.close(session)
+
+    async def admit(self, session):
+        self.events.append(("admit", session.user_id))
+
+
+def make_engine(crash_points, **kwargs):
+    registry = SessionRegistry()
+    recorder = Recorder(registry)
+    points = iter(crash_points)
+    engine = RoundEngine(
+        registry, LADDER, lambda: (next(points), "proof"), recorder.frame, recorder.crash, recorder.cash_out,
+        betting_window=TICK, tick_interval=TICK, on_admit=recorder.admit, **kwargs,
+    )
+    return engine, registry, recorder
+
+
+async def wait_idle(engine):
+    while engine._task is not None or engine._background:
+        await asyncio.sleep(TICK)
+
+
+def test_round_lifecycle_with_auto_cash_out():
+    engine, registry, recorder = make_engine([3.0])
+
+    async def run():
+        assert engine.place_bet(registry.open(1), 100, "msg-1", auto_cashout=2.0) == 0
+        assert engine.place_bet(registry.open(2), 200, "msg-2") == 0
+        assert registry.get(1).state == QUEUED and registry.get(1).round is registry.get(2).round
+        await wait_idle(engine)
+    asyncio.run(run())
+
+    assert ("cash_out", 1, 2.0) in recorder.events
+    crashes = [e for e in recorder.events if e[0] == "crash"]
+    # Auto cash out ပြီးသူ မပါဘဲ ရှုံးသူသာ crash တွင် ကျန်သည်
+    assert crashes == [("crash", 1, [2])]
+    assert recorder.events.index(("cash_out", 1, 2.0)) < recorder.events.index(crashes[0])
+    frames = [e[2] for e in recorder.events if e[0] == "frame"]
+    assert frames == sorted(set(frames)) and max(frames) < 3
+    assert len(registry) == 0
+
+
+def test_auto_target_at_crash_point_loses():
+    engine, registry, recorder = make_engine([2.0])
+
+    async def run():
+        engine.place_bet(registry.open(1), 100, "msg", auto_cashout=2.0)
+        await wait_idle(engine)
+    asyncio.run(run())
+    assert not [e for e in recorder.events if e[0] == "cash_out"]
+    assert ("crash", 1, [1]) in recorder.events
+
+
+def test_place_bet_rejects_non_awaiting_sessions():
+    engine, registry, _ = make_engine([3.0])
+
+    async def run():
+        session = registry.open(1)
+        assert engine.place_bet(session, 100, "msg") == 0
+        # ပြိုင်တူ message ဒုတိယတစ်ခုသည် session ကို မပြောင်းရ
+        assert engine.place_bet(session, 999, "other", auto_cashout=5.0) is None
+        assert session.amount == 100 and session.auto_cashout is None
+        await engine.stop()
+    asyncio.run(run())
+
+
+def test_waiting_queue_is_admitted_in_order():
+    engine, registry, recorder = make_engine([1.5, 1.5, 1.5], max_live=1, max_waiting=1)
+
+    async def run():
+        assert engine.place_bet(registry.open(1), 100, "msg-1") == 0
+        assert engine.place_bet(registry.open(2), 100, "msg-2") == 1
+        assert registry.get(2).state == WAITING
+        assert engine.queue_full()
+        assert engine.place_bet(registry.open(3), 100, "msg-3") is None
+        await wait_idle(engine)
+    asyncio.run(run())
+
+    assert ("admit", 2) in recorder.events
+    assert [e for e in recorder.events if e[0] == "crash"] == [("crash", 1, [1]), ("crash", 2, [2])]
+    assert registry.get(3).state not in (WAITING, QUEUED)
+
+
+def test_stop_returns_open_and_waiting_bets():
+    engine, registry, _ = make_engine([10.0], max_live=1)
+
+    async def run():
+        engine.place_bet(registry.open(1), 100, "msg-1")
+        engine.place_bet(registry.open(2), 100, "msg-2")
+        open_bets = await engine.stop()
+        assert sorted(s.user_id for s in open_bets) == [1, 2]
+        assert all(s.state == FINISHED for s in open_bets)
+        assert engine.place_bet(registry.open(3), 100, "msg-3") is None
+    asyncio.run(run())
+
+
+def test_snap_target():
+    engine, _, _ = make_engine([])
+    assert engine.snap_target(1.0) is None
+    assert engine.snap_target(1.7) == 2.0
+    assert engine.snap_target(5.0) == 5.0
+    assert engine.snap_target(10.0) is None
@@ -0,0 +1,133 @@
+"""Tests for game.scheduler.EditScheduler"""
+import asyncio
+
+import pytest
+from telegram.error import RetryAfter
+
+from game.scheduler import EditScheduler
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    clock = fake_clock
+    clock.now = 100.0
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, result=None):
+        # Budget စောင့်ချိန်ကို တကယ်မစောင့်ဘဲ fake clock ကိုသာ ရှေ့တိုးသည်
+        clock.now += delay
+        return await real_sleep(0, result)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return clock
+
+
+class Sender:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_offer_drops_frames_over_chat_budget_and_while_in_flight(clock):
+    scheduler = EditScheduler(global_rate=100, chat_rate=1.0, clock=clock)
+    send = Sender()
+
+    async def run():
+        assert scheduler.offer("a", send)
+        # ပထမ edit ပို့နေဆဲ ဖြစ်သဖြင့် drop
+        assert not scheduler.offer("a", send)
+        await settle()
+        # Edit ပြီးသော်လည်း chat budget မပြည့်သေး
+        assert not scheduler.offer("a", send)
+        assert scheduler.offer("b", send)
+        clock.now += 1.0
+        assert scheduler.offer("a", send)
+        await settle()
+    asyncio.run(run())
+    assert send.calls == 3
+    assert scheduler.frames_sent == 3 and scheduler.frames_dropped == 2
+    # Chat budget ကြောင့် drop သည် global pressure မဟုတ်ပါ
+    assert scheduler.pressure == 0.0
+
+
+def test_global_budget_drops_raise_pressure_until_saturated(clock):
+    scheduler = EditScheduler(global_rate=1, chat_rate=100, chat_burst=100, max_pressure=0.5, clock=clock)
+
+    async def run():
+        assert scheduler.offer(0, Sender())
+        for key in range(1, 200):
+            scheduler.offer(key, Sender())
+        await settle()
+    asyncio.run(run())
+    assert scheduler.frames_dropped == 199
+    assert scheduler.pressure >= 0.5 and scheduler.saturated()
+
+
+def test_push_waits_for_in_flight_frame_and_budget(clock):
+    scheduler = EditScheduler(global_rate=100, chat_rate=1.0, clock=clock)
+    order = []
+
+    async def frame():
+        await asyncio.sleep(0)
+        order.append(("frame", clock.now))
+
+    async def result():
+        order.append(("result", clock.now))
+
+    async def run():
+        scheduler.offer("a", frame)
+        assert await scheduler.push("a", result)
+    asyncio.run(run())
+    # ရလဒ်သည် frame ပြီးမှ၊ chat budget ပြန်ပြည့်မှ (1 စက္ကန့်) ပို့သည်
+    assert [kind for kind, _ in order] == ["frame", "result"]
+    assert order[1][1] - order[0][1] >= 1.0
+    assert scheduler.results_sent == 1 and scheduler.backlog == 0
+    assert scheduler.metrics()["chats"] == 0
+
+
+def test_push_retries_after_flood_control(clock):
+    scheduler = EditScheduler(global_rate=100, chat_rate=10, clock=clock)
+    send = Sender(RetryAfter(5))
+    started = clock.now
+
+    assert asyncio.run(scheduler.push("a", send))
+    assert send.calls == 2
+    assert scheduler.flood_waits == 1 and scheduler.results_sent == 1
+    assert clock.now - started >= 5
+
+
+def test_push_gives_up_on_other_errors_and_after_attempts(clock):
+    scheduler = EditScheduler(global_rate=100, chat_rate=10, clock=clock)
+    failing = Sender(RuntimeError("message not found"))
+    assert not asyncio.run(scheduler.push("a", failing))
+    assert failing.calls == 1 and scheduler.errors == 1
+
+    flooded = Sender(RetryAfter(1), RetryAfter(1), RetryAfter(1))
+    assert not asyncio.run(scheduler.push("b", flooded, attempts=3))
+    assert flooded.calls == 3 and scheduler.flood_waits == 3
+
+
+def test_backlog_saturates(clock):
+    scheduler = EditScheduler(global_rate=100, chat_rate=100, max_backlog=3, clock=clock)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    async def run():
+        tasks = [asyncio.create_task(scheduler.push(key, blocked)) for key in range(3)]
+        await settle()
+        assert scheduler.backlog == 3 and scheduler.saturated()
+        release.set()
+        assert all(await asyncio.gather(*tasks))
+        assert scheduler.backlog == 0 and not scheduler.saturated()
+    asyncio.run(run())
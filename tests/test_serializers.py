@@ -0,0 +1,42 @@
+"""Tests for storage.serializers"""
+import os
+
+import pytest
+
+from storage import serializers
+
+
+@pytest.mark.parametrize("fmt", serializers.available_formats())
+def test_round_trip(tmp_path, fmt):
+    path = str(tmp_path / "data.bin")
+    data = {"1": {"username": "မောင်မောင်", "mmk": 500, "history": []}}
+    serializers.write_file(path, data, fmt)
+    assert serializers.read_file(path) == data
+
+
+def test_write_atomic_replaces_without_leftovers(tmp_path):
+    path = str(tmp_path / "state.json")
+    serializers.write_atomic(path, b"old")
+    serializers.write_atomic(path, b"new")
+    with open(path, "rb") as f:
+        assert f.read() == b"new"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_failed_write_keeps_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.json")
+    serializers.write_atomic(path, b"old")
+
+    def broken_replace(src, dst):
+        raise OSError("rename failed")
+    monkeypatch.setattr(serializers.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        serializers.write_atomic(path, b"new")
+    monkeypatch.undo()
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_unknown_format_falls_back_to_json():
+    assert serializers.resolve_format("yaml") == "json"
@@ -0,0 +1,143 @@
+"""Tests for game.sessions and the crash session reaper"""
+import asyncio
+
+import pytest
+
+import handlers.crash_game as crash_game
+from game.sessions import (
+    SessionRegistry, AWAITING_BET, WAITING, QUEUED, PLAYING, CASHED_OUT, FINISHED,
+)
+
+
+@pytest.fixture
+def make_registry(fake_clock):
+    def make(**kwargs):
+        return SessionRegistry(clock=fake_clock, **kwargs), fake_clock
+    return make
+
+
+def test_open_reuses_awaiting_session_and_refreshes_deadline(make_registry):
+    registry, clock = make_registry(bet_timeout=10)
+    session = registry.open(1)
+    assert session.state == AWAITING_BET and session.deadline == 10
+    clock.now = 5
+    assert registry.open(1) is session and session.deadline == 15
+    session.move(QUEUED)
+    # ကစားနေဆဲ user အတွက် session အသစ် မဖွင့်ရ
+    assert registry.open(1) is None
+
+
+def test_max_sessions(make_registry):
+    registry, _ = make_registry(max_sessions=2)
+    assert registry.open(1) and registry.open(2)
+    assert registry.open(3) is None
+    registry.close(registry.get(1))
+    assert registry.open(3) is not None
+
+
+def test_only_declared_transitions_are_allowed(make_registry):
+    registry, _ = make_registry()
+    session = registry.open(1)
+    with pytest.raises(ValueError):
+        session.move(PLAYING)
+    session.move(QUEUED)
+    session.move(PLAYING)
+    session.move(CASHED_OUT)
+    with pytest.raises(ValueError):
+        session.move(PLAYING)
+    registry.close(session)
+    assert session.state == FINISHED and registry.get(1) is None
+
+
+def test_counts_waiting_order_and_release(make_registry):
+    registry, _ = make_registry()
+    released = []
+    registry.on_release = lambda: released.append(True)
+    sessions = [registry.open(user_id) for user_id in range(4)]
+    sessions[0].move(QUEUED)
+    sessions[1].move(QUEUED)
+    sessions[1].move(PLAYING)
+    sessions[2].move(WAITING)
+    sessions[3].move(WAITING)
+    assert registry.live() == 2 and registry.waiting() == 2
+    assert registry.next_waiting() is sessions[2]
+    assert registry.position(sessions[3]) == 2 and registry.position(sessions[0]) is None
+
+    sessions[2].move(QUEUED)
+    assert registry.waiting() == 1 and registry.position(sessions[3]) == 1
+    assert not released
+    registry.close(sessions[1])
+    assert released == [True]
+    assert registry.live() == 2
+
+
+def test_close_keeps_newer_session_of_same_user(make_registry):
+    registry, _ = make_registry()
+    old = registry.open(1)
+    registry.close(old)
+    new = registry.open(1)
+    registry.close(old)
+    assert registry.get(1) is new
+
+
+def test_reap_returns_previous_states(make_registry):
+    registry, clock = make_registry(bet_timeout=10)
+    idle = registry.open(1)
+    playing = registry.open(2)
+    playing.move(QUEUED, deadline=100)
+    clock.now = 10
+    assert registry.reap() == [(idle, AWAITING_BET)]
+    assert registry.get(1) is None and registry.get(2) is playing
+    clock.now = 100
+    assert registry.reap() == [(playing, QUEUED)]
+    assert registry.reaped == 2 and len(registry) == 0
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, reply_markup=None):
+        self.edits.append(text)
+
+
+def test_reaper_refunds_and_notifies_abandoned_bets(make_registry, monkeypatch):
+    registry, clock = make_registry(bet_timeout=10)
+    refunds = []
+
+    async def adjust_balance(user_id, amount, reason):
+        refunds.append((user_id, amount, reason))
+        return amount
+
+    monkeypatch.setattr(crash_game, "sessions", registry)
+    monkeypatch.setattr(crash_game, "adjust_balance", adjust_balance)
+    monkeypatch.setattr(crash_game, "CRASH_REAP_INTERVAL", 0)
+
+    registry.open(1)                        # လောင်းကြေး မရိုက်ရသေး - ပြန်ပေးစရာ မရှိ
+    abandoned = []
+    for user_id, state in ((2, WAITING), (3, QUEUED)):
+        session = registry.open(user_id)
+        session.amount = 100 * user_id
+        session.message = FakeMessage()
+        session.move(state)
+        abandoned.append(session)
+    cashed = registry.open(4)               # အနိုင်ငွေ ပေးနေဆဲ - ပြန်မပေးရ
+    cashed.amount = 400
+    cashed.move(QUEUED)
+    cashed.move(PLAYING)
+    cashed.move(CASHED_OUT)
+    clock.now = 10
+
+    async def run():
+        task = asyncio.create_task(crash_game._reaper_loop())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(run())
+
+    assert sorted(refunds) == [(2, 200, "crash_refund"), (3, 300, "crash_refund")]
+    for session in abandoned:
+        assert len(session.message.edits) == 1 and str(session.amount) in session.message.edits[0]
+    assert len(registry) == 0
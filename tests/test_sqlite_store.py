@@ -0,0 +1,116 @@
+"""Tests for storage.sqlite_store.SqliteUserStore"""
+import gc
+
+import pytest
+
+from storage.json_store import JsonUserStore
+from storage.records import UserRecord
+from storage.sqlite_store import SqliteUserStore
+
+
+def make_store(tmp_path, **kwargs):
+    return SqliteUserStore(str(tmp_path / "users.db"), **kwargs)
+
+
+def add_user(store, user_id, **fields):
+    return store.insert(str(user_id), UserRecord.from_dict(str(user_id), fields))
+
+
+def test_schema_creates_tables_and_indexes(tmp_path):
+    store = make_store(tmp_path)
+    names = {name for (name,) in store._query("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+    assert {"users", "history", "pending_exchanges", "bot_state"} <= names
+    assert {"idx_users_mmk", "idx_users_last_active", "idx_users_referral_count"} <= names
+    assert store.is_empty()
+    # ဖွင့်ပြီးသား database ကို ထပ်ဖွင့်လည်း schema ကို ပြန်မဆောက်ရ
+    add_user(store, 1, mmk=10)
+    store.close()
+    store = make_store(tmp_path)
+    assert store.get("1").mmk == 10
+
+
+def test_iter_users_keyset_pages_through_nulls(tmp_path):
+    store = make_store(tmp_path)
+    values = {1: "2026-01-02", 2: "2026-01-02", 3: None, 4: "2026-01-01", 5: None, 6: "2026-01-03", 7: "2026-01-02"}
+    for user_id, last_active in values.items():
+        add_user(store, user_id, last_active=last_active)
+
+    seen, cursor = [], None
+    while True:
+        page = store.iter_users(cursor, 2, "last_active")
+        if not page:
+            break
+        seen.extend(record.user_id for record in page)
+        cursor = (page[-1].get("last_active"), page[-1].user_id)
+    # Value DESC, user_id DESC ဖြစ်ပြီး NULL များ နောက်ဆုံး
+    assert seen == [6, 7, 2, 1, 4, 5, 3]
+    assert [r.user_id for r in store.iter_users((None, 2), 5, "user_id")] == [3, 4, 5, 6, 7]
+    with pytest.raises(ValueError):
+        store.iter_users(None, 2, "history")
+
+
+def test_older_flush_job_does_not_overwrite_newer_rows(tmp_path):
+    store = make_store(tmp_path)
+    record = add_user(store, 1, mmk=100)
+    old_job = store.take_flush_job()
+    record.mmk = 200
+    store.mark_dirty("1")
+    new_job = store.take_flush_job()
+    new_job()
+    old_job()
+    assert store._query("SELECT mmk FROM users WHERE user_id = 1")[0][0] == 200
+    assert store.take_flush_job() is None
+
+
+def test_eviction_keeps_one_object_per_user(tmp_path):
+    store = make_store(tmp_path, cache_size=2)
+    for user_id in range(1, 6):
+        add_user(store, user_id, mmk=user_id)
+    held = store.get("1")
+    store.flush()
+    assert len(store._cache) == 0
+    # Handler ကိုင်ထားဆဲ record ကို get() နှင့် query များက တူညီသော object အဖြစ် ပြန်ပေးရမည်
+    assert store.get("1") is held
+    assert dict(store.all_records())["1"] is held
+    assert any(record is held for record in store.iter_users(None, 5))
+    held.mmk = 999
+    store.mark_dirty("1")
+    assert store.top_users(1)[0] is held
+
+    del held
+    gc.collect()
+    assert store.get("2").mmk == 2
+
+
+def test_random_user_ids_are_distinct(tmp_path):
+    store = make_store(tmp_path)
+    assert store.random_user_ids(3) == []
+    for user_id in (5, 17, 1000, 1001, 50000):
+        add_user(store, user_id)
+    picked = store.random_user_ids(2)
+    assert len(set(picked)) == 2 and set(picked) <= {5, 17, 1000, 1001, 50000}
+    assert sorted(store.random_user_ids(10)) == [5, 17, 1000, 1001, 50000]
+
+
+def test_import_json_and_state_round_trip(tmp_path):
+    json_store = JsonUserStore(str(tmp_path / "users.json"), str(tmp_path / "state.json"))
+    json_store.replace_all({
+        "1": {"username": "a", "mmk": 50, "history": [{"timestamp": "t", "action": "Bet", "details": "x"}]},
+        "2": {"username": "b", "mmk": 70, "custom": [1, 2]},
+    })
+    json_store.save_state({"current_event": {"name": "e"}, "pending_exchanges": {"9": {"user_id": 2, "amount": 5}}})
+
+    store = make_store(tmp_path)
+    store.import_json(json_store)
+    assert store.count() == 2
+    assert store.get("2")["custom"] == [1, 2]
+    assert store.get("1").history == [{"timestamp": "t", "action": "Bet", "details": "x"}]
+    state = store.load_state()
+    assert state["current_event"] == {"name": "e"}
+    assert state["pending_exchanges"] == {"9": {"user_id": 2, "amount": 5}}
+
+    state["current_event"] = None
+    state["pending_exchanges"] = {}
+    store.save_state(state)
+    assert store.load_state()["current_event"] is None
+    assert store.load_state()["pending_exchanges"] == {}
@@ -0,0 +1,76 @@
+"""Tests for storage.stats.DailyStats"""
+import datetime
+
+import pytest
+
+from storage import stats as stats_module
+from storage.stats import DailyStats
+
+
+class FakeDate(datetime.date):
+    current = datetime.date(2026, 3, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+@pytest.fixture
+def day(monkeypatch):
+    FakeDate.current = datetime.date(2026, 3, 1)
+    monkeypatch.setattr(stats_module, "date", FakeDate)
+
+    def advance(days=1):
+        FakeDate.current += datetime.timedelta(days=days)
+    return advance
+
+
+def make_stats(tmp_path, keep_days=30):
+    stats = DailyStats(str(tmp_path / "stats.json"), keep_days=keep_days)
+    stats.load()
+    return stats
+
+
+def test_counters_roll_over_at_midnight(tmp_path, day):
+    stats = make_stats(tmp_path)
+    stats.record_balance(1, -100, "crash_bet")
+    stats.record_balance(2, -50, "crash_bet")
+    stats.record_balance(1, 180, "crash_win")
+    assert stats.today()["games_played"] == 2 and stats.today()["active_users"] == 2
+
+    day()
+    # မနေ့က လောင်းခဲ့သော bet ကို ယနေ့ ပြန်အမ်းခြင်း
+    stats.record_balance(2, 50, "crash_refund")
+    today, yesterday = stats.recent(2)
+    assert today["date"] == "2026-03-02"
+    assert today["games_played"] == 0 and today["total_wagered"] == 0
+    assert today["games_refunded"] == 1 and today["refunded_bets_mmk"] == 50
+    assert today["active_users"] == 0
+    assert yesterday["games_played"] == 2 and yesterday["total_wagered"] == 150
+    assert yesterday["total_paid_out"] == 180
+
+
+def test_old_days_are_pruned(tmp_path, day):
+    stats = make_stats(tmp_path, keep_days=3)
+    for _ in range(5):
+        stats.record_balance(1, -10, "crash_bet")
+        day()
+    stats.today()
+    assert [bucket["date"] for bucket in stats.recent(10)] == ["2026-03-06", "2026-03-05", "2026-03-04"]
+
+
+def test_save_and_reload_same_day(tmp_path, day):
+    stats = make_stats(tmp_path)
+    stats.record_balance(1, -100, "crash_bet")
+    stats.take_save_job()()
+    assert stats.take_save_job() is None
+
+    stats = make_stats(tmp_path)
+    stats.record_balance(1, -40, "crash_bet")
+    # ယနေ့ active ဖြစ်ပြီးသား User ကို ထပ်မရေတွက်ရ
+    assert stats.today()["active_users"] == 1
+    assert stats.today()["total_wagered"] == 140
+
+    day()
+    stats.take_save_job()()
+    assert make_stats(tmp_path).today()["active_users"] == 0
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark user data serialization formats.
+
+Usage:
+    python -m tools.bench_serialization [user_counts...]   (default: 10000 100000)
+
+Synthetic users (history ၂၀ ခုစီပါ) ကို format တစ်ခုချင်းဖြင့် ဖိုင်ထဲ ရေး/ဖတ်ပြီး
+အချိန်နှင့် ဖိုင်အရွယ်အစားကို ယခင် json-pretty format နှင့် နှိုင်းယှဉ်ပြသည်။
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+from storage import serializers
+
+def make_users(count, seed=42):
+    rng = random.Random(seed)
+    now = datetime(2025, 8, 3, 12, 0, 0)
+    users = {}
+    for i in range(count):
+        user_id = 1_000_000_000 + i
+        history = [
+            {
+                "timestamp": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))).isoformat(),
+                "action": "Crash Game",
+                "details": f"Won {rng.randint(500, 50000)} MMK at {rng.choice([1.1, 1.3, 1.6, 2.0, 2.5])}x",
+            }
+            for _ in range(20)
+        ]
+        users[str(user_id)] = {
+            "user_id": user_id,
+            "username": f"user{i}",
+            "mmk": rng.randint(0, 200000),
+            "total_games_played": rng.randint(0, 500),
+            "history": history,
+            "referred_by": None,
+            "referral_count": rng.randint(0, 10),
+            "event_done": False,
+            "last_active": now.isoformat(),
+        }
+    return users
+
+def bench(users, fmt, path):
+    start = time.perf_counter()
+    serializers.write_file(path, users, fmt)
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = serializers.read_file(path)
+    load_time = time.perf_counter() - start
+
+    assert len(loaded) == len(users)
+    return save_time, load_time, os.path.getsize(path)
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    formats = serializers.available_formats()
+    missing = sorted(set(serializers.FORMATS) - set(formats))
+    if missing:
+        print(f"(not installed, skipped: {', '.join(missing)})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            users = make_users(count)
+            print(f"\n👥 {count:,} users")
+            print(f"{'format':<12} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10} {'vs pretty (speed/size)':>22}")
+            baseline = None
+            for fmt in formats:
+                save_time, load_time, size = bench(users, fmt, os.path.join(tmp, f"users.{fmt}"))
+                if baseline is None:
+                    baseline = (save_time + load_time, size)
+                speedup = baseline[0] / (save_time + load_time)
+                print(
+                    f"{fmt:<12} {save_time:>9.3f} {load_time:>9.3f} {size / 1e6:>10.2f} "
+                    f"{speedup:>14.1f}x / {size / baseline[1]:>4.0%}"
+                )
+
+if __name__ == "__main__":
+    main()
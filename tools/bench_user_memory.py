@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark resident memory of the user store.
+
+Usage:
+    python -m tools.bench_user_memory [user_count]   (default: 100000)
+
+ယခင် dict-of-dicts ပုံစံ (history dict ၂၀ ခုစီ၊ spin ခေတ် field ဟောင်းများပါ) နှင့်
+UserRecord (__slots__ + packed history) ကို tracemalloc ဖြင့် နှိုင်းယှဉ်သည်။
+"""
+import gc
+import sys
+import json
+import tracemalloc
+from storage.records import UserRecord
+from tools.bench_serialization import make_users
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    source = make_users(count)
+    for i, record in enumerate(source.values()):
+        if i % 2 == 0:
+            # Spin ခေတ်မှ ကျန်ခဲ့သော field များ
+            record.update({"points": 14, "spins_today": 0, "last_spin_date": "2025-08-03"})
+    # tracemalloc သည် copy အသစ်များကိုသာ တိုင်းရန် JSON ဖိုင်မှ ဖတ်သကဲ့သို့ ပြန်ဆောက်သည်
+    raw = json.dumps(source)
+    del source
+
+    _, dict_bytes = measure(lambda: json.loads(raw))
+    _, record_bytes = measure(
+        lambda: {uid: UserRecord.from_dict(uid, data) for uid, data in json.loads(raw).items()}
+    )
+    _, no_history_bytes = measure(
+        lambda: {uid: UserRecord.from_dict(uid, data, history_loader=tuple) for uid, data in json.loads(raw).items()}
+    )
+
+    print(f"👥 {count:,} users (20 history entries each)")
+    print(f"{'layout':<32} {'MB':>8} {'bytes/user':>11}")
+    for name, size in (
+        ("dict-of-dicts (before)", dict_bytes),
+        ("UserRecord + packed history", record_bytes),
+        ("UserRecord, history not loaded", no_history_bytes),
+    ):
+        print(f"{name:<32} {size / 1e6:>8.1f} {size / count:>11.0f}")
+
+if __name__ == "__main__":
+    main()
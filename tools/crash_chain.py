@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Generate or verify the provably-fair crash point hash chain.
+
+Usage:
+    python -m tools.crash_chain generate [length] [--interval 1024]   # Bot ကို ရပ်ထားပြီးမှ run ပါ
+    python -m tools.crash_chain verify <game_hash> [--commitment HEX] [--history N] [--salt S]
+
+generate သည် CRASH_CHAIN_FILE ကို အသစ်ထုတ်ပြီး ကြေညာရမည့် commitment ကို ပြသည်။
+verify သည် chain ဖိုင်မလိုဘဲ (offline) game hash မှ crash point ကို ပြန်တွက်ပြီး hash ကို
+commitment ရောက်သည်အထိ sha256 ဆက်လုပ်ကာ game number ကို စစ်ဆေးသည်။
+"""
+import sys
+import time
+import argparse
+from config import CRASH_CHAIN_FILE, CRASH_CHAIN_LENGTH, CRASH_CHAIN_SALT, CRASH_POINT_RANGE
+from game.fairness import HashChain, crash_point, next_hash
+
+def generate(args):
+    started = time.perf_counter()
+    commitment = HashChain.generate(args.file, args.length, args.interval)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {args.length} games written to {args.file} in {elapsed:.2f}s")
+    print(f"🔐 Commitment (publish this): {commitment}")
+
+def verify(args):
+    try:
+        game_hash = bytes.fromhex(args.game_hash)
+    except ValueError:
+        print("❌ game_hash must be hex")
+        return 1
+    low, high = args.range
+    print(f"💥 Crash point: {crash_point(game_hash, args.salt, low, high)}x")
+
+    # ယခင် game များ၏ hash သည် sha256 ဆက်လုပ်ခြင်းဖြင့် ရသည်
+    h = game_hash
+    for back in range(1, args.history + 1):
+        h = next_hash(h)
+        print(f"  -{back}: {h.hex()}  {crash_point(h, args.salt, low, high)}x")
+
+    if not args.commitment:
+        return 0
+    commitment = bytes.fromhex(args.commitment)
+    h = game_hash
+    for game in range(1, args.max_games + 1):
+        h = next_hash(h)
+        if h == commitment:
+            print(f"✅ Game #{game} of the chain committed to {args.commitment}")
+            return 0
+    print(f"❌ Not found within {args.max_games} games of the commitment")
+    return 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Provably-fair crash point hash chain")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="write a new hash chain")
+    gen.add_argument("length", type=int, nargs="?", default=CRASH_CHAIN_LENGTH)
+    gen.add_argument("--interval", type=int, default=1024, help="games between stored checkpoints")
+    gen.add_argument("--file", default=CRASH_CHAIN_FILE)
+    gen.set_defaults(func=generate)
+
+    ver = commands.add_parser("verify", help="recompute a game's crash point offline")
+    ver.add_argument("game_hash")
+    ver.add_argument("--commitment", help="published commitment to check the hash against")
+    ver.add_argument("--history", type=int, default=0, help="also show the N preceding games")
+    ver.add_argument("--salt", default=CRASH_CHAIN_SALT)
+    ver.add_argument("--range", type=float, nargs=2, default=CRASH_POINT_RANGE, metavar=("LOW", "HIGH"))
+    ver.add_argument("--max-games", type=int, default=10 * CRASH_CHAIN_LENGTH)
+    ver.set_defaults(func=verify)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Migrate legacy user_data / bot_state files to the current schema.
+
+Usage (Bot ကို ရပ်ထားပြီးမှ run ပါ):
+    python -m tools.migrate_user_data --dry-run     # ပြောင်းမည့် အရေအတွက်ကိုသာ ပြသည်
+    python -m tools.migrate_user_data               # Migrate လုပ်သည်
+    python -m tools.migrate_user_data --checkpoint-every 50000
+
+User record များကို တစ်ခုချင်း stream လုပ်၍ memory သုံးစွဲမှုသည် ဖိုင်အရွယ်အစားနှင့် မဆိုင်ပါ။
+ပြတ်တောက်သွားပါက ထပ် run လျှင် checkpoint မှ ဆက်လုပ်သည်။ မူရင်းဖိုင်များကို
+user_data.json.v<version>.bak အဖြစ် ထားခဲ့သည်။ SQLite backend သုံးပါက SQLite သို့
+import မလုပ်မီ (bot_data.db မဆောက်မီ) run ပါ။
+"""
+import os
+import sys
+import argparse
+import logging
+from collections import Counter
+from config import USER_DATA_FILE, BOT_STATE_FILE, STORAGE_FORMAT
+from storage import serializers
+from storage.json_store import read_layout, shard_paths
+from storage.migrations import (
+    SCHEMA_VERSION, pending_migrations, schema_version, migrate_user_file, migrate_state
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate user data files to the current schema")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="records between checkpoints")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    state = serializers.read_file(BOT_STATE_FILE) if os.path.exists(BOT_STATE_FILE) else {}
+    version = schema_version(state)
+    migrations = pending_migrations(version)
+    if not migrations:
+        print(f"✅ Already at schema version {SCHEMA_VERSION}.")
+        return
+    for number, description, _, _ in migrations:
+        print(f"• v{number}: {description}")
+
+    totals = Counter()
+    for path in shard_paths(USER_DATA_FILE, *read_layout(USER_DATA_FILE)):
+        if not os.path.exists(path):
+            continue
+        stats = migrate_user_file(path, migrations, args.dry_run, args.checkpoint_every)
+        print(f"  {path}: {stats['records']} records, {stats['changed']} changed")
+        totals.update(stats)
+    totals.update(migrate_state(state, migrations))
+
+    print("\n📊 " + ("Dry run" if args.dry_run else "Migrated") + f" v{version} → v{SCHEMA_VERSION}")
+    for key, count in sorted(totals.items()):
+        print(f"  {key}: {count}")
+    if args.dry_run:
+        return
+    serializers.write_file(BOT_STATE_FILE, state, serializers.resolve_format(STORAGE_FORMAT))
+    print("✅ Done.")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Re-shard user data files for the JSON storage backend.
+
+Usage (Bot ကို ရပ်ထားပြီးမှ run ပါ):
+    python -m tools.reshard_user_data 8
+
+ပြီးလျှင် config ထဲရှိ USER_DATA_SHARDS (သို့) environment variable ကို
+တူညီသော အရေအတွက်သို့ ပြောင်းပေးပါ။
+"""
+import sys
+import logging
+from config import USER_DATA_FILE, STORAGE_FORMAT
+from storage.json_store import read_shard_count, reshard
+from storage.serializers import resolve_format
+
+def main():
+    if len(sys.argv) != 2 or not sys.argv[1].isdigit() or int(sys.argv[1]) < 1:
+        print(__doc__)
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    new_count = int(sys.argv[1])
+    old_count = read_shard_count(USER_DATA_FILE)
+    if old_count == new_count:
+        print(f"✅ {USER_DATA_FILE} is already stored in {new_count} shard(s).")
+        return
+
+    total = reshard(USER_DATA_FILE, new_count, resolve_format(STORAGE_FORMAT))
+    print(f"✅ Moved {total} users: {old_count} → {new_count} shard(s)")
+    print(f"Set USER_DATA_SHARDS={new_count} before starting the bot.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo simulator for the crash game economics (requires numpy: pip install -r requirements-dev.txt).
+
+Usage:
+    python -m tools.simulate_crash                          # Live config ဖြင့် round ၁၀ သန်း
+    python -m tools.simulate_crash --rounds 50000000 --players 5
+    python -m tools.simulate_crash --targets 1.2 2 5 random --random-bet
+    python -m tools.simulate_crash --range 1.0 4.2          # Crash range အခြားတစ်ခုဖြင့် နှိုင်းယှဉ်ရန်
+
+Crash point များကို game.fairness.crash_point ကဲ့သို့ CRASH_POINT_RANGE အတွင်း ညီတူထုတ်ပြီး
+CRASH_MULTIPLIERS ladder ပေါ်တွင် live engine အတိုင်း ဆုံးဖြတ်သည် (crash ဖြစ်သော အဆင့်ရောက်လျှင်
+cash out မရတော့ပါ)။ Strategy တစ်ခုစီအတွက် return-to-player၊ house edge၊ payout variance နှင့်
+house bankroll ၏ max drawdown ဖြန့်ကျက်ပုံ (path တစ်ခုချင်း) ကို ပြသည်။
+"""
+import sys
+import time
+import argparse
+from config import CRASH_MULTIPLIERS, CRASH_POINT_RANGE, MIN_BET_AMOUNT, MAX_BET_AMOUNT, OWNER_PROFIT_PERCENT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Chunk တစ်ခုလျှင် array element အရေအတွက် (memory ကို ကန့်သတ်ရန်)
+CHUNK_ELEMENTS = 1 << 22
+
+def crash_steps(rng, count, rates, low, high):
+    """Round count ခု၏ crash ဖြစ်မည့် ladder အဆင့်များ"""
+    points = np.round(low + (high - low) * rng.random(count), 1)
+    return np.minimum(np.searchsorted(rates, points, side="left"), len(rates) - 1)
+
+def target_steps(rng, shape, rates, target):
+    """Player တစ်ယောက်ချင်း cash out လုပ်မည့် ladder အဆင့် (random ဆိုလျှင် crash မတိုင်ခင် အဆင့်တစ်ခုခု)"""
+    if target == "random":
+        # Bet handler ကဲ့သို့ ပထမအဆင့် (1.0x) နှင့် နောက်ဆုံးအဆင့်ကို target အဖြစ် မယူပါ
+        return rng.integers(1, len(rates) - 1, size=shape)
+    step = int(np.searchsorted(rates, float(target), side="left"))
+    return np.full(shape, min(step, len(rates) - 1))
+
+def simulate(rates, target, rounds, players, paths, low, high, bet, random_bet, seed):
+    """Strategy တစ်ခုအတွက် round များကို path အလိုက် chunk ခွဲ၍ simulate လုပ်ခြင်း"""
+    rng = np.random.default_rng(seed)
+    length = rounds // paths
+    chunk = max(1, CHUNK_ELEMENTS // (paths * players))
+    wagered = paid = 0.0
+    multiple_sum = multiple_sq = 0.0     # Bet 1 ခုလျှင် payout multiple (variance တွက်ရန်)
+    bets_count = wins = 0
+    pnl_sum = pnl_sq = 0.0               # Round တစ်ခုလျှင် house P&L
+    bankroll = np.zeros(paths)
+    peak = np.zeros(paths)
+    drawdown = np.zeros(paths)
+
+    for start in range(0, length, chunk):
+        n = min(chunk, length - start)
+        crash = crash_steps(rng, paths * n, rates, low, high).reshape(paths, n, 1)
+        steps = target_steps(rng, (paths, n, players), rates, target)
+        if random_bet:
+            stakes = rng.integers(MIN_BET_AMOUNT, MAX_BET_AMOUNT + 1, size=(paths, n, players)).astype(np.float64)
+        else:
+            stakes = np.full((paths, n, players), float(bet))
+        won = steps < crash
+        multiple = np.where(won, rates[steps], 0.0)
+        payout = stakes * multiple
+
+        wagered += stakes.sum()
+        paid += payout.sum()
+        multiple_sum += multiple.sum()
+        multiple_sq += np.square(multiple).sum()
+        bets_count += multiple.size
+        wins += int(won.sum())
+
+        pnl = (stakes - payout).sum(axis=2)
+        pnl_sum += pnl.sum()
+        pnl_sq += np.square(pnl).sum()
+        # Path တစ်ခုချင်း bankroll ၏ peak မှ အကျဆုံး ကျဆင်းမှု
+        curve = bankroll[:, None] + np.cumsum(pnl, axis=1)
+        running_peak = np.maximum(peak[:, None], np.maximum.accumulate(curve, axis=1))
+        drawdown = np.maximum(drawdown, (running_peak - curve).max(axis=1))
+        bankroll = curve[:, -1]
+        peak = running_peak[:, -1]
+
+    total_rounds = paths * length
+    multiple_mean = multiple_sum / bets_count
+    pnl_mean = pnl_sum / total_rounds
+    return {
+        "rtp": paid / wagered,
+        "win_rate": wins / bets_count,
+        "multiple_std": (multiple_sq / bets_count - multiple_mean ** 2) ** 0.5,
+        "pnl_mean": pnl_mean,
+        "pnl_std": (pnl_sq / total_rounds - pnl_mean ** 2) ** 0.5,
+        "drawdown": np.percentile(drawdown, [50, 95, 99]),
+        "rounds": total_rounds,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo RTP / house edge simulator for the crash game")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--players", type=int, default=1, help="bets per round")
+    parser.add_argument("--paths", type=int, default=1000, help="independent bankroll paths for drawdown")
+    parser.add_argument("--targets", nargs="+", default=["1.2", "1.5", "2", "3", "5", "random"],
+                        help="cash-out multipliers to compare, or 'random'")
+    parser.add_argument("--range", type=float, nargs=2, default=CRASH_POINT_RANGE, metavar=("LOW", "HIGH"))
+    parser.add_argument("--bet", type=int, default=MIN_BET_AMOUNT)
+    parser.add_argument("--random-bet", action="store_true", help=f"bets uniform in {MIN_BET_AMOUNT}-{MAX_BET_AMOUNT}")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy is required: pip install numpy")
+        return 1
+    if args.paths < 1 or args.rounds < args.paths:
+        print("❌ --rounds must be at least --paths")
+        return 1
+
+    rates = np.array([rate for rate, _ in CRASH_MULTIPLIERS])
+    low, high = args.range
+    print(f"🎲 {args.rounds:,} rounds × {args.players} players, crash range {low}-{high}, "
+          f"ladder {rates[0]}-{rates[-1]} ({len(rates)} steps)")
+    print(f"👑 Configured owner profit: {OWNER_PROFIT_PERCENT:.1%} of wagered\n")
+    print(f"{'target':>8} {'RTP':>8} {'edge':>8} {'win%':>7} {'payout σ':>9} "
+          f"{'P&L/round':>11} {'σ/round':>10} {'DD p50':>11} {'DD p95':>11} {'DD p99':>11} {'time':>6}")
+
+    for i, target in enumerate(args.targets):
+        started = time.perf_counter()
+        result = simulate(rates, target, args.rounds, args.players, args.paths, low, high,
+                          args.bet, args.random_bet, args.seed + i)
+        elapsed = time.perf_counter() - started
+        p50, p95, p99 = result["drawdown"]
+        print(f"{target:>8} {result['rtp']:>8.2%} {1 - result['rtp']:>8.2%} {result['win_rate']:>7.1%} "
+              f"{result['multiple_std']:>9.3f} {result['pnl_mean']:>11,.1f} {result['pnl_std']:>10,.0f} "
+              f"{p50:>11,.0f} {p95:>11,.0f} {p99:>11,.0f} {elapsed:>5.1f}s")
+
+    print(f"\nDD = house bankroll max drawdown (MMK) over {args.rounds // args.paths:,} rounds, "
+          f"across {args.paths} paths. Negative edge means players win on average.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from telegram.ext import BaseRateLimiter
+from config import (
+    OWNER_ID, LOG_GROUP_ID, OUTBOUND_RATE_GLOBAL, OUTBOUND_RATE_PER_CHAT, OUTBOUND_RATE_PER_GROUP,
+    OUTBOUND_CHAT_BURST, OUTBOUND_MAX_RETRIES, OUTBOUND_MAX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Priority classes (ငယ်လေ အရင်ပို့လေ၊ PTB က falsy rate_limit_args ကို ဖယ်သဖြင့် 1 မှစသည်) ---
+FRAME = 1       # Crash game frame / ရလဒ်
+REPLY = 2       # User ကို ပြန်ဖြေခြင်း
+ADMIN = 3       # Owner ထံ ပို့ခြင်း
+LOG = 4         # Log group
+PRIORITY_NAMES = {FRAME: "frame", REPLY: "reply", ADMIN: "admin", LOG: "log"}
+
+# အသုံးမပြုသော chat များ၏ bucket ကို ရှင်းမည့် စက္ကန့်
+IDLE_CHAT_TTL = 60.0
+# Shutdown အချိန်တွင် ကျန်နေသော message များ ပို့ပြီးရန် စောင့်မည့် စက္ကန့်
+SHUTDOWN_TIMEOUT = 5.0
+
+def retry_after_seconds(error):
+    """Flood control error ဖြစ်လျှင် စောင့်ရမည့် စက္ကန့် (မဟုတ်လျှင် None)"""
+    retry_after = getattr(error, "retry_after", None)
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after) if retry_after is not None else None
+
+class TokenBucket:
+    """စက္ကန့်လျှင် rate ခု ပြည့်လာပြီး burst ခုအထိ စုထားနိုင်သော budget"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = 0.0    # Flood control ဖြင့် ပိတ်ခံထားရသည့် အချိန်
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now):
+        self._refill(now)
+        return now >= self.blocked_until and self.tokens >= 1
+
+    def take(self):
+        self.tokens -= 1
+
+    def wait_time(self, now):
+        self._refill(now)
+        return max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+class _Job:
+    __slots__ = ("priority", "callback", "args", "kwargs", "future", "attempts", "queued_at")
+
+    def __init__(self, priority, callback, args, kwargs, future, queued_at):
+        self.priority = priority
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.attempts = 0
+        self.queued_at = queued_at
+
+class _Chat:
+    __slots__ = ("bucket", "jobs", "busy", "scheduled", "last_used")
+
+    def __init__(self, bucket, now):
+        self.bucket = bucket
+        self.jobs = deque()         # ဤ chat ၏ message များ (ပို့မည့် အစဉ်အတိုင်း)
+        self.busy = False           # ပို့နေဆဲ request ရှိသည်
+        self.scheduled = False      # Ready queue (သို့) timer ထဲ ရောက်နေပြီ
+        self.last_used = now
+
+class OutboundDispatcher(BaseRateLimiter):
+    """Bot ၏ message ပို့ခြင်း အားလုံးကို global / chat token bucket အတွင်း priority အလိုက် ပို့သော dispatcher
+
+    Application ၏ rate_limiter အဖြစ် ထည့်ထားသဖြင့် handler များ၏ send_message / edit_message_text
+    စသည့် ခေါ်ဆိုမှုတိုင်း ဤနေရာကို ဖြတ်သည်။ Priority ကို rate_limit_args ဖြင့် ပေးနိုင်ပြီး
+    မပေးလျှင် chat အလိုက် (log group → LOG၊ owner → ADMIN၊ ကျန် → REPLY) သတ်မှတ်သည်။
+    Chat တစ်ခုအတွင်း message များကို အစဉ်အတိုင်း တစ်ခုပြီးမှ တစ်ခုပို့ပြီး chat အချင်းချင်းကြားတွင်
+    priority မြင့်သော chat ကို အရင်ပို့သည်။ Background drain task တစ်ခုသာ ပို့ရန် ဆုံးဖြတ်သည်။
+    RetryAfter ခံရလျှင် ထို chat ကို စောင့်ခိုင်းပြီး max_retries ကြိမ်အထိ ပြန်ပို့သည် (frame များမှအပ -
+    နောက် frame က အစားထိုးမည်ဖြစ်သည်)။ Chat ID မပါသော request များ (answerCallbackQuery စသည်) နှင့်
+    get* request များကို ချက်ချင်း ပို့သည်။
+    """
+
+    def __init__(self, global_rate=30.0, chat_rate=1.0, group_rate=20 / 60, chat_burst=3, max_retries=3,
+                 max_pending=500, clock=time.monotonic):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self._clock = clock
+        self._global = TokenBucket(global_rate, max(1.0, global_rate), clock())
+        self._chats = {}                                    # {chat_id: _Chat}
+        self._ready = {priority: deque() for priority in PRIORITY_NAMES}   # ချက်ချင်းပို့နိုင်သော chat များ
+        self._timers = []                                   # (ပို့နိုင်မည့်အချိန်, seq, _Chat) heap
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self._sending = set()
+        self._swept_at = clock()
+        self.pending = 0            # ပို့ရန် စောင့်နေသော message အရေအတွက်
+        self.sent = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.failed = 0
+        self.flood_waits = 0
+        self._wait_total = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self._wait_max = dict.fromkeys(PRIORITY_NAMES, 0.0)
+
+    async def initialize(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._drain())
+
+    async def shutdown(self):
+        """ကျန်နေသော message များကို ခဏစောင့်ပို့ပြီး drain task ကို ရပ်ခြင်း"""
+        if self._task is None:
+            return
+        deadline = self._clock() + SHUTDOWN_TIMEOUT
+        while self.pending and self._clock() < deadline:
+            await asyncio.sleep(0.05)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._sending:
+            await asyncio.wait(list(self._sending), timeout=max(0.0, deadline - self._clock()))
+        for chat in self._chats.values():
+            for job in chat.jobs:
+                if not job.future.done():
+                    job.future.set_exception(RuntimeError("outbound dispatcher stopped"))
+        if self.pending:
+            logger.warning(f"Dropped {self.pending} outbound messages at shutdown")
+        self._chats.clear()
+        self._timers.clear()
+        for ready in self._ready.values():
+            ready.clear()
+        self.pending = 0
+
+    def _priority(self, chat_id, rate_limit_args):
+        if rate_limit_args in PRIORITY_NAMES:
+            return rate_limit_args
+        if chat_id == LOG_GROUP_ID:
+            return LOG
+        if chat_id == OWNER_ID:
+            return ADMIN
+        return REPLY
+
+    def _chat(self, chat_id):
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            now = self._clock()
+            # Group / channel (ID အနုတ် (သို့) @username) များတွင် limit ပိုတင်းသည်
+            group = not isinstance(chat_id, int) or chat_id < 0
+            rate = self.group_rate if group else self.chat_rate
+            chat = self._chats[chat_id] = _Chat(TokenBucket(rate, self.chat_burst, now), now)
+        return chat
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get("chat_id")
+        if self._task is None or chat_id is None or endpoint.startswith("get"):
+            return await callback(*args, **kwargs)
+        future = asyncio.get_running_loop().create_future()
+        chat = self._chat(chat_id)
+        chat.jobs.append(_Job(self._priority(chat_id, rate_limit_args), callback, args, kwargs, future,
+                              self._clock()))
+        self.pending += 1
+        self._schedule(chat)
+        return await future
+
+    def _schedule(self, chat):
+        """Chat ၏ ရှေ့ဆုံး message ကို ready queue (သို့) timer ထဲ ထည့်ခြင်း"""
+        if chat.busy or chat.scheduled or not chat.jobs:
+            return
+        chat.scheduled = True
+        now = self._clock()
+        wait = chat.bucket.wait_time(now)
+        if wait > 0:
+            heapq.heappush(self._timers, (now + wait, next(self._seq), chat))
+        else:
+            self._ready[chat.jobs[0].priority].append(chat)
+        self._wakeup.set()
+
+    def _next_ready(self):
+        for ready in self._ready.values():
+            if ready:
+                return ready
+        return None
+
+    async def _drain(self):
+        clock = self._clock
+        while True:
+            now = clock()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, chat = heapq.heappop(self._timers)
+                self._ready[chat.jobs[0].priority].append(chat)
+            if now - self._swept_at >= IDLE_CHAT_TTL:
+                self._sweep(now)
+
+            ready = self._next_ready()
+            if ready is None:
+                self._wakeup.clear()
+                timeout = self._timers[0][0] - now if self._timers else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Global budget စောင့်ပြီးမှ ရွေးသဖြင့် စောင့်နေစဉ် ဝင်လာသော priority မြင့် message က အရင်ရသည်
+            wait = self._global.wait_time(now)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            chat = ready.popleft()
+            chat.scheduled = False
+            if not chat.bucket.available(now):
+                self._schedule(chat)
+                continue
+            job = chat.jobs.popleft()
+            if job.future.done():
+                # ခေါ်သူက မစောင့်တော့ပါ (cancel)
+                self.pending -= 1
+                self._schedule(chat)
+                continue
+            chat.bucket.take()
+            self._global.take()
+            chat.busy = True
+            task = asyncio.create_task(self._send(chat, job))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, chat, job):
+        started = self._clock()
+        try:
+            result = await job.callback(*job.args, **job.kwargs)
+        except Exception as e:
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                self.flood_waits += 1
+                chat.bucket.blocked_until = self._clock() + retry_after
+                if job.priority != FRAME and job.attempts < self.max_retries:
+                    job.attempts += 1
+                    chat.jobs.appendleft(job)
+                    return
+            self.pending -= 1
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.pending -= 1
+            waited = started - job.queued_at
+            self.sent[job.priority] += 1
+            self._wait_total[job.priority] += waited
+            self._wait_max[job.priority] = max(self._wait_max[job.priority], waited)
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            chat.busy = False
+            chat.last_used = self._clock()
+            if self._task is not None:
+                self._schedule(chat)
+
+    def _sweep(self, now):
+        """အချိန်အတော်ကြာ မသုံးသော chat များ၏ state ကို ဖယ်ရှားခြင်း"""
+        self._swept_at = now
+        idle = [
+            chat_id for chat_id, chat in self._chats.items()
+            if not chat.jobs and not chat.busy and chat.bucket.blocked_until <= now
+            and now - chat.last_used >= IDLE_CHAT_TTL
+        ]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    def saturated(self):
+        """ပို့ရန်စောင့်နေသော message များ ကန့်သတ်ချက်ကျော်နေလား (ဂိမ်းအသစ် မလက်ခံသင့်)"""
+        return self.pending >= self.max_pending
+
+    def metrics(self):
+        return {
+            "pending": self.pending,
+            "sent": {name: self.sent[p] for p, name in PRIORITY_NAMES.items()},
+            "wait_avg_ms": {
+                name: round(self._wait_total[p] / self.sent[p] * 1000, 1) if self.sent[p] else 0.0
+                for p, name in PRIORITY_NAMES.items()
+            },
+            "wait_max_ms": {name: round(self._wait_max[p] * 1000, 1) for p, name in PRIORITY_NAMES.items()},
+            "failed": self.failed,
+            "flood_waits": self.flood_waits,
+            "chats": len(self._chats),
+        }
+
+# Application.builder().rate_limiter(dispatcher) ဖြင့် bot အားလုံး၏ outbound request များကို ဖြတ်စေသည်
+dispatcher = OutboundDispatcher(
+    OUTBOUND_RATE_GLOBAL, OUTBOUND_RATE_PER_CHAT, OUTBOUND_RATE_PER_GROUP, OUTBOUND_CHAT_BURST,
+    OUTBOUND_MAX_RETRIES, OUTBOUND_MAX_PENDING,
+)
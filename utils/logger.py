@@ -1,13 +1,10 @@
-import logging
 import asyncio
-from datetime import datetime, timedelta
+import logging
+import time
+from datetime import datetime
 from telegram.ext import ContextTypes
-from config import LOG_GROUP_ID
-
-# Global variables for rate limiting
-last_log_time = {}
-log_queue = []
-log_lock = asyncio.Lock()
+from config import LOG_GROUP_ID, LOG_DIGEST_INTERVAL, LOG_DIGEST_MAX_LENGTH, LOG_DIGEST_MAX_MESSAGES
+from utils.dispatcher import LOG
 
 def setup_logging():
     """Set up logging configuration."""
@@ -24,47 +21,132 @@ def setup_logging():
     logging.getLogger('httpx').setLevel(logging.WARNING)
     logging.getLogger('telegram').setLevel(logging.WARNING)
 
-async def log_to_group(context: ContextTypes.DEFAULT_TYPE, message: str):
-    """Send log message to the log group with rate limiting."""
-    try:
-        # Check rate limiting (max 1 message per 3 seconds)
-        current_time = datetime.now()
-        if LOG_GROUP_ID in last_log_time:
-            time_diff = current_time - last_log_time[LOG_GROUP_ID]
-            if time_diff.total_seconds() < 3:
-                # Add to queue instead of sending immediately
-                async with log_lock:
-                    log_queue.append((context, message, current_time))
-                return
-        
-        await context.bot.send_message(
-            chat_id=LOG_GROUP_ID,
-            text=message
-        )
-        last_log_time[LOG_GROUP_ID] = current_time
-        
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        if "flood control" not in str(e).lower():
-            logger.error(f"Failed to send log to group: {e}")
+class LogDigest:
+    """Buffer log-group events and send them as one compact digest per interval.
+
+    Each event becomes a single line; identical lines are counted instead of repeated.
+    The buffer is flushed every `interval` seconds, or early (at most once per `min_gap`)
+    once it fills a whole message. A flush sends at most `max_messages` messages split at
+    Telegram's message limit, so log-group traffic stays constant however many events arrive.
+    """
 
-async def process_log_queue():
-    """Process queued log messages."""
-    async with log_lock:
-        if not log_queue:
-            return
-        
-        # Process oldest message if enough time has passed
-        context, message, timestamp = log_queue[0]
-        current_time = datetime.now()
-        
-        if current_time - timestamp > timedelta(seconds=3):
+    def __init__(self, interval=60.0, max_length=4096, max_messages=3, min_gap=10.0, clock=time.monotonic):
+        self.interval = interval
+        self.max_length = max_length
+        self.max_messages = max_messages
+        self.min_gap = min_gap
+        self._clock = clock
+        self._events = {}           # {line: count}, insertion ordered
+        self._size = 0
+        self._dropped = 0
+        self._started = None        # Wall time of the first buffered event
+        self._flushed_at = clock()
+        self._bot = None
+        self._task = None
+        self._wakeup = None
+        self.events_logged = 0
+        self.messages_sent = 0
+
+    @property
+    def capacity(self):
+        # Leave room in every message for the header, ×N counters and line-boundary splits
+        return (self.max_length - 512) * self.max_messages
+
+    def add(self, message):
+        line = " · ".join(part.strip() for part in message.strip().splitlines() if part.strip())
+        self.events_logged += 1
+        if self._started is None:
+            self._started = datetime.now()
+        if line in self._events:
+            self._events[line] += 1
+        elif self._size + len(line) + 1 > self.capacity:
+            self._dropped += 1
+        else:
+            self._events[line] = 1
+            self._size += len(line) + 1
+        if self._size >= self.max_length and self._wakeup is not None:
+            self._wakeup.set()
+
+    def render(self):
+        """Build the digest messages for the buffered events and reset the buffer."""
+        if not self._events and not self._dropped:
+            return []
+        header = f"📋 Log Digest ({self.events_logged} events since {self._started:%H:%M:%S})"
+        lines = [f"{line} ×{count}" if count > 1 else line for line, count in self._events.items()]
+        if self._dropped:
+            lines.append(f"… +{self._dropped} more events")
+        self._events = {}
+        self._size = 0
+        self._dropped = 0
+        self._started = None
+        self.events_logged = 0
+        return split_message("\n".join([header] + lines), self.max_length)[:self.max_messages]
+
+    async def flush(self):
+        self._flushed_at = self._clock()
+        for text in self.render():
             try:
-                await context.bot.send_message(
-                    chat_id=LOG_GROUP_ID,
-                    text=message
-                )
-                last_log_time[LOG_GROUP_ID] = current_time
-                log_queue.pop(0)
-            except Exception:
-                pass  # Ignore errors for queued messages
+                await self._bot.send_message(chat_id=LOG_GROUP_ID, text=text, rate_limit_args=LOG)
+                self.messages_sent += 1
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Failed to send log digest: {e}")
+
+    async def _run(self):
+        while True:
+            timeout = max(0.0, self._flushed_at + self.interval - self._clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                # Size-triggered flushes are spaced out too, keeping traffic bounded per interval
+                await asyncio.sleep(max(0.0, self._flushed_at + self.min_gap - self._clock()))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, bot):
+        self._bot = bot
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and send whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._bot is not None:
+            await self.flush()
+
+def split_message(text, limit=4096):
+    """Split text into chunks of at most `limit` characters, preferring line boundaries."""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+digest = LogDigest(LOG_DIGEST_INTERVAL, LOG_DIGEST_MAX_LENGTH, LOG_DIGEST_MAX_MESSAGES)
+
+def log_event(message):
+    """Queue an event for the next log-group digest."""
+    digest.add(message)
+
+async def log_to_group(context: ContextTypes.DEFAULT_TYPE, message: str):
+    """Add a log message to the log-group digest (sent in batches, not one message per event)."""
+    log_event(message)